@@ -0,0 +1,278 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Tuple
+
+from .serialize import dumps
+
+# Contrôle d'admission : limitation de débit par seaux à jetons (par
+# utilisateur et par IP, un budget par classe de requêtes) et nombre borné de
+# requêtes traitées en même temps. Une requête qui attendrait plus que l'objectif
+# de temps d'attente est refusée tout de suite (503) plutôt que de faire grimper
+# la latence de toutes les autres.
+
+# Classe de requête -> (jetons par seconde, capacité du seau) pour un utilisateur
+DEFAULT_BUDGETS = {
+    "auth": (0.5, 5),
+    "read": (20.0, 100),
+    "write": (10.0, 50),
+    "search": (5.0, 30),
+}
+
+# Routes jamais limitées (supervision, documentation)
+EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/docs/oauth2-redirect"}
+
+AUTH_PATHS = {"/token", "/register"}
+
+
+def parse_budgets(spec: str) -> Dict[str, Tuple[float, int]]:
+    """"search=5/30,auth=0.5/5" -> budgets par défaut modifiés"""
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        rate, _, burst = value.partition("/")
+        if name not in budgets or not rate:
+            raise ValueError(f"Budget de débit invalide : {item}")
+        budgets[name] = (float(rate), int(burst or math.ceil(float(rate))))
+    return budgets
+
+
+def request_class(method: str, path: str) -> Optional[str]:
+    """auth, search, read ou write ; None pour les routes non limitées"""
+    if method == "OPTIONS" or path in EXEMPT_PATHS:
+        return None
+    if path in AUTH_PATHS:
+        return "auth"
+    if path.startswith("/contacts/search/"):
+        return "search"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+
+class RateLimiter:
+    """Seaux à jetons par (classe, "user" | "ip", identifiant).
+
+    Vérification en O(1) : un seau n'est recalculé qu'au moment où on le
+    consulte. Mémoire bornée : au plus `maxsize` seaux (LRU), et un seau resté
+    inactif assez longtemps pour être de nouveau plein est supprimé, puisqu'il
+    équivaut à un seau neuf. Un seau IP a `ip_factor` fois le budget d'un
+    utilisateur (plusieurs comptes derrière une même adresse)."""
+
+    def __init__(self, budgets: Dict[str, Tuple[float, int]] = None, ip_factor: float = 4.0,
+                 maxsize: int = 50000):
+        self.budgets = budgets or dict(DEFAULT_BUDGETS)
+        self.ip_factor = ip_factor
+        self.maxsize = maxsize
+        # clé -> [jetons, dernière mise à jour, instant où le seau sera plein]
+        self._buckets = OrderedDict()
+        self.allowed = 0
+        self.limited = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    def _budget(self, request_class: str, kind: str) -> Tuple[float, float]:
+        rate, burst = self.budgets[request_class]
+        if kind == "ip":
+            return rate * self.ip_factor, burst * self.ip_factor
+        return rate, burst
+
+    def check(self, request_class: str, kind: str, identity, cost: float = 1.0) -> float:
+        """0 si la requête passe (un jeton consommé), sinon le délai en secondes
+        avant qu'elle puisse passer"""
+        rate, burst = self._budget(request_class, kind)
+        if rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        key = (request_class, kind, identity)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = burst
+        else:
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            self._buckets.move_to_end(key)
+
+        if tokens >= cost:
+            tokens -= cost
+            retry_after = 0.0
+            self.allowed += 1
+        else:
+            retry_after = (cost - tokens) / rate
+            self.limited[request_class] = self.limited.get(request_class, 0) + 1
+        full_at = now + (burst - tokens) / rate
+        if bucket is None:
+            self._buckets[key] = [tokens, now, full_at]
+        else:
+            bucket[0], bucket[1], bucket[2] = tokens, now, full_at
+        self._expire(now)
+        return retry_after
+
+    def _expire(self, now: float):
+        # Le plus ancien seau est le moins récemment utilisé : O(1) amorti
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if oldest[2] > now and len(self._buckets) <= self.maxsize:
+                return
+            if oldest[2] > now:
+                self.evictions += 1
+            else:
+                self.expirations += 1
+            self._buckets.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "buckets": len(self._buckets),
+            "maxsize": self.maxsize,
+            "allowed": self.allowed,
+            "limited": dict(self.limited),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "budgets": {name: {"rate": rate, "burst": burst} for name, (rate, burst) in self.budgets.items()},
+            "ip_factor": self.ip_factor,
+        }
+
+
+class ConcurrencyLimiter:
+    """Au plus `limit` requêtes en cours ; les suivantes attendent dans une file
+    FIFO de `max_queue` places, `queue_timeout` secondes au plus. À utiliser
+    depuis la boucle asyncio uniquement."""
+
+    def __init__(self, limit: int = 64, max_queue: int = 256, queue_timeout: float = 1.0):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._waiters = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = {"queue_full": 0, "timeout": 0}
+        self._wait_seconds = 0.0
+
+    async def acquire(self) -> Optional[str]:
+        """None si la requête peut être traitée, sinon la raison du refus"""
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            self.admitted += 1
+            return None
+        if self.waiting >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            return "queue_full"
+
+        # release() transmet directement sa place au premier en attente
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.waiting += 1
+        self.queued += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected["timeout"] += 1
+            return "timeout"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            self.waiting -= 1
+            self._wait_seconds += time.monotonic() - start
+        self.admitted += 1
+        return None
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "queue_timeout_ms": self.queue_timeout * 1000,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": dict(self.rejected),
+            "avg_wait_ms": round(self._wait_seconds / self.queued * 1000, 3) if self.queued else 0.0,
+        }
+
+
+def client_ip(scope, trusted_proxies: int = 0) -> str:
+    """IP du client. Chaque proxy ajoute à droite de X-Forwarded-For l'adresse
+    qui s'est connectée à lui : seules les `trusted_proxies` dernières entrées
+    sont fiables, le début de l'en-tête est fourni par le client."""
+    if trusted_proxies > 0:
+        entries = []
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                entries.extend(entry.strip() for entry in value.decode("latin-1").split(","))
+        entries = [entry for entry in entries if entry]
+        if entries:
+            return entries[-min(trusted_proxies, len(entries))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+class AdmissionMiddleware:
+    """Middleware ASGI : seau par IP de la classe de la requête (429), puis
+    place parmi les requêtes en cours (503). Les seaux par utilisateur sont
+    vérifiés après l'authentification. À placer sous CORSMiddleware pour que
+    les refus restent lisibles par le client web."""
+
+    def __init__(self, app, limiter: Optional[RateLimiter], concurrency: Optional[ConcurrencyLimiter],
+                 trusted_proxies: int = 0):
+        self.app = app
+        self.limiter = limiter
+        self.concurrency = concurrency
+        self.trusted_proxies = trusted_proxies
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        kind = request_class(scope["method"], scope["path"])
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.limiter is not None:
+            retry_after = self.limiter.check(kind, "ip", client_ip(scope, self.trusted_proxies))
+            if retry_after:
+                await _reject(send, 429, "Trop de requêtes, réessayez plus tard", retry_after)
+                return
+
+        if self.concurrency is None:
+            await self.app(scope, receive, send)
+            return
+        refused = await self.concurrency.acquire()
+        if refused is not None:
+            await _reject(send, 503, "Serveur surchargé, réessayez plus tard", self.concurrency.queue_timeout)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.concurrency.release()
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float):
+    body = dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", retry_after_header(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
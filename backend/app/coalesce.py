@@ -0,0 +1,82 @@
+import asyncio
+from typing import Hashable
+
+# Regroupement des lectures identiques simultanées (single-flight) : quand le
+# client Flutter rafraîchit deux fois la même page, ou que plusieurs appareils
+# du même compte lisent la même liste, une seule requête SQL tourne et toutes
+# les requêtes HTTP en attente reçoivent son résultat (déjà sérialisé).
+#
+# La clé d'un vol contient la génération des contacts de l'utilisateur, qui
+# augmente à chaque écriture validée (bump()) : une lecture arrivée après une
+# écriture ne rejoint jamais un vol commencé avant elle. Les écritures des
+# autres workers sont vues par la synchronisation des caches ; un vol ne dure
+# que le temps d'une requête SQL.
+
+
+class SingleFlight:
+    """Une exécution partagée par clé (user_id, génération, clé de lecture).
+
+    Le calcul tourne dans sa propre tâche : l'annulation d'une requête (client
+    déconnecté) n'interrompt pas celles qui l'attendent. À utiliser depuis la
+    boucle asyncio uniquement."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._flights = {}
+        self._generations = {}
+        # route -> [exécutions, requêtes servies par un vol en cours]
+        self._counts = {}
+        self.failed = 0
+
+    def generation(self, user_id: int) -> int:
+        return self._generations.get(user_id, 0)
+
+    def bump(self, user_id: int):
+        """À appeler après toute écriture validée sur les contacts de user_id"""
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def _finished(self, key, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Exception lue ici : pas d'avertissement si plus personne n'attend
+            self.failed += 1
+
+    async def do(self, user_id: int, route: str, params: Hashable, fn, *args, **kwargs):
+        """Résultat de `await fn(*args, **kwargs)`, partagé avec les appels
+        simultanés de même (user_id, route, params). Le résultat est commun :
+        ne pas le modifier."""
+        if not self.enabled:
+            return await fn(*args, **kwargs)
+        counts = self._counts.setdefault(route, [0, 0])
+        key = (user_id, self.generation(user_id), route, params)
+        task = self._flights.get(key)
+        if task is None:
+            counts[0] += 1
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            counts[1] += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        routes = {}
+        for route, (executed, shared) in self._counts.items():
+            total = executed + shared
+            routes[route] = {
+                "executed": executed,
+                "shared": shared,
+                "ratio": round(shared / total, 4) if total else 0.0,
+            }
+        executed = sum(route["executed"] for route in routes.values())
+        shared = sum(route["shared"] for route in routes.values())
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._flights),
+            "executed": executed,
+            "shared": shared,
+            "ratio": round(shared / (executed + shared), 4) if executed + shared else 0.0,
+            "failed": self.failed,
+            "routes": routes,
+        }
@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+# Requêtes conditionnelles (RFC 9110) : validateurs faibles calculés à partir
+# de la version des contacts de l'utilisateur, sans lire les contacts.
+
+
+def make_etag(*parts) -> str:
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _opaque(tag: str) -> str:
+    # Comparaison faible : on ignore le préfixe W/
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _opaque(etag)
+    return any(_opaque(candidate) == wanted for candidate in if_none_match.split(","))
+
+
+def parse_timestamp(value):
+    """Horodatage SQLite (UTC, 'YYYY-MM-DD HH:MM:SS') -> datetime aware"""
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value).replace(" ", "T", 1)).replace(tzinfo=timezone.utc)
+
+
+def http_date(moment: datetime) -> str:
+    return format_datetime(moment, usegmt=True)
+
+
+def validators(etag: str, last_modified: datetime = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request_headers, etag: Optional[str] = None, last_modified: datetime = None) -> bool:
+    """Vrai si le client possède déjà la représentation courante (304).
+
+    Avec un ETag, seul If-None-Match décide : If-Modified-Since est ignoré.
+    Last-Modified n'a qu'une précision d'une seconde (CURRENT_TIMESTAMP) et une
+    écriture dans la même seconde que la réponse précédente produirait un 304
+    à tort, alors que l'ETag change à chaque version.
+    """
+    if etag is not None:
+        if_none_match = request_headers.get("if-none-match")
+        return if_none_match is not None and etag_matches(if_none_match, etag)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
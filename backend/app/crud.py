@@ -1,75 +1,56 @@
 from sqlalchemy.orm import Session
-from . import models, schemas, auth
+from . import schemas, auth
+from .sqlalchemy_repository import SQLAlchemyRepository
 from typing import List, Optional
 
+# Mêmes opérations que main.py, via le dépôt commun (app/repository.py).
+# Les fonctions renvoient des dict ; la session fournit la transaction.
+
+def _repository(db: Session) -> SQLAlchemyRepository:
+    return SQLAlchemyRepository(db.connection())
+
 # User CRUD
 def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+    return _repository(db).get_user_by_email(email)
 
 def create_user(db: Session, user: schemas.UserCreate):
     hashed_password = auth.get_password_hash(user.password)
-    db_user = models.User(
-        email=user.email,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        hashed_password=hashed_password
-    )
-    db.add(db_user)
+    db_user = _repository(db).create_user(user.first_name, user.last_name, user.email, hashed_password)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 def authenticate_user(db: Session, email: str, password: str):
     user = get_user_by_email(db, email)
     if not user:
         return False
-    if not auth.verify_password(password, user.hashed_password):
+    if not auth.verify_password(password, user["password"]):
         return False
     return user
 
 # Contact CRUD
 def get_contacts(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Contact)\
-        .filter(models.Contact.user_id == user_id)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    return _repository(db).list_contacts(user_id, limit, skip=skip)
 
 def get_contact(db: Session, contact_id: int, user_id: int):
-    return db.query(models.Contact)\
-        .filter(models.Contact.id == contact_id, models.Contact.user_id == user_id)\
-        .first()
+    return _repository(db).get_contact(user_id, contact_id)
 
 def create_contact(db: Session, contact: schemas.ContactCreate, user_id: int):
-    db_contact = models.Contact(**contact.dict(), user_id=user_id)
-    db.add(db_contact)
+    db_contact = _repository(db).create_contact(user_id, contact.model_dump())
     db.commit()
-    db.refresh(db_contact)
     return db_contact
 
 def update_contact(db: Session, contact_id: int, contact: schemas.ContactUpdate, user_id: int):
-    db_contact = get_contact(db, contact_id, user_id)
-    if db_contact:
-        for key, value in contact.dict(exclude_unset=True).items():
-            setattr(db_contact, key, value)
-        db.commit()
-        db.refresh(db_contact)
+    db_contact = _repository(db).update_contact(user_id, contact_id, contact.model_dump(exclude_unset=True))
+    db.commit()
     return db_contact
 
 def delete_contact(db: Session, contact_id: int, user_id: int):
-    db_contact = get_contact(db, contact_id, user_id)
+    repository = _repository(db)
+    db_contact = repository.get_contact(user_id, contact_id)
     if db_contact:
-        db.delete(db_contact)
+        repository.delete_contact(user_id, contact_id)
         db.commit()
     return db_contact
 
-def search_contacts(db: Session, user_id: int, query: str):
-    return db.query(models.Contact)\
-        .filter(
-            models.Contact.user_id == user_id,
-            (models.Contact.first_name.ilike(f"%{query}%")) |
-            (models.Contact.last_name.ilike(f"%{query}%")) |
-            (models.Contact.phone.ilike(f"%{query}%")) |
-            (models.Contact.email.ilike(f"%{query}%"))
-        )\
-        .all()
\ No newline at end of file
+def search_contacts(db: Session, user_id: int, query: str, limit: int = 100):
+    return _repository(db).search_contacts(user_id, query, limit)
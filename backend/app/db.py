@@ -0,0 +1,70 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .pool import ConnectionPool
+
+_DONE = object()
+
+
+class Database:
+    """Accès asynchrone à SQLite : les appels bloquants s'exécutent sur un pool
+    de threads dédié, jamais sur la boucle d'événements ni sur le threadpool
+    anyio partagé avec le reste de FastAPI"""
+
+    def __init__(self, pool: ConnectionPool, threads: int = None):
+        self.pool = pool
+        self.threads = threads or pool.size
+        self._executor = None
+
+    def _submit(self, fn, *args):
+        # Créé à la demande : un redémarrage de l'application après shutdown() reste possible
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="db")
+        loop = asyncio.get_running_loop()
+        # Le contexte (id de requête, compteurs...) suit l'appel sur le thread DB
+        ctx = contextvars.copy_context()
+        return loop.run_in_executor(self._executor, functools.partial(ctx.run, fn, *args))
+
+    def _call(self, fn, args, kwargs):
+        with self.pool.connection() as conn:
+            return fn(conn, *args, **kwargs)
+
+    def _call_in_transaction(self, fn, args, kwargs):
+        with self.pool.connection() as conn:
+            try:
+                result = fn(conn, *args, **kwargs)
+                conn.commit()
+                return result
+            except BaseException:
+                conn.rollback()
+                raise
+
+    async def run(self, fn, *args, **kwargs):
+        """Exécute fn(conn, *args, **kwargs) avec une connexion du pool"""
+        return await self._submit(self._call, fn, args, kwargs)
+
+    async def transaction(self, fn, *args, **kwargs):
+        """Comme run(), puis COMMIT (ou ROLLBACK si fn lève une exception)"""
+        return await self._submit(self._call_in_transaction, fn, args, kwargs)
+
+    async def iterate(self, generator):
+        """Parcourt un générateur synchrone bloquant sans bloquer la boucle"""
+        try:
+            while True:
+                item = await self._submit(next, generator, _DONE)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            await self._submit(generator.close)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.pool.close()
+
+    def stats(self) -> dict:
+        return {"threads": self.threads, **self.pool.stats()}
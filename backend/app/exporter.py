@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+import zlib
+
+# Export en flux : les lignes sont lues par paquets (pagination par id) et
+# converties directement en octets, sans liste intermédiaire ni modèle Pydantic.
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "vcf": ("text/vcard; charset=utf-8", "vcf"),
+}
+
+CSV_HEADER = ("id", "first_name", "last_name", "phone", "email", "created_at")
+
+# Un paquet : parcours de l'index (user_id, rowid) à partir du dernier id envoyé
+EXPORT_QUERY = """SELECT id, user_id, first_name, last_name, phone, email, created_at
+                  FROM contacts WHERE user_id = ? AND id > ?
+                  ORDER BY id LIMIT ?"""
+
+
+def _iso(created_at):
+    # Même représentation que ContactResponse (datetime ISO 8601)
+    return created_at.replace(" ", "T", 1) if isinstance(created_at, str) else created_at
+
+
+def render_ndjson(rows) -> str:
+    return "".join(
+        json.dumps({
+            "id": row[0], "user_id": row[1], "first_name": row[2], "last_name": row[3],
+            "phone": row[4], "email": row[5], "created_at": _iso(row[6]),
+        }, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def render_csv(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    for row in rows:
+        writer.writerow((row[0], row[2], row[3], row[4], row[5] or "", _iso(row[6])))
+    return buffer.getvalue()
+
+
+def _vcard_escape(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace(",", "\\,")
+            .replace(";", "\\;").replace("\n", "\\n"))
+
+
+def render_vcf(rows) -> str:
+    cards = []
+    for row in rows:
+        first, last = _vcard_escape(row[2]), _vcard_escape(row[3])
+        lines = [
+            "BEGIN:VCARD",
+            "VERSION:3.0",
+            f"N:{last};{first};;;",
+            f"FN:{first} {last}",
+            f"TEL;TYPE=CELL:{_vcard_escape(row[4])}",
+        ]
+        if row[5]:
+            lines.append(f"EMAIL:{_vcard_escape(row[5])}")
+        lines.append("END:VCARD")
+        cards.append("\r\n".join(lines) + "\r\n")
+    return "".join(cards)
+
+
+RENDERERS = {"ndjson": render_ndjson, "csv": render_csv, "vcf": render_vcf}
+
+
+def stream_contacts(pool, user_id: int, fmt: str, gzip: bool = False, fetch_size: int = 500):
+    """Générateur d'octets pour StreamingResponse. Chaque paquet emprunte une
+    connexion au pool et la rend avant d'être envoyé : un client lent ne
+    bloque jamais de connexion. Les paquets sont lus séparément, un contact
+    créé ou supprimé pendant l'export peut donc y figurer ou non."""
+    render = RENDERERS[fmt]
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        if compressor is None:
+            return data
+        # Z_SYNC_FLUSH : chaque paquet est décodable dès sa réception
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    if fmt == "csv":
+        yield encode(",".join(CSV_HEADER) + "\r\n")
+
+    last_id = 0
+    while True:
+        with pool.connection() as conn:
+            rows = conn.execute(EXPORT_QUERY, (user_id, last_id, fetch_size)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        yield encode(render(rows))
+        if len(rows) < fetch_size:
+            break
+
+    if compressor is not None:
+        yield compressor.flush(zlib.Z_FINISH)
@@ -0,0 +1,195 @@
+import asyncio
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# Hachage des mots de passe hors de la boucle d'événements, sur un pool borné
+# (threads ou processus). bcrypt et argon2 libèrent le GIL : des threads
+# suffisent en général, les processus isolent complètement le CPU.
+
+SCHEMES = ("bcrypt", "argon2")
+
+
+class HasherBusy(Exception):
+    """Attente d'un calcul au-delà du budget : la requête est refusée plutôt
+    que de rester en file"""
+
+
+def context_settings(scheme: str = "bcrypt", cost: int = None, argon2_memory_kb: int = 65536) -> dict:
+    """Paramètres CryptContext : `scheme` pour les nouveaux hachages, l'autre
+    schéma reste vérifiable mais marqué obsolète (re-hachage à la connexion)"""
+    if scheme not in SCHEMES:
+        raise ValueError(f"Algorithme de hachage inconnu : {scheme}")
+    settings = {
+        "schemes": [scheme] + [other for other in SCHEMES if other != scheme],
+        "deprecated": "auto",
+    }
+    if scheme == "bcrypt":
+        cost = cost or 12
+        # min = max = coût voulu : tout hachage d'un autre coût est à refaire
+        settings.update(bcrypt__rounds=cost, bcrypt__min_desired_rounds=cost, bcrypt__max_desired_rounds=cost)
+    else:
+        cost = cost or 3
+        settings.update(argon2__rounds=cost, argon2__min_desired_rounds=cost, argon2__max_desired_rounds=cost,
+                        argon2__memory_cost=argon2_memory_kb)
+    return settings
+
+
+# Un CryptContext par configuration et par processus (les workers d'un
+# ProcessPoolExecutor reçoivent les paramètres, pas l'objet)
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+
+def _context(settings: dict) -> CryptContext:
+    key = repr(sorted(settings.items()))
+    context = _contexts.get(key)
+    if context is None:
+        with _contexts_lock:
+            context = _contexts.get(key)
+            if context is None:
+                context = _contexts[key] = CryptContext(**settings)
+    return context
+
+
+def hash_password(settings: dict, password: str) -> str:
+    return _context(settings).hash(password)
+
+
+def verify_password(settings: dict, password: str, stored: str) -> Tuple[bool, Optional[str]]:
+    """(mot de passe correct, nouveau hachage si les paramètres ont changé)"""
+    context = _context(settings)
+    if context.identify(stored, required=False) is None:
+        # Mot de passe enregistré en clair par les anciennes versions
+        if not hmac.compare_digest(password.encode(), stored.encode()):
+            return False, None
+        return True, context.hash(password)
+    valid, new_hash = context.verify_and_update(password, stored)
+    return valid, new_hash if valid else None
+
+
+def _timed(deadline: float, fn, settings: dict, *args):
+    """Exécuté par le pool : abandonne si la demande a attendu au-delà de
+    `deadline` (time.monotonic, commun aux processus), sinon (durée, résultat)"""
+    start = time.monotonic()
+    if start > deadline:
+        raise HasherBusy(f"{(start - deadline) * 1000:.0f} ms au-delà du temps d'attente maximal")
+    result = fn(settings, *args)
+    return time.monotonic() - start, result
+
+
+class PasswordHasher:
+    """Service asynchrone de hachage : `workers` calculs en parallèle au plus,
+    les autres demandes attendent leur tour dans la file du pool.
+
+    HasherBusy seulement quand l'attente dépasse `max_wait` secondes (estimée
+    d'après la durée moyenne d'un calcul, puis constatée au démarrage du
+    calcul), ou au-delà de `max_pending` demandes en cours, garde-fou mémoire."""
+
+    def __init__(self, settings: dict, workers: int = None, executor: str = "thread", max_pending: int = None,
+                 max_wait: float = 5.0):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Type d'exécuteur inconnu : {executor}")
+        self.settings = settings
+        self.workers = workers or os.cpu_count() or 1
+        self.executor_kind = executor
+        self.max_pending = max_pending or self.workers * 32
+        self.max_wait = max_wait
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.hashes = 0
+        self.verifies = 0
+        self.rehashes = 0
+        self.rejected = {"queue_full": 0, "wait": 0}
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash")
+        return self._executor
+
+    def _expected_wait(self) -> float:
+        # Demandes devant celle-ci, servies `workers` par `workers`
+        calls = self.hashes + self.verifies
+        if not calls:
+            return 0.0
+        return self._pending // self.workers * self._busy_seconds / calls
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected["queue_full"] += 1
+                raise HasherBusy(f"{self._pending} hachages en attente")
+            if self._expected_wait() > self.max_wait:
+                self.rejected["wait"] += 1
+                raise HasherBusy(f"{self._pending} hachages en attente")
+            self._pending += 1
+        start = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            seconds, result = await loop.run_in_executor(
+                self._get_executor(), _timed, start + self.max_wait, fn, self.settings, *args
+            )
+        except HasherBusy:
+            with self._lock:
+                self.rejected["wait"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self._busy_seconds += seconds
+            self._wait_seconds += time.monotonic() - start - seconds
+        return result
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(hash_password, password)
+        with self._lock:
+            self.hashes += 1
+        return hashed
+
+    async def verify(self, password: str, stored: str) -> Tuple[bool, Optional[str]]:
+        """Comme verify_password(), sans bloquer la boucle d'événements"""
+        valid, new_hash = await self._run(verify_password, password, stored)
+        with self._lock:
+            self.verifies += 1
+            if new_hash is not None:
+                self.rehashes += 1
+        return valid, new_hash
+
+    def hash_sync(self, password: str) -> str:
+        """Pour les scripts et l'initialisation, hors requêtes HTTP"""
+        return hash_password(self.settings, password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self.hashes + self.verifies
+            return {
+                "scheme": self.settings["schemes"][0],
+                "executor": self.executor_kind,
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "max_wait_ms": self.max_wait * 1000,
+                "hashes": self.hashes,
+                "verifies": self.verifies,
+                "rehashes": self.rehashes,
+                "rejected": dict(self.rejected),
+                "avg_ms": round(self._busy_seconds / calls * 1000, 2) if calls else 0.0,
+                "avg_wait_ms": round(self._wait_seconds / calls * 1000, 2) if calls else 0.0,
+            }
@@ -0,0 +1,271 @@
+import codecs
+import csv
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+# Import en flux : le corps de la requête est décodé et découpé en lignes au
+# fil de l'eau, validé par lots et inséré lot par lot. La mémoire utilisée
+# dépend de la taille d'un lot, jamais de la taille du fichier.
+
+FORMATS = ("csv", "vcard", "ndjson")
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "text/vcard": "vcard",
+    "text/x-vcard": "vcard",
+    "text/directory": "vcard",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+# En-têtes CSV acceptés pour chaque champ de ContactBase
+CSV_ALIASES = {
+    "first_name": "first_name", "firstname": "first_name", "prenom": "first_name", "prénom": "first_name",
+    "given name": "first_name",
+    "last_name": "last_name", "lastname": "last_name", "nom": "last_name", "family name": "last_name",
+    "phone": "phone", "telephone": "phone", "téléphone": "phone", "tel": "phone", "mobile": "phone",
+    "email": "email", "e-mail": "email", "mail": "email", "courriel": "email",
+}
+
+MAX_LINE_LENGTH = 64 * 1024
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    """Flux illisible dans son ensemble (format inconnu, en-tête absent...)"""
+
+
+class RowError(ValueError):
+    """Ligne illisible : signalée dans le rapport, l'import continue"""
+
+
+def detect_format(explicit: Optional[str], content_type: Optional[str]) -> str:
+    if explicit:
+        fmt = explicit.lower()
+        if fmt in ("vcf", "vcard"):
+            return "vcard"
+        if fmt in ("jsonl", "ndjson"):
+            return "ndjson"
+        if fmt in FORMATS:
+            return fmt
+        raise ImportFormatError(f"Format inconnu : {explicit}")
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CONTENT_TYPES:
+        return CONTENT_TYPES[media_type]
+    raise ImportFormatError(
+        "Format non reconnu : précisez ?format=csv|vcard|ndjson ou un Content-Type adapté"
+    )
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Découpe un flux d'octets UTF-8 en lignes sans jamais le charger en entier.
+    Les fins de ligne sont conservées : un champ CSV entre guillemets peut en
+    contenir. Seul le saut de ligne sépare les lignes : str.splitlines coupe
+    aussi sur les séparateurs Unicode (tabulation verticale, U+2028…) présents
+    dans les champs, et sur un CRLF à cheval sur deux morceaux."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if len(pending) > MAX_LINE_LENGTH:
+            raise ImportFormatError(f"Ligne de plus de {MAX_LINE_LENGTH} caractères")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def csv_records(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Regroupe les lignes physiques d'un même enregistrement CSV : tant que
+    les guillemets ne sont pas équilibrés, le champ continue à la ligne suivante"""
+    record = ""
+    async for line in lines:
+        record += line
+        if record.count('"') % 2:
+            if len(record) > MAX_LINE_LENGTH:
+                raise ImportFormatError(f"Enregistrement CSV de plus de {MAX_LINE_LENGTH} caractères")
+            continue
+        yield record
+        record = ""
+    if record:
+        # Guillemet jamais refermé : csv.reader signale l'erreur
+        yield record
+
+
+async def parse_csv(lines: AsyncIterator[str]):
+    header = None
+    row_number = 0
+    async for line in csv_records(lines):
+        if not line.strip():
+            continue
+        try:
+            values = next(csv.reader([line], strict=True))
+        except csv.Error as e:
+            if header is None:
+                raise ImportFormatError(f"En-tête CSV illisible : {e}")
+            row_number += 1
+            yield row_number, RowError(f"CSV invalide : {e}")
+            continue
+        if header is None:
+            header = [CSV_ALIASES.get(name.strip().lower()) for name in values]
+            if "first_name" not in header or "last_name" not in header or "phone" not in header:
+                raise ImportFormatError("En-tête CSV invalide : first_name, last_name et phone sont requis")
+            continue
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, RowError(f"{len(values)} colonnes pour {len(header)} en-têtes")
+            continue
+        yield row_number, {field: value for field, value in zip(header, values) if field}
+
+
+async def parse_ndjson(lines: AsyncIterator[str]):
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, RowError(f"JSON invalide : {e}")
+            continue
+        if not isinstance(record, dict):
+            yield row_number, RowError("Chaque ligne doit être un objet JSON")
+            continue
+        yield row_number, record
+
+
+async def parse_vcard(lines: AsyncIterator[str]):
+    row_number = 0
+    card = None
+    previous = None
+
+    def apply(card: dict, line: str):
+        name, _, value = line.partition(":")
+        prop = name.split(";")[0].split(".")[-1].upper()
+        if prop == "N":
+            parts = value.split(";")
+            card.setdefault("last_name", parts[0].strip())
+            if len(parts) > 1:
+                card.setdefault("first_name", parts[1].strip())
+        elif prop == "FN":
+            card["_fn"] = value.strip()
+        elif prop == "TEL":
+            value = value.strip()
+            if value.lower().startswith("tel:"):
+                value = value[4:]
+            card.setdefault("phone", value)
+        elif prop == "EMAIL":
+            card.setdefault("email", value.strip())
+
+    async for line in lines:
+        line = line.rstrip("\r\n")
+        # Lignes repliées (RFC 6350 §3.2) : la continuation commence par un blanc
+        if line[:1] in (" ", "\t") and previous is not None:
+            previous += line[1:]
+            continue
+        if previous is not None and card is not None:
+            apply(card, previous)
+        previous = None
+        upper = line.strip().upper()
+        if upper == "BEGIN:VCARD":
+            row_number += 1
+            card = {}
+        elif upper == "END:VCARD":
+            if card is not None:
+                fn = card.pop("_fn", "")
+                if fn and not card.get("first_name") and not card.get("last_name"):
+                    first, _, last = fn.rpartition(" ")
+                    card["first_name"], card["last_name"] = (first or last), last
+                yield row_number, card
+            card = None
+        elif card is not None:
+            previous = line
+
+
+PARSERS = {"csv": parse_csv, "ndjson": parse_ndjson, "vcard": parse_vcard}
+
+
+async def import_stream(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    validate: Callable[[dict], Dict[str, Optional[str]]],
+    insert_batch: Callable[[List[dict]], Awaitable[None]],
+    batch_size: int = 1000,
+) -> dict:
+    """Valide et insère un flux de contacts par lots ; renvoie le rapport d'import.
+
+    `validate` transforme un enregistrement en contact validé (dict des champs
+    de ContactBase) ou lève RowError, dont le détail est repris dans le rapport.
+    """
+    started = time.perf_counter()
+    received = imported = failed = batches = 0
+    errors: List[dict] = []
+    batch: List[dict] = []
+
+    def report_error(row: int, detail):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row, "errors": detail})
+
+    async for row_number, record in PARSERS[fmt](iter_lines(chunks)):
+        received += 1
+        if isinstance(record, Exception):
+            report_error(row_number, str(record))
+            continue
+        try:
+            batch.append(validate(record))
+        except RowError as e:
+            report_error(row_number, e.args[0])
+            continue
+        if len(batch) >= batch_size:
+            await insert_batch(batch)
+            imported += len(batch)
+            batches += 1
+            batch = []
+
+    if batch:
+        await insert_batch(batch)
+        imported += len(batch)
+        batches += 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        "format": fmt,
+        "received": received,
+        "imported": imported,
+        "failed": failed,
+        "batches": batches,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "rows_per_second": round(received / elapsed, 1) if elapsed > 0 else None,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
+
+
+def normalize_record(record: dict) -> dict:
+    """Nettoie les valeurs texte ; un email vide devient absent"""
+    cleaned = {}
+    for key in ("first_name", "last_name", "phone", "email"):
+        value = record.get(key)
+        if isinstance(value, str):
+            value = value.strip()
+        cleaned[key] = value
+    if not cleaned["email"]:
+        cleaned["email"] = None
+    return cleaned
+
+
+def validation_messages(exc) -> List[dict]:
+    """Erreurs Pydantic réduites à un format JSON stable (champ, message)"""
+    return [
+        {"field": ".".join(str(part) for part in err.get("loc", ())), "message": err.get("msg", "")}
+        for err in exc.errors()
+    ]
+
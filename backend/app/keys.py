@@ -0,0 +1,123 @@
+import os
+import secrets
+import sys
+import time
+from typing import Dict, Optional
+
+from jose import JWTError, jwt
+
+# Clés de signature des jetons JWT, identiques pour tous les workers et stables
+# entre deux redémarrages. Plusieurs clés peuvent coexister : la première signe,
+# les suivantes ne servent plus qu'à vérifier les jetons déjà émis (rotation).
+# L'en-tête `kid` du jeton désigne la clé utilisée.
+#
+# Sources, par ordre de priorité :
+#   SECRET_KEYS="kid1:secret1,kid2:secret2"   (première = clé active)
+#   SECRET_KEY="secret"                         (kid "default")
+#   fichier de clés (une ligne "kid:secret" par clé), créé au premier lancement
+
+DEFAULT_KID = "default"
+
+
+class KeyRing:
+    def __init__(self, keys: Dict[str, str], active_kid: str, algorithm: str = "HS256"):
+        if active_kid not in keys:
+            raise ValueError(f"Clé active inconnue : {active_kid}")
+        self.keys = keys
+        self.active_kid = active_kid
+        self.algorithm = algorithm
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(claims, self.keys[self.active_kid], algorithm=self.algorithm,
+                          headers={"kid": self.active_kid})
+
+    def decode(self, token: str) -> dict:
+        """Vérifie la signature avec la clé désignée par `kid` (JWTError sinon)"""
+        kid = jwt.get_unverified_header(token).get("kid") or self.active_kid
+        secret = self.keys.get(kid)
+        if secret is None:
+            raise JWTError(f"Clé de signature inconnue : {kid}")
+        return jwt.decode(token, secret, algorithms=[self.algorithm])
+
+
+def _parse(lines) -> Dict[str, str]:
+    keys = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        kid, _, secret = line.partition(":")
+        if not secret:
+            raise ValueError("Format de clé attendu : kid:secret")
+        keys[kid.strip()] = secret.strip()
+    return keys
+
+
+def new_kid() -> str:
+    return time.strftime("k%Y%m%d%H%M%S") + secrets.token_hex(2)
+
+
+def _write(path: str, keys: Dict[str, str]):
+    # Écriture atomique, lisible par le seul propriétaire
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write("# Clés JWT : la première signe, les autres vérifient seulement\n")
+        for kid, secret in keys.items():
+            f.write(f"{kid}:{secret}\n")
+    os.replace(tmp, path)
+
+
+def read_key_file(path: str, create: bool = True) -> Dict[str, str]:
+    """Lit le fichier de clés ; le crée avec une clé aléatoire s'il n'existe pas.
+    O_EXCL garantit qu'un seul processus le crée quand plusieurs démarrent ensemble."""
+    if create and not os.path.exists(path):
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{new_kid()}:{secrets.token_urlsafe(32)}\n")
+    for _ in range(50):
+        with open(path) as f:
+            keys = _parse(f)
+        if keys:
+            return keys
+        # Fichier en cours d'écriture par un autre worker
+        time.sleep(0.01)
+    raise ValueError(f"Aucune clé dans {path}")
+
+
+def load_keyring(algorithm: str = "HS256", key_file: Optional[str] = None) -> KeyRing:
+    if os.getenv("SECRET_KEYS"):
+        keys = _parse(os.environ["SECRET_KEYS"].split(","))
+    elif os.getenv("SECRET_KEY"):
+        keys = {DEFAULT_KID: os.environ["SECRET_KEY"]}
+    else:
+        keys = read_key_file(key_file or "secret.key")
+    return KeyRing(keys, next(iter(keys)), algorithm)
+
+
+def rotate(path: str, keep: int = 2) -> str:
+    """Ajoute une nouvelle clé active ; garde les `keep` - 1 précédentes pour
+    vérifier les jetons encore valides"""
+    keys = read_key_file(path)
+    kid = new_kid()
+    rotated = {kid: secrets.token_urlsafe(32)}
+    for old_kid, secret in list(keys.items())[:max(keep - 1, 0)]:
+        rotated[old_kid] = secret
+    _write(path, rotated)
+    return kid
+
+
+if __name__ == "__main__":
+    # Usage : python -m app.keys rotate [fichier] [clés à conserver]
+    if len(sys.argv) < 2 or sys.argv[1] != "rotate":
+        print("Usage : python -m app.keys rotate [secret.key] [2]")
+        sys.exit(2)
+    path = sys.argv[2] if len(sys.argv) > 2 else "secret.key"
+    keep = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    kid = rotate(path, keep)
+    print(f"✅ Nouvelle clé active {kid} dans {path} ({keep} clés conservées)")
+    print("   Redémarrer les workers pour la prendre en compte")
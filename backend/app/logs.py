@@ -0,0 +1,132 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Identifiant de la requête en cours, repris dans chaque enregistrement
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Attributs standard d'un LogRecord : tout le reste vient de `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Capture l'id de requête dans le thread appelant, avant la mise en file"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Le message est figé ici (les arguments peuvent changer ensuite) mais le
+        # JSON n'est produit que par le thread d'écriture
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = None, stream=None) -> logging.Logger:
+    """Configure le logger "contacts" : file d'attente en mémoire + thread
+    d'écriture, pour que les requêtes n'attendent jamais stdout.
+
+    Le niveau vient de LOG_LEVEL (INFO par défaut). Les appels sous le niveau
+    actif sont écartés avant toute mise en forme.
+    """
+    global _listener
+    logger = logging.getLogger("contacts")
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    logger.setLevel(level)
+    logger.propagate = False
+
+    if _listener is None:
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JSONFormatter())
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        handler = _QueueHandler(log_queue)
+        handler.addFilter(RequestIdFilter())
+        logger.handlers = [handler]
+    return logger
+
+
+class AccessLogMiddleware:
+    """Middleware ASGI : id de requête (X-Request-ID) et une ligne de log par
+    requête avec la route, le statut, la durée et la taille de la réponse"""
+
+    def __init__(self, app, logger_name: str = "contacts.access"):
+        self.app = app
+        self.logger = logging.getLogger(logger_name)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        start = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                message["headers"] = [*message.get("headers", ()), (b"x-request-id", request_id.encode("latin-1"))]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if self.logger.isEnabledFor(logging.INFO):
+                route = scope.get("route")
+                self.logger.info("request", extra={
+                    "method": scope["method"],
+                    "route": getattr(route, "path", scope["path"]),
+                    "status": response["status"],
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                    "bytes": response["bytes"],
+                })
+            request_id_var.reset(token)
@@ -0,0 +1,305 @@
+import bisect
+import contextvars
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+# Métriques au format texte Prometheus, sans dépendance externe. Chaque
+# observation ne coûte qu'une recherche dichotomique et un verrou : la mise en
+# forme n'a lieu qu'au moment où /metrics est interrogé.
+
+# Starlette ajoute "; charset=utf-8"
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        lines = self._header()
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, labels=()):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [compteurs par seau (le dernier = +Inf), somme, total]
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        with self._lock:
+            items = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._values.items()]
+        lines = self._header()
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Ensemble des métriques exposées ; les collecteurs sont des fonctions
+    appelées uniquement au moment de l'export (état du pool, des caches...)"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collect):
+        """`collect()` renvoie des tuples (nom, type, aide, {labels: valeur})"""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for name, kind, documentation, samples in collect():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples.items():
+                    label_names = [key for key, _ in labels]
+                    label_values = [value for _, value in labels]
+                    lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# ===========================================
+# REQUÊTES SQL
+# ===========================================
+
+class QueryStats:
+    """Compteur de requêtes SQL de la requête HTTP en cours. L'objet est
+    partagé (et non copié) avec les threads DB via le contexte"""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+query_stats_var = contextvars.ContextVar("query_stats", default=None)
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH", "PRAGMA", "CREATE", "DROP",
+               "ALTER", "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "ANALYZE"}
+_FIRST_WORD = re.compile(r"\s*(\w+)")
+_WHITESPACE = re.compile(r"\s+")
+
+_query_duration = None
+_slow_queries = None
+_slow_query_seconds = None
+_db_logger = logging.getLogger("contacts.db")
+
+
+def _operation(sql: str) -> str:
+    match = _FIRST_WORD.match(sql)
+    word = match.group(1).upper() if match else ""
+    return word if word in _OPERATIONS else "OTHER"
+
+
+def _record_query(sql: str, elapsed: float, rows: int = None):
+    operation = _operation(sql)
+    _query_duration.observe(elapsed, (operation,))
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+    if _slow_query_seconds is not None and elapsed >= _slow_query_seconds:
+        _slow_queries.inc((operation,))
+        _db_logger.warning("slow query", extra={
+            "sql": _WHITESPACE.sub(" ", sql).strip()[:500],
+            "duration_ms": round(elapsed * 1000, 2),
+            "rows": rows,
+        })
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    # Seule l'exécution est mesurée ; la lecture des lignes (fetch*) ne l'est pas
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record_query(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record_query(sql, time.perf_counter() - start, self.rowcount)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connexion dont chaque requête est chronométrée et comptée"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def instrument_queries(registry: Registry, slow_query_ms: float = None):
+    """Déclare les métriques SQL et renvoie la classe de connexion à utiliser
+    comme `factory` de sqlite3.connect. slow_query_ms=None désactive le journal
+    des requêtes lentes"""
+    global _query_duration, _slow_queries, _slow_query_seconds
+    _query_duration = registry.histogram(
+        "contacts_db_query_duration_seconds", "Durée d'exécution des requêtes SQLite", ("operation",)
+    )
+    _slow_queries = registry.counter(
+        "contacts_db_slow_queries_total", "Requêtes SQLite au-delà du seuil de lenteur", ("operation",)
+    )
+    _slow_query_seconds = slow_query_ms / 1000 if slow_query_ms is not None and slow_query_ms > 0 else None
+    return InstrumentedConnection
+
+
+# ===========================================
+# MIDDLEWARE HTTP
+# ===========================================
+
+class MetricsMiddleware:
+    """Middleware ASGI : latence, taille de réponse et nombre de requêtes SQL
+    par route (gabarit de route, pas le chemin brut), requêtes en cours"""
+
+    def __init__(self, app, registry: Registry):
+        self.app = app
+        self.in_flight = registry.gauge("contacts_http_requests_in_flight", "Requêtes HTTP en cours de traitement")
+        self.requests = registry.counter(
+            "contacts_http_requests_total", "Requêtes HTTP traitées", ("method", "route", "status")
+        )
+        self.latency = registry.histogram(
+            "contacts_http_request_duration_seconds", "Durée des requêtes HTTP", ("method", "route")
+        )
+        self.size = registry.histogram(
+            "contacts_http_response_size_bytes", "Taille des corps de réponse", ("method", "route"), SIZE_BUCKETS
+        )
+        self.queries = registry.histogram(
+            "contacts_http_db_queries", "Requêtes SQLite par requête HTTP", ("method", "route"), COUNT_BUCKETS
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats_var.set(stats)
+        response = {"status": 500, "bytes": 0}
+
+        async def send_and_measure(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        self.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight.dec()
+            query_stats_var.reset(token)
+            route = scope.get("route")
+            # Chemins inconnus regroupés pour borner le nombre de séries
+            labels = (scope["method"], getattr(route, "path", "<unmatched>"))
+            self.requests.inc((*labels, str(response["status"])))
+            self.latency.observe(elapsed, labels)
+            self.size.observe(response["bytes"], labels)
+            self.queries.observe(stats.count, labels)
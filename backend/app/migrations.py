@@ -0,0 +1,166 @@
+import logging
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from typing import List
+
+from .dedup import add_dedup_keys
+from .search import create_search_index, scope_search_index
+from .stats import create_user_count, create_user_stats
+from .sync import create_profile_feed, create_sync_schema
+
+# Migrations versionnées du schéma SQLite. La table schema_version garde une
+# ligne par migration appliquée ; seules les migrations manquantes tournent, une
+# seule fois, sous un verrou de fichier partagé par tous les processus.
+#
+# Ne jamais modifier une migration déjà livrée : en ajouter une nouvelle.
+
+logger = logging.getLogger("contacts.db")
+
+
+def _create_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contacts_user_id ON contacts(user_id)")
+
+
+def _cursor_pagination_index(cursor):
+    # Pagination par curseur sans tri ni OFFSET
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_contacts_user_created
+        ON contacts(user_id, created_at DESC, id DESC)
+    ''')
+
+
+# (version, description, fonction(cursor)). Les premières reprennent l'ancien
+# init_db() : elles sont idempotentes et s'appliquent aussi aux bases existantes.
+MIGRATIONS = [
+    (1, "Tables users et contacts", _create_tables),
+    (2, "Index de pagination par curseur", _cursor_pagination_index),
+    (3, "Index plein texte FTS5 de la recherche", create_search_index),
+    (4, "Versions et suppressions pour la synchronisation", create_sync_schema),
+    (5, "Clés de détection des doublons", add_dedup_keys),
+    (6, "Compteurs de contacts par utilisateur", create_user_stats),
+    (7, "Compteur d'utilisateurs", create_user_count),
+    (8, "Flux des changements de profil", create_profile_feed),
+    (9, "Index de recherche limité à chaque utilisateur", scope_search_index),
+]
+
+
+@contextmanager
+def file_lock(path: str):
+    """Verrou exclusif entre processus (fcntl, ou msvcrt sous Windows)"""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK abandonne après 10 s
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Dernière migration appliquée (0 pour une base neuve ou antérieure aux migrations)"""
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0]
+
+
+def _apply(conn: sqlite3.Connection, version: int, description: str, migration) -> dict:
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    # DDL transactionnel : une migration est appliquée entièrement ou pas du tout
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        migration(cursor)
+        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        cursor.execute(
+            "INSERT INTO schema_version (version, description, duration_ms) VALUES (?, ?, ?)",
+            (version, description, duration_ms)
+        )
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+    logger.info("Migration %d appliquée : %s (%.1f ms)", version, description, duration_ms)
+    return {"version": version, "description": description, "duration_ms": duration_ms}
+
+
+def migrate(database: str, lock_path: str = None) -> List[dict]:
+    """Applique les migrations manquantes ; renvoie celles qui ont été appliquées.
+    Le cas courant (schéma à jour) ne coûte qu'une lecture, sans verrou."""
+    conn = sqlite3.connect(database, timeout=30, isolation_level=None)
+    try:
+        if schema_version(conn) >= latest_version():
+            return []
+        with file_lock(lock_path or f"{database}.migrate.lock"):
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    duration_ms REAL
+                )
+            ''')
+            # Un autre processus a pu migrer pendant l'attente du verrou
+            current = schema_version(conn)
+            return [
+                _apply(conn, version, description, migration)
+                for version, description, migration in MIGRATIONS
+                if version > current
+            ]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    # Usage : python -m app.migrations [contacts.db]
+    database = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CONTACTS_DB", "contacts.db")
+    applied = migrate(database)
+    for migration in applied:
+        print(f"✅ {migration['version']:>3}  {migration['description']} ({migration['duration_ms']} ms)")
+    print(f"Schéma de {database} en version {latest_version()}"
+          + ("" if applied else " (déjà à jour)"))
@@ -10,7 +10,8 @@ class User(Base):
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(255), nullable=False)
+    # Même colonne que le schéma de main.py / app/sqlalchemy_repository.py
+    hashed_password = Column("password", String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     contacts = relationship("Contact", back_populates="owner", cascade="all, delete-orphan")
@@ -0,0 +1,200 @@
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional
+
+from .dedup import contact_keys
+from .search import search_contacts as _search_contacts
+
+# Accès aux utilisateurs et aux contacts indépendant du moteur : les routes
+# manipulent un dépôt (repository) et des dict, jamais du SQL. Deux
+# implémentations : sqlite3 brut (ci-dessous) et SQLAlchemy Core
+# (app/sqlalchemy_repository.py, compatible PostgreSQL).
+
+USER_FIELDS = ("id", "first_name", "last_name", "email", "created_at")
+CONTACT_FIELDS = ("id", "user_id", "first_name", "last_name", "phone", "email", "created_at")
+CONTACT_INPUT_FIELDS = ("first_name", "last_name", "phone", "email")
+# Clés normalisées de détection des doublons (app/dedup.py), calculées à l'écriture
+CONTACT_KEY_FIELDS = ("phone_key", "email_key", "name_key")
+
+
+class DuplicateEmail(Exception):
+    """Un utilisateur existe déjà avec cet email"""
+
+
+class ContactRepository(ABC):
+    """Interface commune. Les méthodes ne valident pas la transaction :
+    c'est à l'appelant (Database.transaction, SQLAlchemyStore.transaction) de le faire."""
+
+    # Utilisateurs
+    @abstractmethod
+    def get_user(self, user_id: int, email: str = None) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def get_user_by_email(self, email: str) -> Optional[dict]:
+        """Utilisateur avec son hachage de mot de passe (clé "password")"""
+
+    @abstractmethod
+    def create_user(self, first_name: str, last_name: str, email: str, password: str) -> dict:
+        """Lève DuplicateEmail si l'email est déjà pris"""
+
+    @abstractmethod
+    def update_password(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """Remplace le hachage seulement s'il vaut encore old_hash"""
+
+    # Contacts
+    @abstractmethod
+    def list_contacts(self, user_id: int, limit: int, skip: int = 0, after=None) -> List[dict]:
+        """Plus récents d'abord ; `after` = (created_at, id) du dernier contact de la page précédente"""
+
+    @abstractmethod
+    def get_contact(self, user_id: int, contact_id: int) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def create_contacts(self, user_id: int, contacts: Iterable[dict]) -> List[dict]:
+        """Insertion groupée ; renvoie les contacts créés dans l'ordre d'entrée"""
+
+    @abstractmethod
+    def update_contact(self, user_id: int, contact_id: int, fields: dict) -> Optional[dict]:
+        """None si le contact n'existe pas ou appartient à un autre utilisateur"""
+
+    @abstractmethod
+    def delete_contacts(self, user_id: int, contact_ids: Iterable[int]) -> List[int]:
+        """Renvoie les ids effectivement supprimés"""
+
+    @abstractmethod
+    def search_contacts(self, user_id: int, query: str, limit: int) -> List[dict]:
+        ...
+
+    # Raccourcis
+    def create_contact(self, user_id: int, contact: dict) -> dict:
+        return self.create_contacts(user_id, [contact])[0]
+
+    def delete_contact(self, user_id: int, contact_id: int) -> bool:
+        return bool(self.delete_contacts(user_id, [contact_id]))
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SQLiteRepository(ContactRepository):
+    """Implémentation sqlite3. Les requêtes sont paramétrées et toujours
+    identiques pour une même forme d'appel : le cache de requêtes préparées
+    de sqlite3 les réutilise."""
+
+    # 8 paramètres par ligne, sous la limite de 32766 variables de SQLite
+    INSERT_CHUNK = 500
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def _one(self, sql: str, params=()) -> Optional[dict]:
+        row = self.conn.execute(sql, params).fetchone()
+        return dict(row) if row is not None else None
+
+    def _all(self, sql: str, params=()) -> List[dict]:
+        return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def get_user(self, user_id, email=None):
+        if email is None:
+            return self._one("SELECT id, first_name, last_name, email, created_at FROM users WHERE id = ?", (user_id,))
+        return self._one(
+            "SELECT id, first_name, last_name, email, created_at FROM users WHERE id = ? AND email = ?",
+            (user_id, email)
+        )
+
+    def get_user_by_email(self, email):
+        return self._one(
+            "SELECT id, first_name, last_name, email, password, created_at FROM users WHERE email = ?",
+            (email,)
+        )
+
+    def create_user(self, first_name, last_name, email, password):
+        try:
+            return self._one(
+                """INSERT INTO users (first_name, last_name, email, password) VALUES (?, ?, ?, ?)
+                   RETURNING id, first_name, last_name, email, created_at""",
+                (first_name, last_name, email, password)
+            )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateEmail(email) from e
+
+    def update_password(self, user_id, old_hash, new_hash):
+        cursor = self.conn.execute(
+            "UPDATE users SET password = ? WHERE id = ? AND password = ?", (new_hash, user_id, old_hash)
+        )
+        return cursor.rowcount > 0
+
+    def list_contacts(self, user_id, limit, skip=0, after=None):
+        if after is not None:
+            created_at, last_id = after
+            return self._all(
+                """SELECT id, user_id, first_name, last_name, phone, email, created_at
+                   FROM contacts WHERE user_id = ? AND (created_at, id) < (?, ?)
+                   ORDER BY created_at DESC, id DESC
+                   LIMIT ?""",
+                (user_id, created_at, last_id, limit)
+            )
+        return self._all(
+            """SELECT id, user_id, first_name, last_name, phone, email, created_at
+               FROM contacts WHERE user_id = ?
+               ORDER BY created_at DESC, id DESC
+               LIMIT ? OFFSET ?""",
+            (user_id, limit, skip)
+        )
+
+    def get_contact(self, user_id, contact_id):
+        return self._one(
+            """SELECT id, user_id, first_name, last_name, phone, email, created_at
+               FROM contacts WHERE id = ? AND user_id = ?""",
+            (contact_id, user_id)
+        )
+
+    def create_contacts(self, user_id, contacts):
+        created = []
+        for chunk in _chunks(list(contacts), self.INSERT_CHUNK):
+            # Un seul INSERT multi-lignes par paquet
+            values = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?)"] * len(chunk))
+            params = []
+            for contact in chunk:
+                fields = {field: contact.get(field) for field in CONTACT_INPUT_FIELDS}
+                keys = contact_keys(fields)
+                params.extend((user_id, *fields.values(), *(keys[field] for field in CONTACT_KEY_FIELDS)))
+            rows = self._all(
+                f"""INSERT INTO contacts (user_id, first_name, last_name, phone, email,
+                                          phone_key, email_key, name_key) VALUES {values}
+                    RETURNING id, user_id, first_name, last_name, phone, email, created_at""",
+                params
+            )
+            # L'ordre de RETURNING n'est pas garanti ; les ids suivent l'ordre d'insertion
+            created.extend(sorted(rows, key=lambda row: row["id"]))
+        return created
+
+    def update_contact(self, user_id, contact_id, fields):
+        values = {field: fields[field] for field in CONTACT_INPUT_FIELDS if field in fields}
+        if not values:
+            return self.get_contact(user_id, contact_id)
+        values.update(contact_keys(values))
+        return self._one(
+            f"""UPDATE contacts SET {", ".join(f"{field} = ?" for field in values)}
+                WHERE id = ? AND user_id = ?
+                RETURNING id, user_id, first_name, last_name, phone, email, created_at""",
+            (*values.values(), contact_id, user_id)
+        )
+
+    def delete_contacts(self, user_id, contact_ids):
+        deleted = []
+        for chunk in _chunks(list(contact_ids), self.INSERT_CHUNK):
+            placeholders = ",".join("?" * len(chunk))
+            deleted.extend(row[0] for row in self.conn.execute(
+                f"DELETE FROM contacts WHERE user_id = ? AND id IN ({placeholders}) RETURNING id",
+                (user_id, *chunk)
+            ).fetchall())
+        return deleted
+
+    def search_contacts(self, user_id, query, limit):
+        # Index FTS5 si disponible, LIKE sinon (voir app/search.py)
+        return [dict(row) for row in _search_contacts(self.conn, user_id, query, limit)]
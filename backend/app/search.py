@@ -0,0 +1,298 @@
+import logging
+import sqlite3
+import sys
+import threading
+from typing import Optional
+
+from .cache import TTLCache
+
+# Index plein texte (trigrammes) synchronisé avec la table contacts par triggers.
+# Le tokenizer trigram permet la recherche de sous-chaînes, comme l'ancien
+# LIKE '%q%', mais servie par un index.
+#
+# L'index est partagé par tous les utilisateurs : chaque ligne porte dans la
+# colonne owner un jeton propre à son utilisateur, exigé par le MATCH. Un
+# trigramme courant ne parcourt ainsi que les contacts de l'utilisateur, pas
+# ceux de toute la table.
+FTS_TABLE = "contacts_fts"
+FTS_SOURCE = "contacts_fts_source"
+MIN_TRIGRAM_LENGTH = 3
+
+CONTACT_COLUMNS = "c.id, c.user_id, c.first_name, c.last_name, c.phone, c.email, c.created_at"
+INDEXED_COLUMNS = "first_name, last_name, phone, email"
+# Filtre de colonnes FTS5 : les mots cherchés ne portent pas sur owner
+_MATCH_COLUMNS = "{" + INDEXED_COLUMNS.replace(",", "") + "}"
+
+# Jeton owner : user_id écrit en 3 chiffres de base 6400, pris dans la zone
+# Unicode à usage privé. Un seul trigramme, qui n'apparaît dans aucun nom.
+_OWNER_BASE = 6400
+_OWNER_FIRST_CHAR = 0xE000
+
+
+def owner_token(user_id: int) -> str:
+    digits = (user_id // _OWNER_BASE ** 2 % _OWNER_BASE, user_id // _OWNER_BASE % _OWNER_BASE, user_id % _OWNER_BASE)
+    return "".join(chr(_OWNER_FIRST_CHAR + digit) for digit in digits)
+
+
+def _owner_sql(user_id: str) -> str:
+    return (f"char({_OWNER_FIRST_CHAR} + {user_id} / {_OWNER_BASE ** 2} % {_OWNER_BASE}, "
+            f"{_OWNER_FIRST_CHAR} + {user_id} / {_OWNER_BASE} % {_OWNER_BASE}, "
+            f"{_OWNER_FIRST_CHAR} + {user_id} % {_OWNER_BASE})")
+
+
+def _index_row(row: str) -> str:
+    return f"{row}.id, {row}.first_name, {row}.last_name, {row}.phone, {row}.email, {_owner_sql(f'{row}.user_id')}"
+
+
+_SCHEMA = (
+    # Contenu externe : la vue fournit la colonne owner pour 'rebuild'
+    f"""CREATE VIEW IF NOT EXISTS {FTS_SOURCE} AS
+        SELECT {_index_row("contacts")} AS owner FROM contacts""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {INDEXED_COLUMNS}, owner,
+        content='{FTS_SOURCE}', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {INDEXED_COLUMNS}, owner) VALUES ({_index_row("new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {INDEXED_COLUMNS}, owner) VALUES ('delete', {_index_row("old")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS contacts_fts_update
+        AFTER UPDATE OF user_id, first_name, last_name, phone, email ON contacts BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {INDEXED_COLUMNS}, owner) VALUES ('delete', {_index_row("old")});
+        INSERT INTO {FTS_TABLE}(rowid, {INDEXED_COLUMNS}, owner) VALUES ({_index_row("new")});
+    END""",
+)
+
+# Présence de l'index, vérifiée une seule fois par processus
+_fts_available: Optional[bool] = None
+
+logger = logging.getLogger("contacts.search")
+
+
+def create_search_index(cursor) -> bool:
+    """Crée l'index FTS5 et ses triggers ; le remplit s'il vient d'être créé.
+
+    Renvoie False si SQLite n'a pas été compilé avec FTS5/trigram : la
+    recherche retombe alors sur LIKE.
+    """
+    global _fts_available
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,))
+    existed = cursor.fetchone() is not None
+    try:
+        for statement in _SCHEMA:
+            cursor.execute(statement)
+    except sqlite3.OperationalError as e:
+        logger.warning("Index plein texte indisponible (%s), recherche par LIKE", e)
+        _fts_available = False
+        return False
+    if not existed:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _fts_available = True
+    return True
+
+
+def scope_search_index(cursor) -> bool:
+    """Migration : remplace l'index commun à tous les utilisateurs (sans
+    colonne owner) par l'index limité à chaque utilisateur"""
+    cursor.execute("SELECT sql FROM sqlite_master WHERE name = ?", (FTS_TABLE,))
+    row = cursor.fetchone()
+    if row is not None and "owner" not in row[0]:
+        for trigger in ("contacts_fts_insert", "contacts_fts_delete", "contacts_fts_update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(f"DROP TABLE {FTS_TABLE}")
+    return create_search_index(cursor)
+
+
+def rebuild_search_index(conn: sqlite3.Connection):
+    """Reconstruit entièrement l'index à partir de la table contacts"""
+    cursor = conn.cursor()
+    if not create_search_index(cursor):
+        raise RuntimeError("FTS5 (tokenizer trigram) non disponible dans cette version de SQLite")
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    conn.commit()
+
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    global _fts_available
+    if _fts_available is None:
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).fetchone()
+        # Index d'avant la colonne owner (base pas encore migrée) : LIKE
+        _fts_available = row is not None and "owner" in row[0]
+    return _fts_available
+
+
+def build_match_expression(query: str) -> Optional[str]:
+    """Chaque mot devient une sous-chaîne exigée (ET implicite entre les mots).
+
+    Le tokenizer trigram ne sait pas servir un mot de moins de 3 caractères :
+    None signale qu'il faut retomber sur LIKE.
+    """
+    terms = query.split()
+    if not terms or any(len(term) < MIN_TRIGRAM_LENGTH for term in terms):
+        return None
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def user_match_expression(user_id: int, match: str) -> str:
+    """Expression MATCH limitée aux contacts de user_id"""
+    return f'owner : "{owner_token(user_id)}" AND {_MATCH_COLUMNS} : ({match})'
+
+
+def search_contacts(conn: sqlite3.Connection, user_id: int, query: str, limit: int):
+    """Contacts de l'utilisateur correspondant à `query`, les plus pertinents d'abord"""
+    cursor = conn.cursor()
+    match = build_match_expression(query) if has_search_index(conn) else None
+    if match is not None:
+        # Jeton de l'utilisateur dans le MATCH : seuls ses contacts sont lus.
+        # Les noms pèsent plus lourd que le téléphone et l'email dans le classement
+        cursor.execute(
+            f"""SELECT {CONTACT_COLUMNS}
+                FROM {FTS_TABLE} JOIN contacts c ON c.id = {FTS_TABLE}.rowid
+                WHERE {FTS_TABLE} MATCH ? AND c.user_id = ?
+                ORDER BY bm25({FTS_TABLE}, 4.0, 4.0, 1.0, 2.0, 0.0), c.last_name, c.first_name
+                LIMIT ?""",
+            (user_match_expression(user_id, match), user_id, limit)
+        )
+    else:
+        search_pattern = f"%{query}%"
+        cursor.execute(
+            f"""SELECT {CONTACT_COLUMNS}
+                FROM contacts c
+                WHERE c.user_id = ?
+                AND (c.first_name LIKE ? OR c.last_name LIKE ? OR c.phone LIKE ? OR c.email LIKE ?)
+                ORDER BY c.last_name, c.first_name
+                LIMIT ?""",
+            (user_id, search_pattern, search_pattern, search_pattern, search_pattern, limit)
+        )
+    return cursor.fetchall()
+
+
+# ===========================================
+# CACHE DES RÉSULTATS
+# ===========================================
+
+SEARCH_FIELDS = ("first_name", "last_name", "phone", "email")
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def normalize_query(query: str) -> str:
+    # LIKE et le tokenizer trigram ignorent tous deux la casse ASCII
+    return " ".join(query.split()).translate(_ASCII_LOWER)
+
+
+def _uses_index(query: str) -> bool:
+    return _fts_available is not False and build_match_expression(query) is not None
+
+
+def _matches(row: dict, query: str, indexed: bool) -> bool:
+    """Reproduit en mémoire le filtre SQL de search_contacts"""
+    if indexed:
+        # FTS5 : chaque mot doit apparaître dans au moins un champ (casse Unicode ignorée)
+        values = [(row[field] or "").lower() for field in SEARCH_FIELDS]
+        return all(any(term in value for value in values) for term in query.lower().split())
+    # LIKE : sous-chaîne, casse ignorée pour l'ASCII seulement
+    values = [(row[field] or "").translate(_ASCII_LOWER) for field in SEARCH_FIELDS]
+    return any(query in value for value in values)
+
+
+def _can_refine(prefix: str, query: str) -> bool:
+    """Les résultats de `query` sont-ils forcément inclus dans ceux de `prefix` ?"""
+    if not query.startswith(prefix):
+        return False
+    indexed = _uses_index(query)
+    if indexed != _uses_index(prefix):
+        return False
+    # Avec LIKE, % et _ sont des jokers : pas d'équivalent en mémoire
+    return indexed or not any(char in query for char in "%_")
+
+
+class SearchCache:
+    """Résultats de recherche par (utilisateur, génération, requête normalisée).
+
+    Chaque écriture sur les contacts d'un utilisateur incrémente sa génération :
+    les entrées précédentes deviennent inaccessibles (puis sortent du LRU), et un
+    résultat calculé pendant l'écriture n'est pas enregistré. Une requête plus
+    longue qu'une requête déjà en cache est filtrée en mémoire, sans SQL. Les
+    résultats ainsi affinés gardent l'ordre de pertinence de la requête courte.
+    """
+
+    def __init__(self, maxsize: int = 5000, ttl: float = 30.0, min_prefix: int = 2):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.min_prefix = min_prefix
+        self.hits = 0
+        self.refinements = 0
+        self.misses = 0
+        self.stale = 0
+
+    def generation(self, user_id: int) -> int:
+        return self._generations.get(user_id, 0)
+
+    def bump(self, user_id: int):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def lookup(self, user_id: int, query: str, limit: int):
+        """Renvoie (résultats ou None, génération à repasser à store())"""
+        generation = self.generation(user_id)
+        entry = self._cache.get((user_id, generation, query))
+        if entry is not None:
+            rows, complete = entry
+            if complete or len(rows) >= limit:
+                self.hits += 1
+                return rows[:limit], generation
+
+        # Préfixe déjà en cache avec tous ses résultats : filtrage en mémoire
+        for end in range(len(query) - 1, self.min_prefix - 1, -1):
+            prefix = query[:end].rstrip()
+            entry = self._cache.peek((user_id, generation, prefix))
+            if entry is None or not entry[1] or not _can_refine(prefix, query):
+                continue
+            indexed = _uses_index(query)
+            rows = [row for row in entry[0] if _matches(row, query, indexed)]
+            self._cache.set((user_id, generation, query), (rows, True))
+            self.refinements += 1
+            return rows[:limit], generation
+
+        self.misses += 1
+        return None, generation
+
+    def store(self, user_id: int, generation: int, query: str, rows: list, limit: int):
+        if generation != self.generation(user_id):
+            # Écriture survenue pendant la recherche : résultat peut-être périmé
+            self.stale += 1
+            return
+        self._cache.set((user_id, generation, query), (rows, len(rows) < limit))
+
+    def stats(self) -> dict:
+        cache = self._cache.stats()
+        lookups = self.hits + self.refinements + self.misses
+        return {
+            "size": cache["size"],
+            "maxsize": cache["maxsize"],
+            "ttl": cache["ttl"],
+            "hits": self.hits,
+            "refinements": self.refinements,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.refinements) / lookups, 4) if lookups else 0.0,
+            "stale": self.stale,
+            "evictions": cache["evictions"],
+            "expirations": cache["expirations"],
+        }
+
+
+if __name__ == "__main__":
+    # Usage : python -m app.search [chemin/vers/contacts.db]
+    database = sys.argv[1] if len(sys.argv) > 1 else "contacts.db"
+    conn = sqlite3.connect(database)
+    rebuild_search_index(conn)
+    count = conn.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}").fetchone()[0]
+    conn.close()
+    print(f"✅ Index de recherche reconstruit ({count} contacts) : {database}")
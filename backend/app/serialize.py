@@ -0,0 +1,60 @@
+import json
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : repli sur json
+    orjson = None
+
+# Sérialisation directe des lignes SQLite, sans validation Pydantic en sortie.
+# Le JSON produit est identique, octet pour octet, à celui de FastAPI avec
+# response_model=ContactResponse : mêmes clés dans le même ordre, datetime ISO
+# 8601, séparateurs compacts, UTF-8 non échappé.
+
+CONTACT_FIELDS = ("first_name", "last_name", "phone", "email", "id", "user_id", "created_at")
+
+
+def _iso(created_at):
+    return created_at.replace(" ", "T", 1) if isinstance(created_at, str) else created_at
+
+
+def contact_dict(row) -> dict:
+    """Ligne contacts (sqlite3.Row ou dict) -> dict au format ContactResponse"""
+    return {
+        "first_name": row["first_name"],
+        "last_name": row["last_name"],
+        "phone": row["phone"],
+        "email": row["email"],
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "created_at": _iso(row["created_at"]),
+    }
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def contacts_json(rows) -> bytes:
+    return dumps([contact_dict(row) for row in rows])
+
+
+def contacts_response(rows, headers: dict = None) -> Response:
+    """Réponse JSON d'une liste de contacts, construite sans passer par Pydantic"""
+    return json_response(contacts_json(rows), headers=headers)
+
+
+def json_response(body: bytes, headers: dict = None, status_code: int = 200) -> Response:
+    """Réponse à partir d'un JSON déjà sérialisé (partagé entre requêtes)"""
+    return Response(content=body, media_type="application/json", headers=headers, status_code=status_code)
+
+
+def contact_json(row) -> bytes:
+    return dumps(contact_dict(row))
+
+
+def contact_response(row, headers: dict = None, status_code: int = 200) -> Response:
+    return json_response(contact_json(row), headers=headers, status_code=status_code)
@@ -0,0 +1,277 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+from typing import List
+
+from .db import Database
+from .migrations import migrate
+from .pool import ConnectionPool
+from .stats import totals
+from .writer import GroupCommitWriter
+
+# Stockage partagé (sharding) : les contacts de chaque utilisateur vivent dans
+# un fichier SQLite parmi N, choisi par un hachage stable de user_id. Chaque
+# fichier a son propre verrou d'écriture, son pool de connexions et son thread
+# écrivain : un gros import ne bloque que les utilisateurs de son shard. Les
+# utilisateurs et l'authentification restent dans la base globale.
+#
+# Le hachage cohérent (jump consistent hash) ne déplace qu'environ 1/N des
+# utilisateurs quand on passe de N-1 à N shards (python -m app.shards rebalance).
+
+# Plage d'ids de contacts réservée à chaque shard : des ids uniques partout,
+# même après déplacement d'un utilisateur
+ID_SPACE = 10 ** 12
+
+CONTACT_COPY_COLUMNS = "user_id, first_name, last_name, phone, email, created_at, phone_key, email_key, name_key"
+
+
+def _key(user_id: int) -> int:
+    return int.from_bytes(hashlib.blake2b(str(user_id).encode(), digest_size=8).digest(), "big")
+
+
+def shard_index(user_id: int, shards: int) -> int:
+    """Jump consistent hash (Lamping & Veach) : stable d'un processus à l'autre"""
+    key = _key(user_id)
+    bucket, candidate = -1, 0
+    while candidate < shards:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_paths(directory: str, count: int) -> List[str]:
+    return [os.path.join(directory, f"contacts-{index:02d}.db") for index in range(count)]
+
+
+def prepare_shard(path: str, index: int) -> List[dict]:
+    """Migrations du shard et début de sa plage d'ids"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    applied = migrate(path)
+    offset = (index + 1) * ID_SPACE
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'contacts'").fetchone()
+        if row is None:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('contacts', ?)", (offset,))
+        elif row[0] < offset:
+            conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'contacts'", (offset,))
+        conn.commit()
+    finally:
+        conn.close()
+    return applied
+
+
+def describe(conn: sqlite3.Connection) -> dict:
+    """Taille et contenu d'un fichier de contacts"""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return {
+        # Compteurs tenus par les triggers de app/stats.py : pas de parcours de contacts
+        **totals(conn),
+        "version": conn.execute("SELECT version FROM sync_state WHERE id = 1").fetchone()[0],
+        "size_bytes": page_size * pages,
+        "free_bytes": page_size * free,
+    }
+
+
+class Shard:
+    """Un fichier de contacts avec son pool, son exécuteur et son écrivain"""
+
+    def __init__(self, index: int, path: str, pool: ConnectionPool, db: Database, writer: GroupCommitWriter,
+                 group_commit: bool = True):
+        self.index = index
+        self.path = path
+        self.pool = pool
+        self.db = db
+        self.writer = writer
+        self.group_commit = group_commit
+
+    @classmethod
+    def open(cls, index: int, path: str, pool_size: int = 4, pool_timeout: float = 10.0, threads: int = None,
+             factory=sqlite3.Connection, window_ms: float = 0.0, max_batch: int = 64, group_commit: bool = True):
+        pool = ConnectionPool(path, size=pool_size, timeout=pool_timeout, factory=factory)
+        return cls(index, path, pool, Database(pool, threads=threads),
+                   GroupCommitWriter(pool, window_ms=window_ms, max_batch=max_batch), group_commit)
+
+    async def run(self, fn, *args, **kwargs):
+        return await self.db.run(fn, *args, **kwargs)
+
+    async def transaction(self, fn, *args, **kwargs):
+        return await self.db.transaction(fn, *args, **kwargs)
+
+    async def write(self, fn, *args, **kwargs):
+        """Petite écriture : regroupée avec les écritures concurrentes du shard"""
+        if self.group_commit:
+            return await self.writer.submit(fn, *args, **kwargs)
+        return await self.db.transaction(fn, *args, **kwargs)
+
+    def iterate(self, generator):
+        return self.db.iterate(generator)
+
+    def stats(self) -> dict:
+        size = 0
+        for suffix in ("", "-wal"):
+            try:
+                size += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return {
+            "index": self.index,
+            "path": self.path,
+            "file_bytes": size,
+            "pool": self.db.stats(),
+            "writer": self.writer.stats(),
+        }
+
+    def shutdown(self):
+        self.writer.shutdown()
+        self.db.shutdown()
+
+
+class ShardSet:
+    """Routage user_id -> shard. Sans sharding, un seul shard : la base globale"""
+
+    def __init__(self, shards: List[Shard]):
+        self.shards = shards
+
+    def for_user(self, user_id: int) -> Shard:
+        if len(self.shards) == 1:
+            return self.shards[0]
+        return self.shards[shard_index(user_id, len(self.shards))]
+
+    def __iter__(self):
+        return iter(self.shards)
+
+    def __len__(self):
+        return len(self.shards)
+
+    def shutdown(self):
+        for shard in self.shards:
+            shard.shutdown()
+
+
+def _move_user(conn: sqlite3.Connection, user_id: int) -> int:
+    """Copie les contacts de user_id de main vers dest puis les supprime de
+    main, en une transaction. Les contacts reçoivent de nouveaux ids (plage du
+    shard cible) ; les anciens ids deviennent des pierres tombales de dest, et
+    le compteur de versions de dest ne recule jamais : un client synchronisé
+    reçoit les nouveaux contacts et la suppression des anciens."""
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute(
+            """UPDATE dest.sync_state SET version = MAX(version, (SELECT version FROM main.sync_state WHERE id = 1))
+               WHERE id = 1"""
+        )
+        old_ids = [row[0] for row in cursor.execute(
+            "SELECT id FROM main.contacts WHERE user_id = ? ORDER BY id", (user_id,)
+        ).fetchall()]
+        cursor.execute(
+            f"""INSERT INTO dest.contacts ({CONTACT_COPY_COLUMNS})
+                SELECT {CONTACT_COPY_COLUMNS} FROM main.contacts WHERE user_id = ? ORDER BY id""",
+            (user_id,)
+        )
+        base = cursor.execute("SELECT version FROM dest.sync_state WHERE id = 1").fetchone()[0]
+        cursor.executemany(
+            "INSERT OR REPLACE INTO dest.contact_tombstones (contact_id, user_id, version) VALUES (?, ?, ?)",
+            [(contact_id, user_id, base + offset) for offset, contact_id in enumerate(old_ids, start=1)]
+        )
+        last = base + len(old_ids)
+        cursor.execute("UPDATE dest.sync_state SET version = ? WHERE id = 1", (last,))
+        cursor.execute(
+            """INSERT OR REPLACE INTO dest.user_versions (user_id, version, modified_at)
+               VALUES (?, ?, CURRENT_TIMESTAMP)""",
+            (user_id, last)
+        )
+        cursor.execute("DELETE FROM main.contacts WHERE user_id = ?", (user_id,))
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+    return len(old_ids)
+
+
+def rebalance(sources: List[str], targets: List[str], dry_run: bool = False, log=print) -> dict:
+    """Place chaque utilisateur des `sources` dans targets[shard_index(user_id, len(targets))].
+
+    À lancer API arrêtée, puis redémarrer avec SHARDS=len(targets). Les fichiers
+    sont en WAL : un arrêt brutal entre deux utilisateurs est sans risque, mais
+    une transaction sur deux fichiers n'est pas atomique en cas de panne
+    pendant son COMMIT ; garder une sauvegarde."""
+    for index, target in enumerate(targets):
+        prepare_shard(target, index)
+    for source in sources:
+        migrate(source)
+
+    target_paths = [os.path.abspath(target) for target in targets]
+    totals = {"users": 0, "contacts": 0}
+    for source in sources:
+        conn = sqlite3.connect(source, timeout=30, isolation_level=None)
+        try:
+            users = [row[0] for row in conn.execute("SELECT DISTINCT user_id FROM contacts").fetchall()]
+            for user_id in users:
+                target = target_paths[shard_index(user_id, len(targets))]
+                if target == os.path.abspath(source):
+                    continue
+                if dry_run:
+                    count = conn.execute("SELECT COUNT(*) FROM contacts WHERE user_id = ?", (user_id,)).fetchone()[0]
+                else:
+                    conn.execute("ATTACH DATABASE ? AS dest", (target,))
+                    try:
+                        count = _move_user(conn, user_id)
+                    finally:
+                        conn.execute("DETACH DATABASE dest")
+                totals["users"] += 1
+                totals["contacts"] += count
+                log(f"  utilisateur {user_id}: {count} contacts {source} -> {target}")
+        finally:
+            conn.close()
+    return totals
+
+
+def _paths(global_database: str, directory: str, count: int) -> List[str]:
+    return shard_paths(directory, count) if count else [global_database]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.shards", description="Shards de contacts SQLite")
+    parser.add_argument("--global-db", default=os.getenv("CONTACTS_DB", "contacts.db"))
+    parser.add_argument("--dir", default=os.getenv("SHARD_DIR", "shards"))
+    commands = parser.add_subparsers(dest="command", required=True)
+    status = commands.add_parser("status", help="contenu de chaque shard")
+    status.add_argument("--shards", type=int, default=int(os.getenv("SHARDS", "0")))
+    move = commands.add_parser("rebalance", help="répartit les contacts entre N shards (0 = base globale)")
+    move.add_argument("--from-shards", type=int, required=True)
+    move.add_argument("--to-shards", type=int, required=True)
+    move.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        for path in _paths(args.global_db, args.dir, args.shards):
+            conn = sqlite3.connect(path)
+            try:
+                info = describe(conn)
+            finally:
+                conn.close()
+            print(f"{path}: {info['contacts']} contacts, {info['users']} utilisateurs, "
+                  f"{info['size_bytes'] / 1e6:.1f} Mo, version {info['version']}")
+        return 0
+
+    sources = _paths(args.global_db, args.dir, args.from_shards)
+    targets = _paths(args.global_db, args.dir, args.to_shards)
+    print(f"🔀 {len(sources)} -> {len(targets)} fichiers{' (simulation)' if args.dry_run else ''}")
+    totals = rebalance(sources, targets, dry_run=args.dry_run)
+    print(f"✅ {totals['users']} utilisateurs, {totals['contacts']} contacts déplacés")
+    if not args.dry_run:
+        print(f"   Redémarrer l'API avec SHARDS={args.to_shards}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+from contextlib import contextmanager
+
+from sqlalchemy import (
+    Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, and_, bindparam,
+    create_engine, delete, func, insert, or_, select, tuple_, update,
+)
+from sqlalchemy.exc import IntegrityError
+
+from .dedup import contact_keys
+from .repository import (
+    CONTACT_FIELDS, CONTACT_INPUT_FIELDS, CONTACT_KEY_FIELDS, USER_FIELDS, ContactRepository, DuplicateEmail,
+)
+
+# Implémentation SQLAlchemy Core du dépôt : même schéma que main.py (colonne
+# "password"), utilisable avec SQLite comme avec PostgreSQL.
+
+metadata = MetaData()
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("first_name", String(100), nullable=False),
+    Column("last_name", String(100), nullable=False),
+    Column("email", String(255), nullable=False, unique=True),
+    Column("password", String(255), nullable=False),
+    Column("created_at", DateTime, server_default=func.current_timestamp()),
+)
+
+contacts = Table(
+    "contacts", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("first_name", String(100), nullable=False),
+    Column("last_name", String(100), nullable=False),
+    Column("phone", String(20), nullable=False),
+    Column("email", String(255)),
+    Column("created_at", DateTime, server_default=func.current_timestamp()),
+    Column("phone_key", String(32)),
+    Column("email_key", String(255)),
+    Column("name_key", String(255)),
+    Index("idx_contacts_user_id", "user_id"),
+    Index("idx_contacts_user_created", "user_id", "created_at", "id"),
+    *(Index(f"idx_contacts_user_{column}", "user_id", column) for column in CONTACT_KEY_FIELDS),
+)
+
+_USER_COLUMNS = [users.c[name] for name in USER_FIELDS]
+_CONTACT_COLUMNS = [contacts.c[name] for name in CONTACT_FIELDS]
+
+
+class SQLAlchemyRepository(ContactRepository):
+    """Dépôt sur une Connection SQLAlchemy. Les requêtes sont construites une
+    seule fois avec des bindparam : SQLAlchemy réutilise leur forme compilée et
+    le pilote ses requêtes préparées."""
+
+    _get_user = select(*_USER_COLUMNS).where(users.c.id == bindparam("user_id"))
+    _get_user_checked = _get_user.where(users.c.email == bindparam("email"))
+    _get_user_by_email = select(*_USER_COLUMNS, users.c.password).where(users.c.email == bindparam("email"))
+    _create_user = insert(users).returning(*_USER_COLUMNS)
+    _update_password = (
+        update(users)
+        .where(users.c.id == bindparam("user_id"), users.c.password == bindparam("old_hash"))
+        .values(password=bindparam("new_hash"))
+    )
+    _list_contacts = (
+        select(*_CONTACT_COLUMNS)
+        .where(contacts.c.user_id == bindparam("user_id"))
+        .order_by(contacts.c.created_at.desc(), contacts.c.id.desc())
+        .limit(bindparam("limit")).offset(bindparam("skip"))
+    )
+    _list_contacts_after = (
+        select(*_CONTACT_COLUMNS)
+        .where(
+            contacts.c.user_id == bindparam("user_id"),
+            tuple_(contacts.c.created_at, contacts.c.id) < tuple_(bindparam("created_at"), bindparam("last_id")),
+        )
+        .order_by(contacts.c.created_at.desc(), contacts.c.id.desc())
+        .limit(bindparam("limit"))
+    )
+    _get_contact = select(*_CONTACT_COLUMNS).where(
+        contacts.c.id == bindparam("contact_id"), contacts.c.user_id == bindparam("user_id")
+    )
+    _create_contacts = insert(contacts).returning(*_CONTACT_COLUMNS, sort_by_parameter_order=True)
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def _one(self, statement, params):
+        row = self.connection.execute(statement, params).mappings().first()
+        return dict(row) if row is not None else None
+
+    def _all(self, statement, params):
+        return [dict(row) for row in self.connection.execute(statement, params).mappings()]
+
+    def get_user(self, user_id, email=None):
+        if email is None:
+            return self._one(self._get_user, {"user_id": user_id})
+        return self._one(self._get_user_checked, {"user_id": user_id, "email": email})
+
+    def get_user_by_email(self, email):
+        return self._one(self._get_user_by_email, {"email": email})
+
+    def create_user(self, first_name, last_name, email, password):
+        try:
+            # SAVEPOINT : un doublon ne doit pas annuler toute la transaction (PostgreSQL)
+            with self.connection.begin_nested():
+                return self._one(self._create_user, {
+                    "first_name": first_name, "last_name": last_name, "email": email, "password": password,
+                })
+        except IntegrityError as e:
+            raise DuplicateEmail(email) from e
+
+    def update_password(self, user_id, old_hash, new_hash):
+        result = self.connection.execute(
+            self._update_password, {"user_id": user_id, "old_hash": old_hash, "new_hash": new_hash}
+        )
+        return result.rowcount > 0
+
+    def list_contacts(self, user_id, limit, skip=0, after=None):
+        if after is not None:
+            created_at, last_id = after
+            return self._all(self._list_contacts_after, {
+                "user_id": user_id, "created_at": created_at, "last_id": last_id, "limit": limit,
+            })
+        return self._all(self._list_contacts, {"user_id": user_id, "limit": limit, "skip": skip})
+
+    def get_contact(self, user_id, contact_id):
+        return self._one(self._get_contact, {"user_id": user_id, "contact_id": contact_id})
+
+    def create_contacts(self, user_id, contacts_in):
+        params = []
+        for contact in contacts_in:
+            fields = {field: contact.get(field) for field in CONTACT_INPUT_FIELDS}
+            params.append({"user_id": user_id, **fields, **contact_keys(fields)})
+        if not params:
+            return []
+        # executemany + RETURNING : regroupé en INSERT multi-lignes ("insertmanyvalues")
+        return self._all(self._create_contacts, params)
+
+    def update_contact(self, user_id, contact_id, fields):
+        values = {field: fields[field] for field in CONTACT_INPUT_FIELDS if field in fields}
+        if not values:
+            return self.get_contact(user_id, contact_id)
+        values.update(contact_keys(values))
+        statement = (
+            update(contacts)
+            .where(contacts.c.id == contact_id, contacts.c.user_id == user_id)
+            .values(**values)
+            .returning(*_CONTACT_COLUMNS)
+        )
+        return self._one(statement, {})
+
+    def delete_contacts(self, user_id, contact_ids):
+        contact_ids = list(contact_ids)
+        if not contact_ids:
+            return []
+        statement = (
+            delete(contacts)
+            .where(contacts.c.user_id == user_id, contacts.c.id.in_(bindparam("ids", expanding=True)))
+            .returning(contacts.c.id)
+        )
+        return [row[0] for row in self.connection.execute(statement, {"ids": contact_ids})]
+
+    def search_contacts(self, user_id, query, limit):
+        pattern = f"%{query}%"
+        statement = (
+            select(*_CONTACT_COLUMNS)
+            .where(and_(
+                contacts.c.user_id == user_id,
+                or_(*(contacts.c[field].ilike(pattern) for field in CONTACT_INPUT_FIELDS)),
+            ))
+            .order_by(contacts.c.last_name, contacts.c.first_name)
+            .limit(limit)
+        )
+        return self._all(statement, {})
+
+
+class SQLAlchemyStore:
+    """Moteur SQLAlchemy + fabrique de dépôts transactionnels"""
+
+    def __init__(self, url: str, **engine_options):
+        if url.startswith("sqlite"):
+            engine_options.setdefault("connect_args", {"check_same_thread": False})
+        self.engine = create_engine(url, **engine_options)
+
+    def create_schema(self):
+        metadata.create_all(self.engine)
+
+    @contextmanager
+    def transaction(self):
+        """Dépôt dont les opérations sont validées ensemble (ou annulées)"""
+        with self.engine.begin() as connection:
+            yield SQLAlchemyRepository(connection)
+
+    def dispose(self):
+        self.engine.dispose()
@@ -0,0 +1,267 @@
+import argparse
+import os
+import sqlite3
+import sys
+import unicodedata
+from typing import List, Optional, Tuple
+
+# Compteurs par utilisateur tenus à jour par des triggers sur contacts : nombre
+# de contacts, contacts avec email, dernière modification et histogramme des
+# initiales du prénom (index alphabétique du client). Lire les statistiques
+# d'un utilisateur coûte une recherche par clé au lieu d'un COUNT(*) sur ses
+# contacts. Les triggers vivent dans le fichier des contacts (base globale ou
+# shard), comme ceux de app/sync.py. Le nombre de comptes (table users de la
+# base globale) est tenu de la même façon dans user_count.
+
+_TABLES = (
+    """CREATE TABLE IF NOT EXISTS user_stats (
+        user_id INTEGER PRIMARY KEY,
+        contacts INTEGER NOT NULL DEFAULT 0,
+        with_email INTEGER NOT NULL DEFAULT 0,
+        modified_at TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS user_letter_counts (
+        user_id INTEGER NOT NULL,
+        letter TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, letter)
+    ) WITHOUT ROWID""",
+    # Premier caractère -> initiale A-Z ("é" -> "E") ; absent = "#"
+    """CREATE TABLE IF NOT EXISTS initial_letters (
+        ch TEXT PRIMARY KEY,
+        letter TEXT NOT NULL
+    ) WITHOUT ROWID""",
+)
+
+
+def _initial(name: str) -> str:
+    return f"COALESCE((SELECT letter FROM initial_letters WHERE ch = substr(ltrim({name}), 1, 1)), '#')"
+
+
+def _has_email(row: str) -> str:
+    return f"({row}.email IS NOT NULL AND trim({row}.email) <> '')"
+
+
+def _add_letter(row: str) -> str:
+    return f"""INSERT INTO user_letter_counts (user_id, letter, count)
+        VALUES ({row}.user_id, {_initial(f"{row}.first_name")}, 1)
+        ON CONFLICT (user_id, letter) DO UPDATE SET count = count + 1;"""
+
+
+def _remove_letter(row: str) -> str:
+    letter = _initial(f"{row}.first_name")
+    return f"""UPDATE user_letter_counts SET count = count - 1
+        WHERE user_id = {row}.user_id AND letter = {letter};
+        DELETE FROM user_letter_counts WHERE user_id = {row}.user_id AND letter = {letter} AND count <= 0;"""
+
+
+_TRIGGERS = {
+    "contacts_stats_insert": f"""AFTER INSERT ON contacts BEGIN
+        INSERT INTO user_stats (user_id, contacts, with_email, modified_at)
+        VALUES (new.user_id, 1, {_has_email("new")}, CURRENT_TIMESTAMP)
+        ON CONFLICT (user_id) DO UPDATE SET contacts = contacts + 1,
+            with_email = with_email + excluded.with_email, modified_at = excluded.modified_at;
+        {_add_letter("new")}
+    END""",
+    "contacts_stats_update": f"""AFTER UPDATE OF first_name, last_name, phone, email ON contacts BEGIN
+        UPDATE user_stats SET with_email = with_email - {_has_email("old")} + {_has_email("new")},
+            modified_at = CURRENT_TIMESTAMP
+        WHERE user_id = new.user_id;
+    END""",
+    "contacts_stats_letter": f"""AFTER UPDATE OF first_name ON contacts
+        WHEN {_initial("old.first_name")} IS NOT {_initial("new.first_name")} BEGIN
+        {_remove_letter("old")}
+        {_add_letter("new")}
+    END""",
+    "contacts_stats_delete": f"""AFTER DELETE ON contacts BEGIN
+        UPDATE user_stats SET contacts = contacts - 1, with_email = with_email - {_has_email("old")},
+            modified_at = CURRENT_TIMESTAMP
+        WHERE user_id = old.user_id;
+        {_remove_letter("old")}
+    END""",
+}
+
+
+# Nombre d'utilisateurs (base globale), une seule ligne comme sync_state
+_USER_COUNT_TABLE = """CREATE TABLE IF NOT EXISTS user_count (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    users INTEGER NOT NULL
+)"""
+
+_USER_COUNT_TRIGGERS = {
+    "users_count_insert": "AFTER INSERT ON users BEGIN UPDATE user_count SET users = users + 1 WHERE id = 1; END",
+    "users_count_delete": "AFTER DELETE ON users BEGIN UPDATE user_count SET users = users - 1 WHERE id = 1; END",
+}
+
+
+def initial_letters() -> List[tuple]:
+    """Caractères latins (accentués compris) et leur initiale sans accent"""
+    rows = []
+    for code in range(0x250):
+        ch = chr(code)
+        base = unicodedata.normalize("NFKD", ch)[:1].upper()
+        if ch.isalpha() and "A" <= base <= "Z":
+            rows.append((ch, base))
+    return rows
+
+
+def create_user_stats(cursor):
+    """Migration : tables de compteurs, triggers et calcul pour l'existant"""
+    for statement in _TABLES:
+        cursor.execute(statement)
+    cursor.executemany("INSERT OR REPLACE INTO initial_letters (ch, letter) VALUES (?, ?)", initial_letters())
+    for name, body in _TRIGGERS.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+    _rebuild(cursor)
+
+
+def create_user_count(cursor):
+    """Migration : compteur d'utilisateurs tenu par des triggers sur users"""
+    cursor.execute(_USER_COUNT_TABLE)
+    for name, body in _USER_COUNT_TRIGGERS.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+    cursor.execute("INSERT OR REPLACE INTO user_count (id, users) SELECT 1, COUNT(*) FROM users")
+
+
+_EXPECTED_STATS = f"""SELECT user_id, COUNT(*) AS contacts, SUM({_has_email("contacts")}) AS with_email
+    FROM contacts {{where}} GROUP BY user_id"""
+
+_EXPECTED_LETTERS = f"""SELECT user_id, {_initial("first_name")} AS letter, COUNT(*) AS count
+    FROM contacts {{where}} GROUP BY user_id, letter"""
+
+
+def _rebuild(cursor, user_id: int = None):
+    where, params = ("WHERE user_id = ?", (user_id,)) if user_id is not None else ("", ())
+    cursor.execute(f"DELETE FROM user_stats {where}", params)
+    cursor.execute(f"DELETE FROM user_letter_counts {where}", params)
+    # Dernière modification : celle des versions de synchronisation, qui
+    # comptent aussi les suppressions
+    cursor.execute(
+        f"""INSERT INTO user_stats (user_id, contacts, with_email, modified_at)
+            SELECT expected.user_id, expected.contacts, expected.with_email, versions.modified_at
+            FROM ({_EXPECTED_STATS.format(where=where)}) AS expected
+            LEFT JOIN user_versions AS versions ON versions.user_id = expected.user_id""",
+        params
+    )
+    cursor.execute(
+        f"INSERT INTO user_letter_counts (user_id, letter, count) {_EXPECTED_LETTERS.format(where=where)}",
+        params
+    )
+
+
+def rebuild_user_stats(conn: sqlite3.Connection, user_id: int = None):
+    """Recalcule les compteurs (de tous les utilisateurs par défaut, et alors
+    aussi le nombre d'utilisateurs)"""
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        _rebuild(cursor, user_id)
+        if user_id is None:
+            cursor.execute("INSERT OR REPLACE INTO user_count (id, users) SELECT 1, COUNT(*) FROM users")
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+def check_user_count(conn: sqlite3.Connection) -> Optional[Tuple[int, int]]:
+    """(attendu, enregistré) si le compteur d'utilisateurs est faux, sinon None"""
+    expected = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    stored = user_count(conn)
+    return None if stored == expected else (expected, stored)
+
+
+def check_user_stats(conn: sqlite3.Connection) -> List[dict]:
+    """Utilisateurs dont les compteurs diffèrent d'un recalcul complet"""
+    expected = {row[0]: (row[1], row[2]) for row in conn.execute(_EXPECTED_STATS.format(where=""))}
+    stored = {row[0]: (row[1], row[2]) for row in conn.execute(
+        "SELECT user_id, contacts, with_email FROM user_stats WHERE contacts <> 0 OR with_email <> 0"
+    )}
+    expected_letters = {(row[0], row[1]): row[2] for row in conn.execute(_EXPECTED_LETTERS.format(where=""))}
+    stored_letters = {(row[0], row[1]): row[2] for row in conn.execute(
+        "SELECT user_id, letter, count FROM user_letter_counts"
+    )}
+    counts = {user_id for user_id in expected.keys() | stored.keys() if expected.get(user_id) != stored.get(user_id)}
+    letters = {key[0] for key in expected_letters.keys() | stored_letters.keys()
+               if expected_letters.get(key) != stored_letters.get(key)}
+    return [
+        {
+            "user_id": user_id,
+            "expected": expected.get(user_id, (0, 0)),
+            "stored": stored.get(user_id, (0, 0)),
+            "letters": user_id in letters,
+        }
+        for user_id in sorted(counts | letters)
+    ]
+
+
+def get_user_stats(conn: sqlite3.Connection, user_id: int) -> dict:
+    """Statistiques d'un utilisateur : deux recherches par clé"""
+    row = conn.execute(
+        "SELECT contacts, with_email, modified_at FROM user_stats WHERE user_id = ?", (user_id,)
+    ).fetchone()
+    letters = conn.execute(
+        "SELECT letter, count FROM user_letter_counts WHERE user_id = ? ORDER BY letter", (user_id,)
+    ).fetchall()
+    return {
+        "contacts": row[0] if row else 0,
+        "with_email": row[1] if row else 0,
+        "modified_at": row[2] if row else None,
+        "letters": {letter: count for letter, count in letters},
+    }
+
+
+def user_count(conn: sqlite3.Connection) -> int:
+    """Nombre de comptes, sans parcourir users"""
+    row = conn.execute("SELECT users FROM user_count WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def totals(conn: sqlite3.Connection) -> dict:
+    """Contacts et utilisateurs ayant des contacts, sans parcourir contacts"""
+    contacts, users = conn.execute(
+        "SELECT COALESCE(SUM(contacts), 0), COUNT(*) FROM user_stats WHERE contacts > 0"
+    ).fetchone()
+    return {"contacts": contacts, "users": users}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.stats", description="Compteurs de contacts par utilisateur")
+    parser.add_argument("command", choices=("check", "rebuild"))
+    parser.add_argument("databases", nargs="*", help="fichiers de contacts (base globale et shards)")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for database in args.databases or [os.getenv("CONTACTS_DB", "contacts.db")]:
+        conn = sqlite3.connect(database, timeout=30, isolation_level=None)
+        try:
+            if args.command == "rebuild":
+                rebuild_user_stats(conn)
+                info = totals(conn)
+                print(f"✅ Compteurs recalculés ({info['users']} utilisateurs, {info['contacts']} contacts) : {database}")
+                continue
+            mismatches = check_user_stats(conn)
+            users = check_user_count(conn)
+        finally:
+            conn.close()
+        if users:
+            status = 1
+            print(f"❌ {users[1]} utilisateurs enregistrés, {users[0]} attendus : {database}")
+        if mismatches:
+            status = 1
+            print(f"❌ {len(mismatches)} utilisateurs aux compteurs incohérents : {database}")
+            for mismatch in mismatches[:20]:
+                (contacts, with_email), (stored, stored_email) = mismatch["expected"], mismatch["stored"]
+                print(f"   utilisateur {mismatch['user_id']}: {stored} contacts / {stored_email} emails enregistrés, "
+                      f"{contacts} / {with_email} attendus" + (", initiales incorrectes" if mismatch["letters"] else ""))
+        if mismatches or users:
+            print("   Corriger avec : python -m app.stats rebuild " + database)
+        else:
+            print(f"✅ Compteurs cohérents : {database}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+import sqlite3
+import sys
+
+# Synchronisation incrémentale : chaque écriture sur contacts reçoit un numéro
+# de version global strictement croissant (sync_state), les suppressions
+# laissent une pierre tombale. Un client qui connaît la version N ne récupère
+# que ce qui a changé depuis N.
+
+CONTACT_COLUMNS = "id, user_id, first_name, last_name, phone, email, created_at, updated_at, version"
+
+_TABLES = (
+    """CREATE TABLE IF NOT EXISTS sync_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL DEFAULT 0,
+        pruned_version INTEGER NOT NULL DEFAULT 0
+    )""",
+    "INSERT OR IGNORE INTO sync_state (id, version, pruned_version) VALUES (1, 0, 0)",
+    """CREATE TABLE IF NOT EXISTS contact_tombstones (
+        contact_id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        version INTEGER NOT NULL,
+        deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_tombstones_user_version ON contact_tombstones(user_id, version)",
+    # Dernière version par utilisateur : sert de validateur HTTP (ETag, Last-Modified)
+    """CREATE TABLE IF NOT EXISTS user_versions (
+        user_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL,
+        modified_at TIMESTAMP NOT NULL
+    )""",
+    # Flux des changements lu par les autres workers (invalidation de leurs caches)
+    "CREATE INDEX IF NOT EXISTS idx_user_versions_version ON user_versions(version)",
+)
+
+_NEXT_VERSION = "UPDATE sync_state SET version = version + 1 WHERE id = 1;"
+_CURRENT_VERSION = "(SELECT version FROM sync_state WHERE id = 1)"
+
+
+def _touch_user(user_id: str) -> str:
+    return f"""INSERT OR REPLACE INTO user_versions (user_id, version, modified_at)
+        VALUES ({user_id}, {_CURRENT_VERSION}, CURRENT_TIMESTAMP);"""
+
+
+# Les triggers sont recréés à chaque initialisation pour suivre le code
+_TRIGGERS = {
+    "contacts_sync_insert": f"""AFTER INSERT ON contacts BEGIN
+        {_NEXT_VERSION}
+        UPDATE contacts SET version = {_CURRENT_VERSION}, updated_at = CURRENT_TIMESTAMP
+        WHERE id = new.id;
+        {_touch_user("new.user_id")}
+    END""",
+    "contacts_sync_update": f"""AFTER UPDATE OF first_name, last_name, phone, email ON contacts BEGIN
+        {_NEXT_VERSION}
+        UPDATE contacts SET version = {_CURRENT_VERSION}, updated_at = CURRENT_TIMESTAMP
+        WHERE id = new.id;
+        {_touch_user("new.user_id")}
+    END""",
+    "contacts_sync_delete": f"""AFTER DELETE ON contacts BEGIN
+        {_NEXT_VERSION}
+        INSERT OR REPLACE INTO contact_tombstones (contact_id, user_id, version, deleted_at)
+        VALUES (old.id, old.user_id, {_CURRENT_VERSION}, CURRENT_TIMESTAMP);
+        {_touch_user("old.user_id")}
+    END""",
+    # Profil modifié ou supprimé : les caches d'authentification sont à purger
+    "users_sync_update": f"""AFTER UPDATE OF first_name, last_name, email ON users BEGIN
+        {_NEXT_VERSION}
+        {_touch_user("new.id")}
+    END""",
+    "users_sync_delete": f"""AFTER DELETE ON users BEGIN
+        {_NEXT_VERSION}
+        {_touch_user("old.id")}
+    END""",
+}
+
+
+# Flux propre aux profils : user_versions date aussi chaque écriture de
+# contacts, seuls les changements de users doivent purger les caches
+# d'authentification des autres workers. Numérotation indépendante de
+# sync_state (l'ordre des triggers AFTER d'une même table n'est pas garanti).
+_PROFILE_TABLES = (
+    """CREATE TABLE IF NOT EXISTS profile_versions (
+        user_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_profile_versions_version ON profile_versions(version)",
+)
+
+
+def _touch_profile(user_id: str) -> str:
+    return f"""INSERT OR REPLACE INTO profile_versions (user_id, version)
+        VALUES ({user_id}, (SELECT COALESCE(MAX(version), 0) + 1 FROM profile_versions));"""
+
+
+_PROFILE_TRIGGERS = {
+    "users_profile_update": f"""AFTER UPDATE OF first_name, last_name, email ON users BEGIN
+        {_touch_profile("new.id")}
+    END""",
+    "users_profile_delete": f"""AFTER DELETE ON users BEGIN
+        {_touch_profile("old.id")}
+    END""",
+}
+
+
+def create_sync_schema(cursor):
+    """Colonnes version/updated_at, table des suppressions et triggers de suivi"""
+    cursor.execute("PRAGMA table_info(contacts)")
+    columns = {row[1] for row in cursor.fetchall()}
+    # ALTER TABLE ... ADD COLUMN n'accepte pas de DEFAULT non constant :
+    # updated_at est renseigné par les triggers
+    if "version" not in columns:
+        cursor.execute("ALTER TABLE contacts ADD COLUMN version INTEGER")
+    if "updated_at" not in columns:
+        cursor.execute("ALTER TABLE contacts ADD COLUMN updated_at TIMESTAMP")
+
+    for statement in _TABLES:
+        cursor.execute(statement)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contacts_user_version ON contacts(user_id, version)")
+
+    for name, body in _TRIGGERS.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+
+    # Contacts antérieurs au suivi des versions
+    cursor.execute("SELECT COUNT(*) FROM contacts WHERE version IS NULL")
+    if cursor.fetchone()[0]:
+        cursor.execute(
+            f"""UPDATE contacts SET version = {_CURRENT_VERSION} + id,
+                updated_at = COALESCE(updated_at, created_at)
+                WHERE version IS NULL"""
+        )
+        cursor.execute(
+            "UPDATE sync_state SET version = (SELECT MAX(version) FROM contacts) WHERE id = 1"
+        )
+
+    # Utilisateurs dont les contacts précèdent la table user_versions
+    cursor.execute(
+        """INSERT OR IGNORE INTO user_versions (user_id, version, modified_at)
+           SELECT user_id, MAX(version), MAX(COALESCE(updated_at, created_at)) FROM contacts
+           GROUP BY user_id"""
+    )
+
+
+def create_profile_feed(cursor):
+    """Migration : versions des profils, lues par les autres workers"""
+    for statement in _PROFILE_TABLES:
+        cursor.execute(statement)
+    for name, body in _PROFILE_TRIGGERS.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def get_changes(conn: sqlite3.Connection, user_id: int, since: int, limit: int) -> dict:
+    """Contacts modifiés et supprimés depuis `since`, dans l'ordre des versions"""
+    cursor = conn.cursor()
+    # Lire d'abord le point haut : toute version <= high_water est déjà validée,
+    # ce qui rend la réponse cohérente même si des écritures arrivent pendant
+    cursor.execute("SELECT version, pruned_version FROM sync_state WHERE id = 1")
+    high_water, pruned_version = cursor.fetchone()
+
+    # Pierres tombales purgées : le client doit repartir d'un instantané complet
+    reset = 0 < since < pruned_version
+    if reset:
+        since = 0
+
+    cursor.execute(
+        f"""SELECT {CONTACT_COLUMNS} FROM contacts
+            WHERE user_id = ? AND version > ? AND version <= ?
+            ORDER BY version LIMIT ?""",
+        (user_id, since, high_water, limit + 1)
+    )
+    upserts = [dict(row) for row in cursor.fetchall()]
+    deletes = []
+    if since > 0:
+        cursor.execute(
+            """SELECT contact_id, version FROM contact_tombstones
+               WHERE user_id = ? AND version > ? AND version <= ?
+               ORDER BY version LIMIT ?""",
+            (user_id, since, high_water, limit + 1)
+        )
+        deletes = [(row[0], row[1]) for row in cursor.fetchall()]
+
+    # Fusion des deux flux par version, tronquée à `limit` changements
+    changes = sorted(
+        [(row["version"], row) for row in upserts] + [(version, contact_id) for contact_id, version in deletes],
+        key=lambda change: change[0]
+    )
+    has_more = len(changes) > limit
+    if has_more:
+        changes = changes[:limit]
+        high_water = changes[-1][0]
+
+    return {
+        "version": high_water,
+        "has_more": has_more,
+        "reset": reset,
+        "upserted": [change for _, change in changes if isinstance(change, dict)],
+        "deleted": [change for _, change in changes if not isinstance(change, dict)],
+    }
+
+
+def get_user_version(conn: sqlite3.Connection, user_id: int):
+    """(version, modified_at) des contacts d'un utilisateur ; (0, None) s'il
+    n'en a jamais eu"""
+    row = conn.execute(
+        "SELECT version, modified_at FROM user_versions WHERE user_id = ?", (user_id,)
+    ).fetchone()
+    return (row[0], row[1]) if row else (0, None)
+
+
+def get_changed_users(conn: sqlite3.Connection, since: int, limit: int = 10000):
+    """(nouvelle version, ids des utilisateurs modifiés depuis `since`), toutes
+    connexions et tous processus confondus"""
+    rows = conn.execute(
+        "SELECT user_id, version FROM user_versions WHERE version > ? ORDER BY version LIMIT ?",
+        (since, limit)
+    ).fetchall()
+    if not rows:
+        return since, []
+    return rows[-1][1], [row[0] for row in rows]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT version FROM sync_state WHERE id = 1").fetchone()[0]
+
+
+def get_changed_profiles(conn: sqlite3.Connection, since: int, limit: int = 10000):
+    """Comme get_changed_users(), pour les profils (users) seulement"""
+    rows = conn.execute(
+        "SELECT user_id, version FROM profile_versions WHERE version > ? ORDER BY version LIMIT ?",
+        (since, limit)
+    ).fetchall()
+    if not rows:
+        return since, []
+    return rows[-1][1], [row[0] for row in rows]
+
+
+def current_profile_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM profile_versions").fetchone()[0]
+
+
+def prune_tombstones(conn: sqlite3.Connection, days: int) -> int:
+    """Supprime les pierres tombales de plus de `days` jours.
+
+    Les clients dont la version est antérieure devront faire une resynchronisation
+    complète (reset=true dans /contacts/changes).
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT MAX(version) FROM contact_tombstones WHERE deleted_at < datetime('now', ?)",
+        (f"-{days} days",)
+    )
+    horizon = cursor.fetchone()[0]
+    if horizon is None:
+        return 0
+    cursor.execute("DELETE FROM contact_tombstones WHERE version <= ?", (horizon,))
+    deleted = cursor.rowcount
+    cursor.execute(
+        "UPDATE sync_state SET pruned_version = MAX(pruned_version, ?) WHERE id = 1", (horizon,)
+    )
+    conn.commit()
+    return deleted
+
+
+if __name__ == "__main__":
+    # Usage : python -m app.sync [chemin/vers/contacts.db] [jours]
+    database = sys.argv[1] if len(sys.argv) > 1 else "contacts.db"
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    conn = sqlite3.connect(database)
+    deleted = prune_tombstones(conn, days)
+    conn.close()
+    print(f"✅ {deleted} pierres tombales de plus de {days} jours supprimées : {database}")
@@ -0,0 +1,173 @@
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import time
+
+from .pool import ConnectionPool
+
+# Écritures groupées (group commit) : SQLite n'accepte qu'un écrivain à la
+# fois. Plutôt que de laisser chaque requête prendre le verrou, faire son
+# COMMIT et bloquer les autres, un thread unique regroupe les écritures
+# arrivées pendant une courte fenêtre dans une seule transaction. Chaque
+# opération tourne dans son propre SAVEPOINT : une erreur n'annule qu'elle,
+# et chaque appelant reçoit son résultat (ou son exception) après le COMMIT.
+
+logger = logging.getLogger("contacts.db")
+
+_STOP = object()
+
+
+class _Operation:
+    __slots__ = ("fn", "args", "kwargs", "context", "loop", "future", "result", "error")
+
+    def __init__(self, fn, args, kwargs, loop, future):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        # Le contexte (id de requête, compteurs de requêtes SQL) suit l'opération
+        self.context = contextvars.copy_context()
+        self.loop = loop
+        self.future = future
+        self.result = None
+        self.error = None
+
+
+def _resolve(future: asyncio.Future, result, error):
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class GroupCommitWriter:
+    """Thread écrivain unique. Une transaction regroupe au plus `max_batch`
+    opérations, arrivées au plus `window_ms` après la première.
+
+    La fenêtre n'est attendue que sous charge (lot précédent de plus d'une
+    opération, ou d'autres écritures déjà en file) : une écriture isolée est
+    validée immédiatement."""
+
+    def __init__(self, pool: ConnectionPool, window_ms: float = 0.0, max_batch: int = 64):
+        self.pool = pool
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.operations = 0
+        self.failed = 0
+        self.largest_batch = 0
+        self._last_batch = 0
+        self._commit_seconds = 0.0
+
+    def _start(self):
+        # Démarré à la demande : un redémarrage après shutdown() reste possible
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    async def submit(self, fn, *args, **kwargs):
+        """Exécute fn(conn, *args, **kwargs) dans la prochaine transaction groupée"""
+        if self._thread is None:
+            self._start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_Operation(fn, args, kwargs, loop, future))
+        return await future
+
+    def _collect(self, first: _Operation) -> list:
+        batch = [first]
+        busy = self._last_batch > 1 or not self._queue.empty()
+        deadline = time.monotonic() + (self.window if busy else 0)
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                operation = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if operation is _STOP:
+                # Traité après ce lot
+                self._queue.put(_STOP)
+                break
+            batch.append(operation)
+        return batch
+
+    def _apply(self, conn, batch: list):
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        for operation in batch:
+            cursor.execute("SAVEPOINT operation")
+            try:
+                operation.result = operation.context.run(
+                    operation.fn, conn, *operation.args, **operation.kwargs
+                )
+                cursor.execute("RELEASE operation")
+            except Exception as e:
+                cursor.execute("ROLLBACK TO operation")
+                cursor.execute("RELEASE operation")
+                operation.error = e
+        start = time.perf_counter()
+        conn.commit()
+        return time.perf_counter() - start
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._collect(first)
+            try:
+                with self.pool.connection() as conn:
+                    try:
+                        commit_seconds = self._apply(conn, batch)
+                    except BaseException:
+                        if conn.in_transaction:
+                            conn.rollback()
+                        raise
+            except Exception as e:
+                # BEGIN ou COMMIT impossible : rien n'a été écrit, tout le lot échoue
+                logger.exception("Transaction groupée de %d écritures annulée", len(batch))
+                commit_seconds = 0.0
+                for operation in batch:
+                    operation.result, operation.error = None, e
+
+            with self._lock:
+                self.batches += 1
+                self.operations += len(batch)
+                self.failed += sum(1 for operation in batch if operation.error is not None)
+                self.largest_batch = max(self.largest_batch, len(batch))
+                self._last_batch = len(batch)
+                self._commit_seconds += commit_seconds
+            for operation in batch:
+                try:
+                    operation.loop.call_soon_threadsafe(_resolve, operation.future, operation.result, operation.error)
+                except RuntimeError:  # boucle fermée : l'appelant n'attend plus
+                    pass
+
+    def shutdown(self):
+        """Termine les écritures en attente puis arrête le thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "window_ms": self.window * 1000,
+                "max_batch": self.max_batch,
+                "pending": self._queue.qsize(),
+                "batches": self.batches,
+                "operations": self.operations,
+                "failed": self.failed,
+                "largest_batch": self.largest_batch,
+                "avg_batch": round(self.operations / self.batches, 2) if self.batches else 0.0,
+                "avg_commit_ms": round(self._commit_seconds / self.batches * 1000, 3) if self.batches else 0.0,
+            }
@@ -0,0 +1,10 @@
+"""Benchmarks de l'API Contacts.
+
+Usage (depuis backend/) :
+
+    python -m benchmarks --users 10 --contacts 100000 --output results.json
+    python -m benchmarks --baseline results.json --threshold 0.10
+
+L'application est chargée en mémoire sur une base SQLite temporaire et
+pilotée via un client ASGI : aucun serveur ni réseau n'intervient.
+"""
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from . import stats
+from .api import SCENARIOS, ApiBenchmark
+from .seed import seed_database
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark de l'API Contacts")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--contacts", type=int, default=10000, help="contacts par utilisateur")
+    parser.add_argument("--requests", type=int, default=500, help="requêtes par scénario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="liste séparée par des virgules parmi : " + ", ".join(SCENARIOS))
+    parser.add_argument("--output", help="fichier JSON de résultats")
+    parser.add_argument("--baseline", help="résultats de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.10, help="tolérance de régression (0.10 = 10 %%)")
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="taux d'erreur toléré par scénario (0 = aucune erreur)")
+    parser.add_argument("--keep-db", action="store_true", help="conserver la base temporaire")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        print(f"Scénarios inconnus : {', '.join(sorted(unknown))}")
+        return 2
+
+    workdir = tempfile.mkdtemp(prefix="contacts-bench-")
+    database = os.path.join(workdir, "bench.db")
+    # La configuration de main.py est lue à l'import
+    os.environ["CONTACTS_DB"] = database
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Débit brut de l'API : quelques utilisateurs dépasseraient vite leurs budgets
+    os.environ.setdefault("RATE_LIMIT", "0")
+    import main as api
+    api.prepare_database()
+
+    owned = seed_database(database, args.users, args.contacts, api.get_password_hash)
+    bench = ApiBenchmark(api.app, database, owned, args.requests, args.concurrency, warmup=args.warmup)
+    bench.prepare_deep_cursors(api.encode_cursor)
+
+    print(f"🚀 {len(scenarios)} scénarios, {args.requests} requêtes, concurrence {args.concurrency}")
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "users": args.users,
+            "contacts_per_user": args.contacts,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "scenarios": asyncio.run(bench.run(scenarios)),
+    }
+
+    baseline = stats.load(args.baseline) if args.baseline else None
+    print()
+    stats.print_table(results, baseline)
+    if args.output:
+        stats.save(results, args.output)
+        print(f"\n💾 Résultats enregistrés dans {args.output}")
+    if not args.keep_db:
+        for suffix in ("", "-wal", "-shm", ".migrate.lock"):
+            try:
+                os.remove(database + suffix)
+            except FileNotFoundError:
+                pass
+        os.rmdir(workdir)
+
+    status = 0
+    failures = stats.failing(results, args.max_error_rate)
+    if failures:
+        print(f"\n❌ {len(failures)} scénario(s) en erreur au-delà de {args.max_error_rate:.0%} :")
+        for name, errors, rate in failures:
+            print(f"   {name}: {errors} erreurs ({rate:.1%})")
+        status = 1
+
+    if baseline:
+        regressions = stats.compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0%} :")
+            for name, metric, before, after in regressions:
+                print(f"   {name} {metric}: {before} -> {after}")
+            return 1
+        print(f"\n✅ Aucune régression au-delà de {args.threshold:.0%}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import asyncio
+import itertools
+import random
+import sqlite3
+import time
+
+import httpx
+
+from .seed import FIRST_NAMES, LAST_NAMES, PASSWORD, random_contact
+from .stats import summarize
+
+PAGE_SIZE = 50
+
+SCENARIOS = (
+    "register", "token", "list_shallow", "list_deep_offset", "list_deep_cursor",
+    "get", "search", "update", "delete",
+)
+
+
+async def run_scenario(client, make_request, total: int, concurrency: int, warmup: int = 0) -> dict:
+    """Envoie `total` requêtes avec `concurrency` clients simultanés"""
+    for i in range(warmup):
+        method, url, kwargs = make_request(-1 - i)
+        await client.request(method, url, **kwargs)
+
+    latencies = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            method, url, kwargs = make_request(i)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+class ApiBenchmark:
+    def __init__(self, app, database: str, owned: dict, requests: int, concurrency: int,
+                 warmup: int = 10, seed: int = 7):
+        self.app = app
+        self.database = database
+        self.owned = owned
+        self.emails = list(owned)
+        self.requests = requests
+        self.concurrency = concurrency
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+        self.headers = {}
+        self.deep_cursors = {}
+
+    def _user(self, i: int) -> str:
+        return self.emails[i % len(self.emails)]
+
+    def _random_owned(self, email: str) -> int:
+        return self.rng.choice(self.owned[email])
+
+    async def login_all(self, client):
+        for email in self.emails:
+            response = await client.post("/token", data={"username": email, "password": PASSWORD})
+            response.raise_for_status()
+            self.headers[email] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def prepare_deep_cursors(self, encode_cursor):
+        # Curseur pointant sur l'avant-dernière page de chaque carnet
+        conn = sqlite3.connect(self.database)
+        for email, ids in self.owned.items():
+            depth = max(0, len(ids) - PAGE_SIZE - 1)
+            row = conn.execute(
+                """SELECT created_at, id FROM contacts
+                   WHERE user_id = (SELECT id FROM users WHERE email = ?)
+                   ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?""",
+                (email, depth)
+            ).fetchone()
+            if row:
+                self.deep_cursors[email] = encode_cursor(row[0], row[1])
+        conn.close()
+
+    def make_request(self, name: str):
+        run = int(time.time() * 1000)
+
+        def register(i):
+            first, last, _, _ = random_contact(self.rng, i)
+            return "POST", "/register", {"json": {
+                "first_name": first, "last_name": last,
+                "email": f"new{run}.{i + 1000}@example.com", "password": PASSWORD,
+            }}
+
+        def token(i):
+            return "POST", "/token", {"data": {"username": self._user(i), "password": PASSWORD}}
+
+        def list_shallow(i):
+            email = self._user(i)
+            return "GET", "/contacts", {"params": {"limit": PAGE_SIZE}, "headers": self.headers[email]}
+
+        def list_deep_offset(i):
+            email = self._user(i)
+            skip = max(0, len(self.owned[email]) - PAGE_SIZE)
+            return "GET", "/contacts", {"params": {"limit": PAGE_SIZE, "skip": skip}, "headers": self.headers[email]}
+
+        def list_deep_cursor(i):
+            email = self._user(i)
+            params = {"limit": PAGE_SIZE}
+            if email in self.deep_cursors:
+                params["cursor"] = self.deep_cursors[email]
+            return "GET", "/contacts", {"params": params, "headers": self.headers[email]}
+
+        def get(i):
+            email = self._user(i)
+            return "GET", f"/contacts/{self._random_owned(email)}", {"headers": self.headers[email]}
+
+        def search(i):
+            email = self._user(i)
+            term = self.rng.choice(LAST_NAMES + FIRST_NAMES)[:self.rng.randint(3, 5)]
+            return "GET", f"/contacts/search/{term}", {"params": {"limit": PAGE_SIZE}, "headers": self.headers[email]}
+
+        def update(i):
+            email = self._user(i)
+            first, last, phone, contact_email = random_contact(self.rng, i)
+            return "PUT", f"/contacts/{self._random_owned(email)}", {"headers": self.headers[email], "json": {
+                "first_name": first, "last_name": last, "phone": phone, "email": contact_email,
+            }}
+
+        def delete(i):
+            email = self._user(i)
+            ids = self.owned[email]
+            contact_id = ids.pop() if ids else 0
+            return "DELETE", f"/contacts/{contact_id}", {"headers": self.headers[email]}
+
+        return locals()[name]
+
+    async def run(self, scenarios) -> dict:
+        results = {}
+        transport = httpx.ASGITransport(app=self.app)
+        # ASGITransport ne déclenche pas le lifespan : on le fait à la main
+        async with self.app.router.lifespan_context(self.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                await self.login_all(client)
+                for name in scenarios:
+                    warmup = 0 if name == "delete" else self.warmup
+                    results[name] = await run_scenario(
+                        client, self.make_request(name), self.requests, self.concurrency, warmup
+                    )
+                    print(f"  ✔ {name}: {results[name]['rps']} req/s, p95 {results[name]['p95_ms']} ms")
+        return results
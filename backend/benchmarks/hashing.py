@@ -0,0 +1,58 @@
+"""Débit de vérification des mots de passe (≈ connexions/s) selon le nombre
+de workers du PasswordHasher, comparé au nombre de cœurs.
+
+Usage (depuis backend/) :
+
+    python -m benchmarks.hashing --scheme bcrypt --cost 12 --logins 64
+    python -m benchmarks.hashing --executor process --workers 1,2,4,8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from app.hashing import PasswordHasher, context_settings, hash_password
+
+
+async def measure(settings: dict, stored: str, workers: int, executor: str, logins: int) -> float:
+    # Débit brut : toutes les vérifications attendent leur tour, sans refus
+    hasher = PasswordHasher(settings, workers=workers, executor=executor, max_pending=logins,
+                            max_wait=float("inf"))
+    try:
+        # Démarrage des workers hors mesure
+        await asyncio.gather(*(hasher.verify("bench-password", stored) for _ in range(workers)))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(hasher.verify("bench-password", stored) for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+    finally:
+        hasher.shutdown()
+    assert all(valid for valid, _ in results)
+    return logins / elapsed
+
+
+def main(argv=None) -> int:
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2, max(1, cores // 2), cores, cores * 2})
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.hashing")
+    parser.add_argument("--scheme", default="bcrypt", choices=("bcrypt", "argon2"))
+    parser.add_argument("--cost", type=int, default=None, help="coût bcrypt ou time_cost argon2")
+    parser.add_argument("--executor", default="thread", choices=("thread", "process"))
+    parser.add_argument("--workers", default=",".join(str(count) for count in default_workers),
+                        help="liste de tailles de pool à tester")
+    parser.add_argument("--logins", type=int, default=32, help="vérifications par mesure")
+    args = parser.parse_args(argv)
+
+    settings = context_settings(args.scheme, args.cost)
+    stored = hash_password(settings, "bench-password")
+    print(f"🔐 {args.scheme}, coût {args.cost or 'par défaut'}, exécuteur {args.executor}, {cores} cœurs")
+    print(f"{'workers':>8} {'connexions/s':>14} {'par worker':>12}")
+
+    for workers in (int(value) for value in args.workers.split(",")):
+        rate = asyncio.run(measure(settings, stored, workers, args.executor, args.logins))
+        print(f"{workers:>8} {rate:>14.1f} {rate / workers:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
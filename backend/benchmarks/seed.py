@@ -0,0 +1,54 @@
+import random
+import sqlite3
+import time
+
+FIRST_NAMES = ("Marie", "Jean", "Pierre", "Sophie", "Lucas", "Emma", "Hugo", "Léa", "Louis", "Chloé",
+               "Gabriel", "Manon", "Jules", "Camille", "Arthur", "Inès", "Nathan", "Sarah", "Paul", "Alice")
+LAST_NAMES = ("Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy",
+              "Moreau", "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "David", "Bertrand", "Roux",
+              "Vincent", "Fournier", "Curie", "Dupont", "Lambert", "Bonnet", "Girard")
+DOMAINS = ("example.com", "mail.fr", "test.org", "contacts.io")
+
+PASSWORD = "bench-password"
+
+
+def random_contact(rng: random.Random, serial: int) -> tuple:
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    phone = "0" + str(rng.randint(600000000, 799999999))
+    email = f"{first.lower()}.{last.lower()}{serial}@{rng.choice(DOMAINS)}" if rng.random() < 0.8 else None
+    return first, last, phone, email
+
+
+def seed_database(database: str, users: int, contacts_per_user: int, hash_password, seed: int = 42,
+                  batch_size: int = 5000) -> dict:
+    """Crée `users` utilisateurs et leurs contacts ; renvoie {email: [ids]}"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(database)
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    hashed = hash_password(PASSWORD)
+    owned = {}
+    for index in range(users):
+        email = f"bench{index}@example.com"
+        cursor.execute(
+            "INSERT INTO users (first_name, last_name, email, password) VALUES (?, ?, ?, ?)",
+            ("Bench", f"User{index}", email, hashed)
+        )
+        user_id = cursor.lastrowid
+        remaining = contacts_per_user
+        while remaining > 0:
+            count = min(batch_size, remaining)
+            cursor.executemany(
+                "INSERT INTO contacts (user_id, first_name, last_name, phone, email) VALUES (?, ?, ?, ?, ?)",
+                [(user_id, *random_contact(rng, remaining - i)) for i in range(count)]
+            )
+            conn.commit()
+            remaining -= count
+        cursor.execute("SELECT id FROM contacts WHERE user_id = ?", (user_id,))
+        owned[email] = [row[0] for row in cursor.fetchall()]
+    cursor.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    print(f"🌱 {users} utilisateurs x {contacts_per_user} contacts en {time.perf_counter() - started:.1f}s")
+    return owned
@@ -0,0 +1,85 @@
+"""Compare la sérialisation d'une page de contacts par FastAPI/Pydantic
+(response_model=List[ContactResponse]) et par app.serialize.
+
+Usage (depuis backend/) :
+
+    python -m benchmarks.serialization --rows 1000 --repeat 200
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from .seed import seed_database
+
+
+def measure(fn, repeat: int) -> float:
+    """Durée médiane d'un appel, en millisecondes"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="contacts-bench-")
+    database = os.path.join(workdir, "bench.db")
+    os.environ["CONTACTS_DB"] = database
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import main as api
+    api.prepare_database()
+    from app import serialize
+
+    seed_database(database, 1, args.rows, api.get_password_hash)
+    conn = sqlite3.connect(database)
+    conn.row_factory = sqlite3.Row
+    user_id = conn.execute("SELECT id FROM users WHERE email = 'bench0@example.com'").fetchone()[0]
+    rows = api.fetch_contacts_page(conn, user_id, args.rows)
+    conn.close()
+
+    # Même chaîne que FastAPI : validation du modèle, dump JSON, jsonable_encoder, JSONResponse
+    adapter = TypeAdapter(List[api.ContactResponse])
+
+    def pydantic_path():
+        value = adapter.validate_python([dict(row) for row in rows])
+        return JSONResponse(jsonable_encoder(adapter.dump_python(value, mode="json"))).body
+
+    def fast_path():
+        return serialize.contacts_response(rows).body
+
+    identical = pydantic_path() == fast_path()
+    slow = measure(pydantic_path, args.repeat)
+    fast = measure(fast_path, args.repeat)
+    backend = "orjson" if serialize.orjson is not None else "json"
+
+    print(f"{len(rows)} contacts, médiane sur {args.repeat} essais")
+    print(f"  {'pydantic (response_model)':26}: {slow:8.3f} ms")
+    print(f"  {'direct (' + backend + ')':26}: {fast:8.3f} ms  (x{slow / fast:.1f})")
+    print(f"  {'JSON identique':26}: {'oui' if identical else 'NON'}")
+
+    for suffix in ("", "-wal", "-shm", ".migrate.lock"):
+        try:
+            os.remove(database + suffix)
+        except FileNotFoundError:
+            pass
+    os.rmdir(workdir)
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import json
+import math
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    """`latencies` : requêtes réussies uniquement. Les échecs (souvent des
+    refus rapides, 503...) ne comptent ni dans le débit ni dans les centiles"""
+    values = sorted(latencies)
+    count = len(values)
+    total = count + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "rps": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Liste des régressions : taux d'erreur en hausse, p95 plus lent ou débit
+    plus faible que la référence au-delà de `threshold` (0.10 = 10 %)"""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if reference is None:
+            continue
+        reference_rate = reference.get("error_rate", 0.0)
+        if current.get("error_rate", 0.0) > reference_rate:
+            regressions.append((name, "error_rate", reference_rate, current["error_rate"]))
+        if reference["p95_ms"] and current["p95_ms"] > reference["p95_ms"] * (1 + threshold):
+            regressions.append((name, "p95_ms", reference["p95_ms"], current["p95_ms"]))
+        if reference["rps"] and current["rps"] < reference["rps"] * (1 - threshold):
+            regressions.append((name, "rps", reference["rps"], current["rps"]))
+    return regressions
+
+
+def failing(results: dict, max_error_rate: float = 0.0) -> list:
+    """Scénarios dont le taux d'erreur dépasse `max_error_rate` : leurs mesures
+    ne sont pas comparables, le lancement échoue"""
+    return [
+        (name, s["errors"], s["error_rate"])
+        for name, s in results["scenarios"].items()
+        if s.get("error_rate", 0.0) > max_error_rate
+    ]
+
+
+def print_table(results: dict, baseline: dict = None):
+    header = f"{'scénario':<18}{'req':>7}{'err':>5}{'err %':>7}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    if baseline:
+        header += f"{'Δp95':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, s in results["scenarios"].items():
+        line = (f"{name:<18}{s['requests']:>7}{s['errors']:>5}{s.get('error_rate', 0.0) * 100:>7.1f}{s['rps']:>10.1f}"
+                f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}")
+        reference = (baseline or {}).get("scenarios", {}).get(name)
+        if reference and reference["p95_ms"]:
+            line += f"{(s['p95_ms'] / reference['p95_ms'] - 1) * 100:>+8.1f}%"
+        print(line)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(results: dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
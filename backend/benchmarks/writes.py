@@ -0,0 +1,153 @@
+"""Débit des écritures unitaires concurrentes : une transaction par requête
+(db.transaction) contre les transactions groupées du GroupCommitWriter.
+
+Usage (depuis backend/) :
+
+    python -m benchmarks.writes --operations 2000 --concurrency 1,16,64
+    python -m benchmarks.writes --window 0,1,5 --max-batch 128 --synchronous FULL
+    python -m benchmarks.writes --shards 1,2,4 --concurrency 64 --synchronous FULL
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from app.db import Database
+from app.migrations import migrate
+from app.pool import DEFAULT_PRAGMAS, ConnectionPool
+from app.repository import SQLiteRepository
+from app.shards import Shard, prepare_shard, shard_index, shard_paths
+from app.writer import GroupCommitWriter
+
+from .seed import random_contact
+from .stats import summarize
+
+
+def create_contact(conn: sqlite3.Connection, user_id: int, contact: dict) -> dict:
+    return SQLiteRepository(conn).create_contact(user_id, contact)
+
+
+async def measure(submit, users, operations: int, concurrency: int) -> dict:
+    rng = random.Random(concurrency)
+    contacts = [dict(zip(("first_name", "last_name", "phone", "email"), random_contact(rng, serial)))
+                for serial in range(operations)]
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(serial, contact):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                user_id = users[serial % len(users)]
+                await submit(user_id)(create_contact, user_id, contact)
+            except sqlite3.Error:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(serial, contact) for serial, contact in enumerate(contacts)))
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, errors, elapsed)
+
+
+async def run_path(database: str, path: str, window_ms: float, max_batch: int, operations: int,
+                   concurrency: int, pragmas) -> dict:
+    pool = ConnectionPool(database, size=8, pragmas=pragmas)
+    db = Database(pool)
+    writer = GroupCommitWriter(pool, window_ms=window_ms, max_batch=max_batch)
+    try:
+        submit = writer.submit if path == "groupé" else db.transaction
+        result = await measure(lambda user_id: submit, [1], operations, concurrency)
+        result["avg_batch"] = writer.stats()["avg_batch"] if path == "groupé" else 1.0
+        return result
+    finally:
+        writer.shutdown()
+        db.shutdown()
+
+
+def create_users(database: str, count: int):
+    conn = sqlite3.connect(database)
+    conn.executemany(
+        "INSERT INTO users (first_name, last_name, email, password) VALUES ('Bench', 'User', ?, 'x')",
+        [(f"bench{index}@example.com",) for index in range(count)]
+    )
+    conn.commit()
+    conn.close()
+
+
+async def run_shards(workdir: str, count: int, window_ms: float, max_batch: int, operations: int,
+                     concurrency: int, pragmas) -> dict:
+    """Écritures groupées de plusieurs utilisateurs répartis sur `count` fichiers"""
+    shards = []
+    for index, path in enumerate(shard_paths(os.path.join(workdir, f"shards-{count}"), count)):
+        prepare_shard(path, index)
+        pool = ConnectionPool(path, size=2, pragmas=pragmas)
+        shards.append(Shard(index, path, pool, Database(pool), GroupCommitWriter(pool, window_ms, max_batch)))
+    try:
+        # 64 utilisateurs : assez pour couvrir chaque shard
+        users = list(range(1, 65))
+        result = await measure(lambda user_id: shards[shard_index(user_id, count)].write, users,
+                               operations, concurrency)
+        stats = [shard.writer.stats() for shard in shards]
+        batches = sum(stat["batches"] for stat in stats)
+        result["avg_batch"] = sum(stat["operations"] for stat in stats) / batches if batches else 0.0
+        return result
+    finally:
+        for shard in shards:
+            shard.shutdown()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.writes")
+    parser.add_argument("--operations", type=int, default=2000, help="créations par mesure")
+    parser.add_argument("--concurrency", default="1,16,64", help="requêtes simultanées à tester")
+    parser.add_argument("--window", default="2", help="fenêtres de regroupement à tester (ms)")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--shards", default="", help="nombres de shards à comparer (ex. 1,2,4)")
+    parser.add_argument("--synchronous", default="NORMAL", choices=("OFF", "NORMAL", "FULL"),
+                        help="FULL : un fsync par COMMIT")
+    args = parser.parse_args(argv)
+
+    pragmas = tuple(p for p in DEFAULT_PRAGMAS if "synchronous" not in p) + (f"PRAGMA synchronous={args.synchronous}",)
+    workdir = tempfile.mkdtemp(prefix="contacts-bench-")
+    database = os.path.join(workdir, "bench.db")
+    try:
+        migrate(database)
+        create_users(database, 1)
+
+        print(f"✍️  {args.operations} créations par mesure, synchronous={args.synchronous}, "
+              f"max_batch={args.max_batch}")
+        print(f"{'chemin':>14} {'concurrence':>12} {'écritures/s':>12} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'lot moyen':>10} {'erreurs':>8}")
+        for concurrency in (int(value) for value in args.concurrency.split(",")):
+            paths = [("unitaire", 0.0)] + [("groupé", float(window)) for window in args.window.split(",")]
+            for path, window in paths:
+                result = asyncio.run(run_path(database, path, window, args.max_batch, args.operations,
+                                              concurrency, pragmas))
+                label = path if path == "unitaire" else f"{path} {window:g}ms"
+                print(f"{label:>14} {concurrency:>12} {result['rps']:>12.0f} {result['p50_ms']:>8.2f} "
+                      f"{result['p99_ms']:>8.2f} {result['avg_batch']:>10.1f} {result['errors']:>8}")
+
+        for count in (int(value) for value in args.shards.split(",") if value):
+            for concurrency in (int(value) for value in args.concurrency.split(",")):
+                window = float(args.window.split(",")[0])
+                result = asyncio.run(run_shards(workdir, count, window, args.max_batch, args.operations,
+                                                concurrency, pragmas))
+                label = f"{count} shard{'s' if count > 1 else ''}"
+                print(f"{label:>14} {concurrency:>12} {result['rps']:>12.0f} {result['p50_ms']:>8.2f} "
+                      f"{result['p99_ms']:>8.2f} {result['avg_batch']:>10.1f} {result['errors']:>8}")
+    finally:
+        shutil.rmtree(workdir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
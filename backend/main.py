@@ -1,23 +1,158 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, ValidationError
+from typing import Dict, List, Literal, Optional
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
+from contextlib import asynccontextmanager
+from jose import JWTError
+import asyncio
+import hmac
 import sqlite3
-import secrets
+import os
+import base64
+import json
+import time
+import logging
+
+import anyio
+
+from app.logs import AccessLogMiddleware, setup_logging
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, Registry, instrument_queries
+from app.pool import ConnectionPool, PoolTimeout
+from app.db import Database
+from app.writer import GroupCommitWriter
+from app.shards import Shard, ShardSet, describe, prepare_shard, shard_paths
+from app.repository import CONTACT_INPUT_FIELDS, DuplicateEmail, SQLiteRepository
+from app.dedup import MATCH_KEYS, fill_missing_keys, find_duplicate_of, find_duplicates
+from app.cache import TTLCache
+from app.keys import load_keyring
+from app.migrations import latest_version, migrate, schema_version
+from app.hashing import HasherBusy, PasswordHasher, context_settings
+from app.search import SearchCache, normalize_query
+from app.stats import get_user_stats, totals, user_count
+from app.sync import (
+    current_profile_version, current_version, get_changed_profiles, get_changed_users, get_changes, get_user_version,
+)
+from app.conditional import is_not_modified, make_etag, parse_timestamp, validators
+from app.exporter import FORMATS as EXPORT_FORMATS, stream_contacts
+from app.serialize import contact_json, contacts_json, json_response
+from app.coalesce import SingleFlight
+from app.admission import AdmissionMiddleware, ConcurrencyLimiter, RateLimiter, parse_budgets, request_class, retry_after_header
+from app.importer import ImportFormatError, RowError, detect_format, import_stream, normalize_record, validation_messages
 
 # ===========================================
 # CONFIGURATION
 # ===========================================
 
-SECRET_KEY = secrets.token_urlsafe(32)  # Génère une clé sécurisée aléatoire
+# Clés JWT communes à tous les workers et stables entre redémarrages : SECRET_KEYS
+# ("kid:secret,..." pour la rotation), SECRET_KEY, ou fichier créé au premier lancement
+SECRET_KEY_FILE = os.getenv("SECRET_KEY_FILE", "secret.key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 # Base de données
-DATABASE_URL = "contacts.db"
+DATABASE_URL = os.getenv("CONTACTS_DB", "contacts.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_THREADS = int(os.getenv("DB_THREADS", str(DB_POOL_SIZE)))
+DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", "2"))  # connexions ouvertes au démarrage
+ANYIO_THREADS = int(os.getenv("ANYIO_THREADS", "40"))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+# Créations / modifications / suppressions unitaires regroupées dans une même
+# transaction (au plus WRITE_MAX_BATCH, arrivées dans les WRITE_WINDOW_MS ms).
+# Avec une fenêtre de 0, un lot réunit les écritures arrivées pendant le COMMIT
+# précédent ; 1 à 5 ms n'aident que sous de fortes rafales (benchmarks.writes)
+GROUP_COMMIT = os.getenv("GROUP_COMMIT", "1").lower() not in ("0", "false", "no")
+WRITE_WINDOW_MS = float(os.getenv("WRITE_WINDOW_MS", "0"))
+WRITE_MAX_BATCH = int(os.getenv("WRITE_MAX_BATCH", "64"))
+
+# Contacts répartis sur SHARDS fichiers SQLite dans SHARD_DIR (0 = tout dans
+# CONTACTS_DB) ; les utilisateurs restent dans CONTACTS_DB. Changer SHARDS
+# impose de lancer python -m app.shards rebalance, API arrêtée.
+SHARDS = int(os.getenv("SHARDS", "0"))
+SHARD_DIR = os.getenv("SHARD_DIR", "shards")
+SHARD_POOL_SIZE = int(os.getenv("SHARD_POOL_SIZE", "4"))
+
+# Jeton des routes /admin (en-tête X-Admin-Token) ; non défini = routes désactivées
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Cache des jetons vérifiés et des utilisateurs authentifiés
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+# Hachage des mots de passe (bcrypt ou argon2) sur un pool dédié et borné
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "bcrypt")
+PASSWORD_COST = int(os.getenv("PASSWORD_COST", "0")) or None  # 12 (bcrypt) / 3 (argon2) par défaut
+ARGON2_MEMORY_KB = int(os.getenv("ARGON2_MEMORY_KB", "65536"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "0")) or None  # nombre de cœurs par défaut
+HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "thread")  # thread ou process
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "0")) or None  # 32 x HASH_WORKERS par défaut
+HASH_MAX_WAIT_MS = int(os.getenv("HASH_MAX_WAIT_MS", "5000"))  # attente maximale avant un refus (503)
+
+# Cache des résultats de /contacts/search (0 pour le désactiver)
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "5000"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "30"))
+
+# Listes de contacts sérialisées directement depuis SQLite (sans Pydantic en sortie)
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "1").lower() not in ("0", "false", "no")
+
+# Lectures identiques simultanées (liste, contact, recherche) servies par une
+# seule requête SQL et une seule sérialisation
+COALESCE_READS = os.getenv("COALESCE_READS", "1").lower() not in ("0", "false", "no")
+
+# Migrations du schéma au démarrage (run.py les applique une fois pour tous les
+# workers) et utilisateur de test test@test.com / test123, désactivé par défaut
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1").lower() not in ("0", "false", "no")
+SEED_TEST_USER = os.getenv("SEED_TEST_USER", "0").lower() in ("1", "true", "yes")
+
+# Doublons à la création d'un contact : warn (créé, en-tête X-Duplicate-Of),
+# reject (409) ou allow (aucune vérification) ; modifiable par ?on_duplicate=
+DEDUP_ON_CREATE = os.getenv("DEDUP_ON_CREATE", "warn")
+
+# Limitation de débit par utilisateur et par IP (seaux à jetons, par worker).
+# RATE_LIMITS modifie les budgets par défaut, "classe=jetons par seconde/capacité" :
+# auth=0.5/5,read=20/100,write=10/50,search=5/30 ; une IP a RATE_LIMIT_IP_FACTOR
+# fois le budget d'un utilisateur
+RATE_LIMIT = os.getenv("RATE_LIMIT", "1").lower() not in ("0", "false", "no")
+RATE_LIMITS = os.getenv("RATE_LIMITS", "")
+RATE_LIMIT_IP_FACTOR = float(os.getenv("RATE_LIMIT_IP_FACTOR", "4"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+# Nombre de proxys de confiance devant l'API : l'IP du client est l'entrée de
+# X-Forwarded-For ajoutée par le plus éloigné d'entre eux (0 = IP de la connexion)
+# (TRUST_PROXY=1 ou yes : un seul proxy)
+TRUST_PROXY = os.getenv("TRUST_PROXY", "0").lower()
+TRUSTED_PROXIES = int({"true": "1", "yes": "1", "false": "0", "no": "0"}.get(TRUST_PROXY, TRUST_PROXY))
+
+# Requêtes traitées simultanément par worker (0 = sans limite) ; au-delà, file
+# d'attente de MAX_QUEUED_REQUESTS places et 503 après QUEUE_TIMEOUT_MS d'attente
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "64"))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "256"))
+QUEUE_TIMEOUT_MS = float(os.getenv("QUEUE_TIMEOUT_MS", "1000"))
+
+# Intervalle (s) de lecture des changements faits par les autres workers (0 = jamais)
+CACHE_SYNC_INTERVAL = float(os.getenv("CACHE_SYNC_INTERVAL", "1"))
+
+keyring = load_keyring(ALGORITHM, SECRET_KEY_FILE)
+
+# Métriques Prometheus (/metrics) et journal des requêtes SQL lentes
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+# Logs JSON asynchrones, niveau réglable par LOG_LEVEL
+setup_logging()
+logger = logging.getLogger("contacts.api")
+
+# Démarrage et arrêt de chaque worker (voir CYCLE DE VIE en fin de fichier)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
 
 # Initialiser FastAPI
 app = FastAPI(
@@ -25,9 +160,19 @@ app = FastAPI(
     version="1.0.0",
     description="API de gestion de contacts avec authentification JWT",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+# Contrôle d'admission (app/admission.py) : ajouté avant CORS pour que les
+# réponses 429 / 503 portent les en-têtes CORS
+rate_limiter = RateLimiter(parse_budgets(RATE_LIMITS), ip_factor=RATE_LIMIT_IP_FACTOR,
+                           maxsize=RATE_LIMIT_MAX_KEYS) if RATE_LIMIT else None
+concurrency_limiter = ConcurrencyLimiter(MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS,
+                                         QUEUE_TIMEOUT_MS / 1000) if MAX_CONCURRENT_REQUESTS > 0 else None
+app.add_middleware(AdmissionMiddleware, limiter=rate_limiter, concurrency=concurrency_limiter,
+                   trusted_proxies=TRUSTED_PROXIES)
+
 # ===========================================
 # CORS MIDDLEWARE - CORRIGÉ
 # ===========================================
@@ -37,8 +182,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Autorise TOUTES les méthodes
     allow_headers=["*"],  # Autorise TOUS les headers
+    expose_headers=["X-Next-Cursor", "X-Request-ID", "ETag", "Last-Modified", "X-Duplicate-Of", "Retry-After"],
 )
 
+# Latence, taille de réponse et requêtes SQL par route
+metrics = Registry()
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Id de requête + une ligne de log (route, statut, durée) par requête
+app.add_middleware(AccessLogMiddleware)
+
 # ===========================================
 # MODÈLES PYDANTIC
 # ===========================================
@@ -58,6 +212,13 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserStats(BaseModel):
+    contacts: int
+    with_email: int
+    modified_at: Optional[datetime] = None
+    # Initiale du prénom ("#" hors A-Z) -> nombre de contacts
+    letters: Dict[str, int]
+
 class UserLogin(BaseModel):
     email: EmailStr = Field(..., example="jean.dupont@example.com")
     password: str = Field(..., example="password123")
@@ -76,6 +237,59 @@ class ContactResponse(ContactBase):
     class Config:
         from_attributes = True
 
+class SyncContact(ContactResponse):
+    version: int
+    updated_at: Optional[datetime] = None
+
+class ChangesResponse(BaseModel):
+    version: int
+    has_more: bool
+    reset: bool
+    upserted: List[SyncContact]
+    deleted: List[int]
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = Field(None, description="Requis pour update et delete")
+    contact: Optional[ContactBase] = Field(None, description="Requis pour create et update")
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=1000)
+
+class BatchResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: Optional[int] = None
+    contact: Optional[ContactResponse] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    failed: int
+    results: List[BatchResult]
+
+class DuplicateGroup(BaseModel):
+    matched_on: List[Literal["phone", "email", "name"]]
+    contacts: List[ContactResponse]
+
+class DuplicatesResponse(BaseModel):
+    total_groups: int
+    groups: List[DuplicateGroup]
+
+class MergeRequest(BaseModel):
+    target_id: int = Field(..., description="Contact conservé")
+    source_ids: List[int] = Field(..., min_length=1, max_length=100, description="Contacts fusionnés puis supprimés")
+    contact: Optional[ContactBase] = Field(
+        None, description="Valeurs finales ; par défaut celles de target_id, complétées par les sources"
+    )
+
+class MergeResponse(BaseModel):
+    contact: ContactResponse
+    merged: List[int]
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -95,15 +309,17 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 # FONCTIONS UTILITAIRES
 # ===========================================
 
-def get_password_hash(password: str) -> str:
-    """Version SIMPLE : pas de hash pour faciliter les tests"""
-    print(f"📝 Mot de passe stocké : {password}")
-    return password
+# Les routes passent par password_hasher (asynchrone, hors boucle d'événements).
+# Les anciens mots de passe en clair sont re-hachés à la connexion suivante.
+password_hasher = PasswordHasher(
+    context_settings(PASSWORD_SCHEME, PASSWORD_COST, ARGON2_MEMORY_KB),
+    workers=HASH_WORKERS, executor=HASH_EXECUTOR, max_pending=HASH_MAX_PENDING,
+    max_wait=HASH_MAX_WAIT_MS / 1000
+)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Version SIMPLE : compare directement"""
-    print(f"🔐 Comparaison : '{plain_password}' == '{hashed_password}'")
-    return plain_password == hashed_password
+def get_password_hash(password: str) -> str:
+    """Hachage synchrone, pour l'initialisation et les scripts"""
+    return password_hasher.hash_sync(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -112,104 +328,162 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = keyring.encode(to_encode)
     return encoded_jwt
 
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_URL)
-    conn.row_factory = sqlite3.Row
-    return conn
+def encode_cursor(created_at: str, contact_id: int) -> str:
+    """Curseur opaque de pagination construit à partir de (created_at, id)"""
+    raw = json.dumps([created_at, contact_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, contact_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(created_at, str) or not isinstance(contact_id, int):
+            raise ValueError(cursor)
+        return created_at, contact_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
+
+# ===========================================
+# ACCÈS À LA BASE DE DONNÉES
+# ===========================================
+
+# Connexions chronométrées (métriques, requêtes lentes)
+query_factory = instrument_queries(metrics, SLOW_QUERY_MS) if METRICS_ENABLED else sqlite3.Connection
+db_pool = ConnectionPool(DATABASE_URL, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, factory=query_factory)
+# Toutes les requêtes SQLite passent par ce pool de threads dédié
+db = Database(db_pool, threads=DB_THREADS)
+# Contacts : un shard par fichier, chacun avec son pool, son exécuteur et son
+# thread écrivain (GROUP_COMMIT). Sans sharding, un shard unique sur db_pool.
+if SHARDS:
+    shards = ShardSet([
+        Shard.open(index, path, pool_size=SHARD_POOL_SIZE, pool_timeout=DB_POOL_TIMEOUT, factory=query_factory,
+                   window_ms=WRITE_WINDOW_MS, max_batch=WRITE_MAX_BATCH, group_commit=GROUP_COMMIT)
+        for index, path in enumerate(shard_paths(SHARD_DIR, SHARDS))
+    ])
+else:
+    shards = ShardSet([Shard(
+        0, DATABASE_URL, db_pool, db,
+        GroupCommitWriter(db_pool, window_ms=WRITE_WINDOW_MS, max_batch=WRITE_MAX_BATCH), GROUP_COMMIT
+    )])
+
+def contacts_store(user_id: int) -> Shard:
+    """Shard des contacts de l'utilisateur : run(), transaction(), write()
+    (écriture courte regroupée dans un SAVEPOINT), iterate()"""
+    return shards.for_user(user_id)
+
+# Requêtes utilisateurs / contacts (app/repository.py) ; la synchronisation,
+# l'export et les compteurs restent propres à SQLite
+repository = SQLiteRepository
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Base de données saturée, réessayez plus tard"}
+    )
+
+@app.exception_handler(HasherBusy)
+async def hasher_busy_handler(request: Request, exc: HasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Trop de connexions simultanées, réessayez plus tard"},
+        headers={"Retry-After": "1"}
+    )
 
 # ===========================================
 # INITIALISATION DE LA BASE DE DONNÉES
 # ===========================================
 
-def init_db():
-    conn = sqlite3.connect(DATABASE_URL)
-    cursor = conn.cursor()
-    
-    # Table des utilisateurs
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Table des contacts
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS contacts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            email TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Créer un index pour accélérer les recherches
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_contacts_user_id 
-        ON contacts(user_id)
-    ''')
-    
-    # Créer un utilisateur de test s'il n'existe pas
-    cursor.execute("SELECT COUNT(*) FROM users WHERE email = 'test@test.com'")
-    if cursor.fetchone()[0] == 0:
-        cursor.execute(
-            "INSERT INTO users (first_name, last_name, email, password) VALUES (?, ?, ?, ?)",
-            ("Test", "User", "test@test.com", "test123")
-        )
-        print("✅ Utilisateur de test créé: test@test.com / test123")
-    
+def seed_test_user(conn: sqlite3.Connection) -> bool:
+    """Crée test@test.com / test123 s'il n'existe pas (SEED_TEST_USER=1)"""
+    if conn.execute("SELECT 1 FROM users WHERE email = 'test@test.com'").fetchone():
+        return False
+    conn.execute(
+        "INSERT INTO users (first_name, last_name, email, password) VALUES (?, ?, ?, ?)",
+        ("Test", "User", "test@test.com", get_password_hash("test123"))
+    )
     conn.commit()
-    conn.close()
-    print("✅ Base de données initialisée !")
+    logger.info("Utilisateur de test créé: test@test.com")
+    return True
 
-# Appeler init_db au démarrage
-init_db()
+def prepare_database() -> dict:
+    """Migrations manquantes puis données initiales ; appelé une fois par
+    run.py avant les workers, ou au démarrage de chaque worker"""
+    applied = migrate(DATABASE_URL)
+    if SHARDS:
+        for shard in shards:
+            prepare_shard(shard.path, shard.index)
+    seeded = False
+    if SEED_TEST_USER:
+        with db_pool.connection() as conn:
+            seeded = seed_test_user(conn)
+    logger.info("Base de données initialisée", extra={"database": DATABASE_URL})
+    return {"migrations": [m["version"] for m in applied], "seeded": seeded}
 
 # ===========================================
 # AUTHENTIFICATION
 # ===========================================
 
+# Jeton brut -> (user_id, email, exp) : évite de revérifier la signature HMAC
+token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+# (user_id, email, exp) -> ligne utilisateur : évite un SELECT par requête.
+# Aucune route ne modifie un profil ; les changements faits ailleurs arrivent
+# par le flux profile_versions (apply_profile_changes)
+principal_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+def fetch_principal(conn: sqlite3.Connection, user_id: int, email: str):
+    return repository(conn).get_user(user_id, email)
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Impossible de valider les identifiants",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        user_id: int = payload.get("user_id")
-        if email is None or user_id is None:
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            payload = keyring.decode(token)
+            email: str = payload.get("sub")
+            user_id: int = payload.get("user_id")
+            if email is None or user_id is None:
+                raise credentials_exception
+            token_data = TokenData(email=email, user_id=user_id)
+        except JWTError:
             raise credentials_exception
-        token_data = TokenData(email=email, user_id=user_id)
-    except JWTError:
-        raise credentials_exception
+        claims = (token_data.user_id, token_data.email, payload.get("exp", 0))
+        # Une entrée ne survit jamais à l'expiration du jeton
+        token_cache.set(token, claims, ttl=claims[2] - time.time())
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, first_name, last_name, email, created_at FROM users WHERE id = ? AND email = ?",
-        (token_data.user_id, token_data.email)
-    )
-    user = cursor.fetchone()
-    conn.close()
+    user = principal_cache.get(claims)
+    if user is not None:
+        return user
+    
+    user = await db.run(fetch_principal, claims[0], claims[1])
     
     if user is None:
         raise credentials_exception
-    return dict(user)
+    principal_cache.set(claims, user, ttl=claims[2] - time.time())
+    return user
 
-async def get_current_active_user(current_user: dict = Depends(get_current_user)):
+async def get_current_active_user(request: Request, current_user: dict = Depends(get_current_user)):
+    # Budget de l'utilisateur pour cette classe de requêtes (le budget par IP
+    # est vérifié plus tôt, par AdmissionMiddleware)
+    kind = request_class(request.method, request.scope["path"])
+    if rate_limiter is not None and kind is not None:
+        retry_after = rate_limiter.check(kind, "user", current_user["id"])
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Trop de requêtes, réessayez plus tard",
+                headers={"Retry-After": retry_after_header(retry_after)}
+            )
     return current_user
 
 # ===========================================
@@ -217,25 +491,26 @@ async def get_current_active_user(current_user: dict = Depends(get_current_user)
 # ===========================================
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {
         "message": "Bienvenue sur l'API Contacts",
         "version": "1.0.0",
         "documentation": "/docs",
         "endpoints": {
-            "auth": ["/register", "/token", "/me"],
+            "auth": ["/register", "/token", "/me", "/me/stats"],
             "contacts": ["/contacts (GET, POST)", "/contacts/{id} (GET, PUT, DELETE)"],
+            "duplicates": ["/contacts/duplicates", "/contacts/merge (POST)"],
+            "admin": ["/admin/shards", "/admin/shards/users/{user_id}"],
             "search": ["/contacts/search/{query}"],
-            "test": ["/health", "/test-db"]
+            "test": ["/health", "/test-db", "/metrics"]
         }
     }
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Vérifie l'état de l'API"""
     try:
-        conn = get_db_connection()
-        conn.close()
+        await db.run(lambda conn: conn.execute("SELECT 1").fetchone())
         db_status = "healthy"
     except:
         db_status = "unhealthy"
@@ -243,36 +518,100 @@ def health_check():
     return {
         "status": "ok",
         "database": db_status,
+        "pool": db.stats(),
+        "shards": len(shards) if SHARDS else 0,
+        "writers": [shard.writer.stats() for shard in shards],
+        "caches": {
+            "auth_tokens": token_cache.stats(),
+            "auth_principals": principal_cache.stats(),
+            "search": search_cache.stats(),
+        },
+        "coalescing": reads.stats(),
+        "admission": admission_stats(),
+        "password_hashing": password_hasher.stats(),
+        "startup": startup_info,
         "timestamp": datetime.utcnow().isoformat()
     }
 
+def admission_stats() -> dict:
+    return {
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else None,
+        "concurrency": concurrency_limiter.stats() if concurrency_limiter is not None else None,
+    }
+
+def collect_runtime_metrics():
+    """État du pool et des caches, lu uniquement au moment de l'export"""
+    pool = db.stats()
+    yield ("contacts_db_pool_connections", "gauge", "Connexions SQLite du pool par état", {
+        (("state", "in_use"),): pool["in_use"],
+        (("state", "idle"),): pool["idle"],
+        (("state", "waiting"),): pool["waiting"],
+    })
+    yield ("contacts_db_pool_size", "gauge", "Taille maximale du pool", {(): pool["size"]})
+    yield ("contacts_db_pool_checkouts_total", "counter", "Connexions empruntées au pool", {(): pool["checkouts"]})
+    yield ("contacts_db_pool_timeouts_total", "counter", "Attentes de connexion expirées", {(): pool["timeouts"]})
+    writes = {(("shard", str(shard.index)),): shard.writer.stats() for shard in shards}
+    yield ("contacts_db_write_batches_total", "counter", "Transactions groupées validées",
+           {labels: stats["batches"] for labels, stats in writes.items()})
+    yield ("contacts_db_write_operations_total", "counter", "Écritures passées par les transactions groupées",
+           {labels: stats["operations"] for labels, stats in writes.items()})
+    yield ("contacts_db_write_pending", "gauge", "Écritures en attente du thread écrivain",
+           {labels: stats["pending"] for labels, stats in writes.items()})
+    coalescing = reads.stats()["routes"]
+    yield ("contacts_coalesced_requests_total", "counter",
+           "Lectures exécutées ou servies par une lecture identique déjà en cours", {
+               (("route", route), ("result", result)): stats[result]
+               for route, stats in coalescing.items() for result in ("executed", "shared")
+           })
+    yield ("contacts_coalescing_ratio", "gauge", "Part des lectures servies par une lecture déjà en cours",
+           {(("route", route),): stats["ratio"] for route, stats in coalescing.items()})
+    if rate_limiter is not None:
+        limits = rate_limiter.stats()
+        yield ("contacts_rate_limited_total", "counter", "Requêtes refusées (429) par classe",
+               {(("class", name),): limits["limited"].get(name, 0) for name in limits["budgets"]})
+        yield ("contacts_rate_limit_buckets", "gauge", "Seaux à jetons en mémoire", {(): limits["buckets"]})
+    if concurrency_limiter is not None:
+        admission = concurrency_limiter.stats()
+        yield ("contacts_admission_requests", "gauge", "Requêtes admises en cours ou en attente", {
+            (("state", "active"),): admission["active"],
+            (("state", "waiting"),): admission["waiting"],
+        })
+        yield ("contacts_admission_shed_total", "counter", "Requêtes refusées (503) par surcharge",
+               {(("reason", reason),): count for reason, count in admission["rejected"].items()})
+    if startup_info["duration_ms"] is not None:
+        yield ("contacts_startup_seconds", "gauge", "Durée du démarrage du worker",
+               {(): startup_info["duration_ms"] / 1000})
+    caches = {
+        "auth_tokens": token_cache.stats(),
+        "auth_principals": principal_cache.stats(),
+        "search": search_cache.stats(),
+    }
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+        suffix = "_total" if kind == "counter" else ""
+        yield (f"contacts_cache_{field}{suffix}", kind, f"Caches en mémoire : {field}", {
+            (("cache", name),): stats[field] for name, stats in caches.items()
+        })
+
+metrics.register_collector(collect_runtime_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Métriques au format texte Prometheus"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/test-db")
-def test_db():
+async def test_db():
     """Teste la connexion à la base de données"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Compter les utilisateurs
-        cursor.execute("SELECT COUNT(*) FROM users")
-        user_count = cursor.fetchone()[0]
-        
-        # Compter les contacts
-        cursor.execute("SELECT COUNT(*) FROM contacts")
-        contact_count = cursor.fetchone()[0]
-        
-        # Lister les utilisateurs
-        cursor.execute("SELECT id, email FROM users")
-        users = cursor.fetchall()
-        
-        conn.close()
+        # Compteurs tenus par des triggers (app/stats.py) : aucun parcours de table
+        user_total = await db.run(user_count)
+        contact_count = sum([(await shard.run(totals))["contacts"] for shard in shards])
         
         return {
             "status": "OK",
             "database": DATABASE_URL,
-            "users_count": user_count,
-            "contacts_count": contact_count,
-            "users": [dict(u) for u in users]
+            "users_count": user_total,
+            "contacts_count": contact_count
         }
     except Exception as e:
         return {"status": "ERROR", "error": str(e)}
@@ -282,90 +621,72 @@ def test_db():
 # ===========================================
 
 @app.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate):
+async def register(user: UserCreate):
     """Inscription d'un nouvel utilisateur"""
-    print(f"📝 Tentative d'inscription pour: {user.email}")
+    logger.debug("Tentative d'inscription pour: %s", user.email)
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Vérifier si l'email existe déjà
-    cursor.execute("SELECT id FROM users WHERE email = ?", (user.email,))
-    if cursor.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cet email est déjà utilisé"
-        )
+    # Hasher le mot de passe (pool dédié, la boucle reste libre)
+    hashed_password = await password_hasher.hash(user.password)
     
-    # Hasher le mot de passe
-    hashed_password = get_password_hash(user.password)
+    def insert_user(conn: sqlite3.Connection):
+        # L'unicité de l'email est garantie par la contrainte UNIQUE
+        try:
+            return repository(conn).create_user(user.first_name, user.last_name, user.email, hashed_password)
+        except DuplicateEmail:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cet email est déjà utilisé"
+            )
     
-    # Insérer l'utilisateur
     try:
-        cursor.execute(
-            "INSERT INTO users (first_name, last_name, email, password) VALUES (?, ?, ?, ?)",
-            (user.first_name, user.last_name, user.email, hashed_password)
-        )
-        conn.commit()
-        user_id = cursor.lastrowid
-        
-        # Récupérer l'utilisateur créé
-        cursor.execute(
-            "SELECT id, first_name, last_name, email, created_at FROM users WHERE id = ?",
-            (user_id,)
-        )
-        new_user = cursor.fetchone()
-        conn.close()
-        
-        print(f"✅ Utilisateur créé avec ID: {user_id}")
-        return dict(new_user)
-    except Exception as e:
-        conn.close()
-        print(f"❌ Erreur lors de l'inscription: {e}")
+        new_user = await db.transaction(insert_user)
+    except sqlite3.Error as e:
+        logger.exception("Erreur lors de l'inscription")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de l'inscription: {str(e)}"
         )
+    
+    logger.info("Utilisateur créé", extra={"user_id": new_user["id"]})
+    return new_user
+
+def fetch_user_by_email(conn: sqlite3.Connection, email: str):
+    return repository(conn).get_user_by_email(email)
+
+def update_password_hash(conn: sqlite3.Connection, user_id: int, old_hash: str, new_hash: str):
+    # Ne remplace que le hachage vérifié (un changement concurrent est conservé)
+    return repository(conn).update_password(user_id, old_hash, new_hash)
 
 @app.post("/token", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Connexion et obtention du token JWT"""
-    print(f"🔑 Tentative de connexion pour: {form_data.username}")
-    print(f"🔑 Mot de passe reçu: {form_data.password}")
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    logger.debug("Tentative de connexion pour: %s", form_data.username)
     
     # Récupérer l'utilisateur
-    cursor.execute(
-        "SELECT id, first_name, last_name, email, password, created_at FROM users WHERE email = ?",
-        (form_data.username,)
-    )
-    user = cursor.fetchone()
-    conn.close()
+    user = await db.run(fetch_user_by_email, form_data.username)
     
     if not user:
-        print(f"❌ Utilisateur non trouvé: {form_data.username}")
+        logger.info("Échec de connexion: utilisateur inconnu")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou mot de passe incorrect",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"✅ Utilisateur trouvé: {user['email']}")
-    print(f"🔐 Vérification du mot de passe...")
-    
     # Vérifier le mot de passe
-    if not verify_password(form_data.password, user["password"]):
-        print(f"❌ Mot de passe incorrect")
+    valid, new_hash = await password_hasher.verify(form_data.password, user["password"])
+    if not valid:
+        logger.info("Échec de connexion: mot de passe incorrect", extra={"user_id": user["id"]})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou mot de passe incorrect",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"✅ Mot de passe correct")
+    # Algorithme ou coût modifié, ou mot de passe encore en clair : re-hacher
+    if new_hash is not None:
+        await db.transaction(update_password_hash, user["id"], user["password"], new_hash)
+        logger.info("Mot de passe re-haché", extra={"user_id": user["id"]})
     
     # Créer le token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -382,8 +703,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
         "created_at": user["created_at"]
     }
     
-    print(f"✅ Connexion réussie pour: {user['email']}")
-    print(f"🔑 Token généré: {access_token[:20]}...")
+    logger.debug("Connexion réussie pour user_id: %s", user["id"])
     
     return {
         "access_token": access_token,
@@ -392,228 +712,673 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
     }
 
 @app.get("/me", response_model=UserResponse)
-def get_me(current_user: dict = Depends(get_current_active_user)):
+async def get_me(current_user: dict = Depends(get_current_active_user)):
     """Obtenir les informations de l'utilisateur connecté"""
     return current_user
 
+@app.get("/me/stats", response_model=UserStats)
+async def get_my_stats(current_user: dict = Depends(get_current_active_user)):
+    """Nombre de contacts, contacts avec email, dernière modification et
+    nombre de contacts par initiale, sans parcourir les contacts"""
+    return await contacts_store(current_user["id"]).run(get_user_stats, current_user["id"])
+
 # ===========================================
 # CONTACTS - ROUTES
 # ===========================================
 
+NOT_MODIFIED = object()
+
+# Résultats de /contacts/search par utilisateur, invalidés à chaque écriture
+search_cache = SearchCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+# Lectures en cours partagées entre requêtes identiques (app/coalesce.py)
+reads = SingleFlight(enabled=COALESCE_READS)
+
+def contacts_changed(user_id: int):
+    """À appeler après toute écriture validée sur les contacts d'un utilisateur"""
+    search_cache.bump(user_id)
+    reads.bump(user_id)
+
+def conditional_params(request: Request) -> tuple:
+    """En-têtes qui changent la réponse d'une lecture conditionnelle"""
+    return request.headers.get("if-none-match"), request.headers.get("if-modified-since")
+
+def read_if_modified(conn: sqlite3.Connection, request_headers, user_id: int, fetch, *args, **kwargs):
+    """Lecture conditionnelle : la version des contacts de l'utilisateur est lue
+    d'abord, `fetch` n'est appelé que si le client n'a pas déjà cette version.
+    Renvoie (en-têtes de validation, résultat ou NOT_MODIFIED)"""
+    version, modified_at = get_user_version(conn, user_id)
+    etag = make_etag(user_id, version)
+    last_modified = parse_timestamp(modified_at)
+    headers = validators(etag, last_modified)
+    if is_not_modified(request_headers, etag, last_modified):
+        return headers, NOT_MODIFIED
+    return headers, fetch(conn, *args, **kwargs)
+
+def fetch_contacts_page(conn: sqlite3.Connection, user_id: int, limit: int, skip: int = 0, after=None):
+    return repository(conn).list_contacts(user_id, limit, skip=skip, after=after)
+
 @app.get("/contacts", response_model=List[ContactResponse])
-def get_contacts(
+async def get_contacts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Récupérer tous les contacts de l'utilisateur"""
-    print(f"📋 Récupération des contacts pour user_id: {current_user['id']}")
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """SELECT id, user_id, first_name, last_name, phone, email, created_at 
-           FROM contacts WHERE user_id = ? 
-           ORDER BY created_at DESC 
-           LIMIT ? OFFSET ?""",
-        (current_user["id"], limit, skip)
-    )
-    contacts = cursor.fetchall()
-    conn.close()
+    """Récupérer tous les contacts de l'utilisateur
+
+    Sans `cursor`, l'ancienne pagination skip/limit reste disponible. Avec
+    `cursor` (valeur de l'en-tête X-Next-Cursor de la page précédente), la
+    page est lue directement dans l'index, quel que soit son rang.
+
+    Sérialisation directe des lignes (FAST_SERIALIZATION), même JSON que
+    ContactResponse. Réponse 304 si If-None-Match correspond à la version
+    actuelle des contacts (ETag faible) ; Last-Modified est informatif.
+    """
+    logger.debug("Récupération des contacts pour user_id: %s", current_user["id"])
+    
+    after = None
+    if page_cursor:
+        if skip:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="skip et cursor ne peuvent pas être combinés"
+            )
+        after = decode_cursor(page_cursor)
+    
+    async def load():
+        headers, contacts = await contacts_store(current_user["id"]).run(
+            read_if_modified, request.headers, current_user["id"],
+            fetch_contacts_page, current_user["id"], limit, skip=skip, after=after
+        )
+        if contacts is NOT_MODIFIED:
+            return headers, contacts, None
+        # Page pleine : il peut rester des contacts après le dernier renvoyé
+        if contacts and len(contacts) == limit:
+            last = contacts[-1]
+            headers["X-Next-Cursor"] = encode_cursor(last["created_at"], last["id"])
+        logger.debug("%d contacts récupérés", len(contacts))
+        return headers, contacts, contacts_json(contacts) if FAST_SERIALIZATION else None
     
-    print(f"✅ {len(contacts)} contacts récupérés")
-    return [dict(contact) for contact in contacts]
+    # Requêtes identiques simultanées : une seule lecture (résultat partagé)
+    headers, contacts, body = await reads.do(
+        current_user["id"], "/contacts", (skip, limit, page_cursor) + conditional_params(request), load
+    )
+    if contacts is NOT_MODIFIED:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if body is not None:
+        return json_response(body, headers=headers)
+    response.headers.update(headers)
+    return contacts
 
 @app.post("/contacts", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
-def create_contact(
+async def create_contact(
     contact: ContactBase,
+    response: Response,
+    on_duplicate: Optional[Literal["warn", "reject", "allow"]] = Query(None),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Créer un nouveau contact"""
-    print(f"➕ Création d'un contact pour user_id: {current_user['id']}")
+    """Créer un nouveau contact
+
+    Les contacts existants de même téléphone ou de même email (après
+    normalisation) sont signalés par l'en-tête X-Duplicate-Of, ou refusés
+    avec un 409 si on_duplicate=reject.
+    """
+    logger.debug("Création d'un contact pour user_id: %s", current_user["id"])
+    mode = on_duplicate or DEDUP_ON_CREATE
+    duplicates = []
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    def insert_contact(conn: sqlite3.Connection):
+        data = contact.model_dump()
+        if mode != "allow":
+            duplicates.extend(find_duplicate_of(conn, current_user["id"], data))
+            if duplicates and mode == "reject":
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Contact déjà existant (id {', '.join(map(str, duplicates))})",
+                    headers={"X-Duplicate-Of": ",".join(map(str, duplicates))}
+                )
+        return repository(conn).create_contact(current_user["id"], data)
     
     try:
-        cursor.execute(
-            """INSERT INTO contacts 
-               (user_id, first_name, last_name, phone, email) 
-               VALUES (?, ?, ?, ?, ?)""",
-            (current_user["id"], contact.first_name, contact.last_name, contact.phone, contact.email)
+        new_contact = await contacts_store(current_user["id"]).write(insert_contact)
+    except sqlite3.Error as e:
+        logger.exception("Erreur création contact")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la création du contact: {str(e)}"
         )
-        conn.commit()
-        contact_id = cursor.lastrowid
+    
+    contacts_changed(current_user["id"])
+    if duplicates:
+        response.headers["X-Duplicate-Of"] = ",".join(map(str, duplicates))
+    logger.debug("Contact créé avec ID: %s", new_contact["id"])
+    return new_contact
+
+def apply_batch(conn: sqlite3.Connection, user_id: int, operations: List[BatchOperation]):
+    repo = repository(conn)
+    results = []
+    counts = {"create": 0, "update": 0, "delete": 0}
+    # Créations ou suppressions consécutives : une seule requête pour la série
+    run = []
+
+    def apply_run():
+        if not run:
+            return
+        kind = run[0][1].op
+        if kind == "create":
+            rows = repo.create_contacts(user_id, [op.contact.model_dump() for _, op in run])
+            for (index, op), row in zip(run, rows):
+                results.append({"index": index, "op": op.op, "status": 201, "id": row["id"], "contact": row})
+            counts["create"] += len(rows)
+        else:
+            # Aucune ligne renvoyée = contact absent ou d'un autre utilisateur
+            deleted = set(repo.delete_contacts(user_id, [op.id for _, op in run]))
+            for index, op in run:
+                if op.id not in deleted:
+                    results.append({"index": index, "op": op.op, "status": 404, "id": op.id, "error": "Contact non trouvé"})
+                    continue
+                # Un id répété n'est supprimé que par sa première occurrence
+                deleted.discard(op.id)
+                results.append({"index": index, "op": op.op, "status": 200, "id": op.id})
+                counts["delete"] += 1
+        run.clear()
+
+    for index, op in enumerate(operations):
+        if op.op in ("update", "delete") and op.id is None:
+            results.append({"index": index, "op": op.op, "status": 422, "error": "id requis"})
+            continue
+        if op.op in ("create", "update") and op.contact is None:
+            results.append({"index": index, "op": op.op, "status": 422, "id": op.id, "error": "contact requis"})
+            continue
         
-        cursor.execute(
-            """SELECT id, user_id, first_name, last_name, phone, email, created_at 
-               FROM contacts WHERE id = ?""",
-            (contact_id,)
+        if run and run[0][1].op != op.op:
+            apply_run()
+        if op.op != "update":
+            run.append((index, op))
+            continue
+        # update : aucune ligne touchée = contact absent ou d'un autre utilisateur
+        row = repo.update_contact(user_id, op.id, op.contact.model_dump())
+        if row is None:
+            results.append({"index": index, "op": op.op, "status": 404, "id": op.id, "error": "Contact non trouvé"})
+            continue
+        results.append({"index": index, "op": op.op, "status": 200, "id": op.id, "contact": row})
+        counts["update"] += 1
+    apply_run()
+    results.sort(key=lambda result: result["index"])
+    return results, counts
+
+@app.post("/contacts/batch", response_model=BatchResponse)
+async def batch_contacts(
+    batch: BatchRequest,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Appliquer plusieurs créations / mises à jour / suppressions en une transaction
+
+    Chaque opération reçoit son propre résultat (status HTTP équivalent) ;
+    une opération refusée n'empêche pas les autres d'être appliquées.
+    """
+    user_id = current_user["id"]
+    logger.debug("Batch de %d opérations pour user_id: %s", len(batch.operations), user_id)
+    
+    try:
+        results, counts = await contacts_store(user_id).transaction(apply_batch, user_id, batch.operations)
+    except sqlite3.Error as e:
+        logger.exception("Erreur batch contacts")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors du batch, aucune opération appliquée: {str(e)}"
         )
-        new_contact = cursor.fetchone()
-        conn.close()
-        
-        print(f"✅ Contact créé avec ID: {contact_id}")
-        return dict(new_contact)
-    except Exception as e:
-        conn.close()
-        print(f"❌ Erreur création contact: {e}")
+    
+    if any(counts.values()):
+        contacts_changed(user_id)
+    failed = len(results) - sum(counts.values())
+    logger.debug("Batch appliqué: %s, %d en échec", counts, failed)
+    return {
+        "created": counts["create"],
+        "updated": counts["update"],
+        "deleted": counts["delete"],
+        "failed": failed,
+        "results": results
+    }
+
+def insert_contacts(conn: sqlite3.Connection, user_id: int, contacts: list):
+    repository(conn).create_contacts(user_id, contacts)
+
+@app.post("/contacts/import")
+async def import_contacts(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Importer un carnet d'adresses complet (CSV, vCard ou NDJSON) en flux
+
+    Le format est pris dans ?format= ou, à défaut, dans le Content-Type. Les
+    lignes invalides sont listées dans le rapport sans bloquer les autres.
+    """
+    try:
+        fmt = detect_format(format, request.headers.get("content-type"))
+    except ImportFormatError as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e)
+        )
+    
+    logger.info("Import %s pour user_id: %s", fmt, current_user["id"])
+    user_id = current_user["id"]
+    
+    def validate(record: dict) -> dict:
+        try:
+            contact = ContactBase(**normalize_record(record))
+        except ValidationError as e:
+            raise RowError(validation_messages(e))
+        return contact.model_dump()
+    
+    async def insert_batch(rows: list):
+        # Un lot = une transaction = un seul fsync
+        await contacts_store(user_id).transaction(insert_contacts, user_id, rows)
+        contacts_changed(user_id)
+    
+    try:
+        report = await import_stream(
+            request.stream(), fmt, validate, insert_batch, batch_size=IMPORT_BATCH_SIZE
+        )
+    except ImportFormatError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except sqlite3.Error as e:
+        logger.exception("Erreur import contacts")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur lors de la création du contact: {str(e)}"
+            detail=f"Erreur lors de l'import: {str(e)}"
+        )
+    
+    logger.info(
+        "Import terminé",
+        extra={key: report[key] for key in ("imported", "failed", "elapsed_ms", "rows_per_second")}
+    )
+    return report
+
+@app.get("/contacts/changes", response_model=ChangesResponse)
+async def get_contact_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Changements du carnet depuis la version `since` (synchronisation incrémentale)
+
+    Renvoie les contacts créés ou modifiés, les ids supprimés et la nouvelle
+    version à repasser au prochain appel. Tant que has_more est vrai, rappeler
+    immédiatement avec cette version. Si reset est vrai, l'historique demandé
+    n'existe plus : vider le cache local et appliquer la réponse comme un
+    instantané complet.
+    """
+    logger.debug("Changements depuis v%d pour user_id: %s", since, current_user["id"])
+    changes = await contacts_store(current_user["id"]).run(get_changes, current_user["id"], since, limit)
+    logger.debug("%d modifiés, %d supprimés", len(changes["upserted"]), len(changes["deleted"]))
+    return changes
+
+def detect_duplicates(conn: sqlite3.Connection, user_id: int, by: List[str], limit: int):
+    # Clés des contacts écrits hors du dépôt (scripts, bases antérieures)
+    fill_missing_keys(conn, user_id)
+    return find_duplicates(conn, user_id, by=by, limit=limit)
+
+@app.get("/contacts/duplicates", response_model=DuplicatesResponse)
+async def get_duplicates(
+    by: List[Literal["phone", "email", "name"]] = Query(list(MATCH_KEYS)),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Groupes de doublons probables (même téléphone, même email ou même nom)
+
+    Téléphones au format E.164, emails en minuscules, noms sans accents ni
+    ordre des mots. Les plus gros groupes d'abord ; matched_on indique les clés
+    partagées. Fusionner un groupe avec POST /contacts/merge.
+    """
+    logger.debug("Recherche de doublons (%s) pour user_id: %s", ",".join(by), current_user["id"])
+    result = await contacts_store(current_user["id"]).transaction(
+        detect_duplicates, current_user["id"], by or list(MATCH_KEYS), limit
+    )
+    logger.debug("%d groupes de doublons", result["total_groups"])
+    return result
+
+def merge_contacts(conn: sqlite3.Connection, user_id: int, merge: MergeRequest):
+    repo = repository(conn)
+    source_ids = list(dict.fromkeys(merge.source_ids))
+    if merge.target_id in source_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="target_id ne peut pas figurer dans source_ids"
+        )
+    target = repo.get_contact(user_id, merge.target_id)
+    sources = [repo.get_contact(user_id, contact_id) for contact_id in source_ids]
+    missing = [contact_id for contact_id, row in zip([merge.target_id, *source_ids], [target, *sources]) if row is None]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Contacts non trouvés: {', '.join(map(str, missing))}"
+        )
+    
+    if merge.contact is not None:
+        fields = merge.contact.model_dump()
+    else:
+        # Valeurs du contact conservé, champs vides complétés par les sources
+        fields = {field: target[field] for field in CONTACT_INPUT_FIELDS}
+        for source in sources:
+            for field in CONTACT_INPUT_FIELDS:
+                if not fields[field] and source[field]:
+                    fields[field] = source[field]
+    deleted = repo.delete_contacts(user_id, source_ids)
+    return repo.update_contact(user_id, merge.target_id, fields), deleted
+
+@app.post("/contacts/merge", response_model=MergeResponse)
+async def merge_duplicate_contacts(
+    merge: MergeRequest,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Fusionner des doublons dans target_id et supprimer les autres, en une transaction"""
+    logger.debug("Fusion de %s dans %d pour user_id: %s", merge.source_ids, merge.target_id, current_user["id"])
+    
+    try:
+        merged_contact, deleted = await contacts_store(current_user["id"]).transaction(
+            merge_contacts, current_user["id"], merge
         )
+    except sqlite3.Error as e:
+        logger.exception("Erreur fusion contacts")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la fusion: {str(e)}"
+        )
+    
+    contacts_changed(current_user["id"])
+    logger.debug("%d contacts fusionnés dans %d", len(deleted), merge.target_id)
+    return {"contact": merged_contact, "merged": deleted}
+
+@app.get("/contacts/export")
+async def export_contacts(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|vcf)$"),
+    gzip: bool = False,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Exporter tout le carnet d'adresses en flux (NDJSON, CSV ou vCard)"""
+    logger.info("Export %s pour user_id: %s", format, current_user["id"])
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    headers = {"Content-Disposition": f'attachment; filename="contacts.{extension}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    store = contacts_store(current_user["id"])
+    return StreamingResponse(
+        store.iterate(stream_contacts(store.pool, current_user["id"], format, gzip=gzip)),
+        media_type=media_type,
+        headers=headers
+    )
+
+def fetch_contact(conn: sqlite3.Connection, contact_id: int, user_id: int):
+    return repository(conn).get_contact(user_id, contact_id)
 
 @app.get("/contacts/{contact_id}", response_model=ContactResponse)
-def get_contact(
+async def get_contact(
     contact_id: int,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Récupérer un contact spécifique"""
-    print(f"🔍 Récupération du contact {contact_id} pour user_id: {current_user['id']}")
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """SELECT id, user_id, first_name, last_name, phone, email, created_at 
-           FROM contacts WHERE id = ? AND user_id = ?""",
-        (contact_id, current_user["id"])
+    """Récupérer un contact spécifique (304 si le client est à jour)"""
+    logger.debug("Récupération du contact %d pour user_id: %s", contact_id, current_user["id"])
+    
+    async def load():
+        headers, contact = await contacts_store(current_user["id"]).run(
+            read_if_modified, request.headers, current_user["id"],
+            fetch_contact, contact_id, current_user["id"]
+        )
+        if contact is NOT_MODIFIED or contact is None or not FAST_SERIALIZATION:
+            return headers, contact, None
+        return headers, contact, contact_json(contact)
+    
+    headers, contact, body = await reads.do(
+        current_user["id"], "/contacts/{contact_id}", (contact_id,) + conditional_params(request), load
     )
-    contact = cursor.fetchone()
-    conn.close()
+    if contact is NOT_MODIFIED:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
     if contact is None:
-        print(f"❌ Contact {contact_id} non trouvé")
+        logger.debug("Contact %d non trouvé", contact_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Contact non trouvé"
         )
     
-    print(f"✅ Contact {contact_id} trouvé")
-    return dict(contact)
+    if body is not None:
+        return json_response(body, headers=headers)
+    response.headers.update(headers)
+    return contact
 
 @app.put("/contacts/{contact_id}", response_model=ContactResponse)
-def update_contact(
+async def update_contact(
     contact_id: int,
     contact: ContactBase,
     current_user: dict = Depends(get_current_active_user)
 ):
     """Mettre à jour un contact"""
-    print(f"✏️ Mise à jour du contact {contact_id} pour user_id: {current_user['id']}")
+    logger.debug("Mise à jour du contact %d pour user_id: %s", contact_id, current_user["id"])
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    def update(conn: sqlite3.Connection):
+        # Mise à jour limitée aux contacts de l'utilisateur, relue par RETURNING
+        updated = repository(conn).update_contact(current_user["id"], contact_id, contact.model_dump())
+        if updated is None:
+            logger.debug("Contact %d non trouvé pour user_id: %s", contact_id, current_user["id"])
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Contact non trouvé"
+            )
+        return updated
     
-    # Vérifier que le contact appartient à l'utilisateur
-    cursor.execute(
-        "SELECT id FROM contacts WHERE id = ? AND user_id = ?", 
-        (contact_id, current_user["id"])
-    )
-    if not cursor.fetchone():
-        conn.close()
-        print(f"❌ Contact {contact_id} non trouvé pour user_id: {current_user['id']}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Contact non trouvé"
-        )
-    
-    # Mettre à jour
     try:
-        cursor.execute(
-            """UPDATE contacts 
-               SET first_name = ?, last_name = ?, phone = ?, email = ? 
-               WHERE id = ?""",
-            (contact.first_name, contact.last_name, contact.phone, contact.email, contact_id)
-        )
-        conn.commit()
-        
-        cursor.execute(
-            "SELECT * FROM contacts WHERE id = ?", 
-            (contact_id,)
-        )
-        updated_contact = cursor.fetchone()
-        conn.close()
-        
-        print(f"✅ Contact {contact_id} mis à jour")
-        return dict(updated_contact)
-    except Exception as e:
-        conn.close()
-        print(f"❌ Erreur mise à jour contact: {e}")
+        updated_contact = await contacts_store(current_user["id"]).write(update)
+    except sqlite3.Error as e:
+        logger.exception("Erreur mise à jour contact")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la mise à jour: {str(e)}"
         )
+    
+    contacts_changed(current_user["id"])
+    logger.debug("Contact %d mis à jour", contact_id)
+    return updated_contact
 
 @app.delete("/contacts/{contact_id}", status_code=status.HTTP_200_OK)
-def delete_contact(
+async def delete_contact(
     contact_id: int,
     current_user: dict = Depends(get_current_active_user)
 ):
     """Supprimer un contact"""
-    print(f"🗑️ Suppression du contact {contact_id} pour user_id: {current_user['id']}")
+    logger.debug("Suppression du contact %d pour user_id: %s", contact_id, current_user["id"])
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Vérifier que le contact appartient à l'utilisateur
-    cursor.execute(
-        "SELECT id FROM contacts WHERE id = ? AND user_id = ?", 
-        (contact_id, current_user["id"])
-    )
-    if not cursor.fetchone():
-        conn.close()
-        print(f"❌ Contact {contact_id} non trouvé pour user_id: {current_user['id']}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Contact non trouvé"
-        )
+    def delete(conn: sqlite3.Connection):
+        return repository(conn).delete_contact(current_user["id"], contact_id)
     
-    # Supprimer
     try:
-        cursor.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
-        conn.commit()
-        conn.close()
-        
-        print(f"✅ Contact {contact_id} supprimé")
-        return {"message": "Contact supprimé avec succès"}
-    except Exception as e:
-        conn.close()
-        print(f"❌ Erreur suppression contact: {e}")
+        deleted = await contacts_store(current_user["id"]).write(delete)
+    except sqlite3.Error as e:
+        logger.exception("Erreur suppression contact")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la suppression: {str(e)}"
         )
+    
+    # Rien supprimé : le contact n'existe pas ou appartient à un autre utilisateur
+    if not deleted:
+        logger.debug("Contact %d non trouvé pour user_id: %s", contact_id, current_user["id"])
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contact non trouvé"
+        )
+    
+    contacts_changed(current_user["id"])
+    logger.debug("Contact %d supprimé", contact_id)
+    return {"message": "Contact supprimé avec succès"}
 
 @app.get("/contacts/search/{query}", response_model=List[ContactResponse])
-def search_contacts(
+async def search_contacts(
     query: str,
+    limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Rechercher des contacts"""
+    query = normalize_query(query)
     if len(query) < 2:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="La requête doit contenir au moins 2 caractères"
         )
     
-    print(f"🔍 Recherche '{query}' pour user_id: {current_user['id']}")
+    logger.debug("Recherche %r pour user_id: %s", query, current_user["id"])
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    user_id = current_user["id"]
     
-    search_pattern = f"%{query}%"
-    cursor.execute(
-        """SELECT id, user_id, first_name, last_name, phone, email, created_at 
-           FROM contacts 
-           WHERE user_id = ? 
-           AND (first_name LIKE ? OR last_name LIKE ? OR phone LIKE ? OR email LIKE ?) 
-           ORDER BY last_name, first_name""",
-        (current_user["id"], search_pattern, search_pattern, search_pattern, search_pattern)
-    )
-    contacts = cursor.fetchall()
-    conn.close()
+    async def load():
+        contacts, generation = search_cache.lookup(user_id, query, limit)
+        if contacts is None:
+            # Index FTS5 classé par pertinence ; LIKE pour les termes trop courts
+            contacts = await contacts_store(user_id).run(lambda conn: repository(conn).search_contacts(user_id, query, limit))
+            search_cache.store(user_id, generation, query, contacts, limit)
+        logger.debug("%d contacts trouvés pour la recherche %r", len(contacts), query)
+        return contacts, contacts_json(contacts) if FAST_SERIALIZATION else None
     
-    print(f"✅ {len(contacts)} contacts trouvés pour la recherche '{query}'")
-    return [dict(contact) for contact in contacts]
+    # Clé sur la requête normalisée : "Jean " et "jean" partagent la même lecture
+    contacts, body = await reads.do(user_id, "/contacts/search/{query}", (query, limit), load)
+    if body is not None:
+        return json_response(body)
+    return contacts
+
+# ===========================================
+# ADMINISTRATION
+# ===========================================
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Administration désactivée (ADMIN_TOKEN non défini)"
+        )
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Jeton d'administration invalide"
+        )
+
+@app.get("/admin/shards", dependencies=[Depends(require_admin)])
+async def admin_shards():
+    """Taille, contenu et charge (pool, écrivain) de chaque shard"""
+    results = []
+    for shard in shards:
+        info = await shard.run(describe)
+        results.append({**shard.stats(), **info})
+    return {"sharded": bool(SHARDS), "shards": results}
+
+@app.get("/admin/shards/users/{user_id}", dependencies=[Depends(require_admin)])
+async def admin_user_shard(user_id: int):
+    """Shard qui contient les contacts d'un utilisateur"""
+    shard = contacts_store(user_id)
+    return {"user_id": user_id, "shard": shard.index, "path": shard.path}
+
+# ===========================================
+# INVALIDATION DES CACHES ENTRE WORKERS
+# ===========================================
+
+# Chaque écriture passe par les triggers de app/sync.py, qui datent l'utilisateur
+# concerné dans user_versions : chaque worker relit cette table périodiquement,
+# dans la base globale et dans chaque shard (contacts : recherche et lectures),
+# ainsi que profile_versions dans la base globale (profils : authentification)
+cache_sync = {"versions": {}, "task": None}
+PROFILE_FEED = "profiles"
+
+def change_feeds():
+    feeds = {"global": db}
+    for shard in shards:
+        if shard.db is not db:
+            feeds[f"shard-{shard.index}"] = shard.db
+    return feeds
+
+def apply_remote_changes(user_ids: list):
+    for user_id in set(user_ids):
+        search_cache.bump(user_id)
+        reads.bump(user_id)
+
+def apply_profile_changes(user_ids: list):
+    # Les écritures de contacts ne touchent pas aux profils : les utilisateurs
+    # actifs gardent leur entrée d'authentification en cache
+    changed = set(user_ids)
+    principal_cache.invalidate_where(lambda key: key[0] in changed)
+
+async def poll_changes(name: str, feed: Database, read_changes, apply):
+    try:
+        version, user_ids = await feed.run(read_changes, cache_sync["versions"][name])
+    except Exception:
+        logger.exception("Lecture des changements impossible (%s)", name)
+        return
+    if user_ids:
+        apply(user_ids)
+        logger.debug("Caches invalidés pour %d utilisateurs (%s)", len(user_ids), name)
+    cache_sync["versions"][name] = version
+
+async def sync_caches():
+    while True:
+        await asyncio.sleep(CACHE_SYNC_INTERVAL)
+        for name, feed in change_feeds().items():
+            if name in cache_sync["versions"]:
+                await poll_changes(name, feed, get_changed_users, apply_remote_changes)
+        if PROFILE_FEED in cache_sync["versions"]:
+            await poll_changes(PROFILE_FEED, db, get_changed_profiles, apply_profile_changes)
+
+# ===========================================
+# CYCLE DE VIE
+# ===========================================
+
+# Mesures du dernier démarrage, exposées par /health
+startup_info = {"started_at": None, "duration_ms": None, "schema_version": None, "migrations": [], "seeded": False}
+
+async def startup():
+    start = time.perf_counter()
+    # Threadpool anyio (dépendances et routes synchrones restantes)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = ANYIO_THREADS
+    if MIGRATE_ON_STARTUP or SEED_TEST_USER:
+        startup_info.update(await asyncio.to_thread(prepare_database))
+    # Sinon, un démarrage à froid se limite à ouvrir les premières connexions
+    await asyncio.to_thread(db_pool.warm, DB_POOL_WARM)
+    if SHARDS:
+        for shard in shards:
+            await asyncio.to_thread(shard.pool.warm, 1)
+    startup_info["schema_version"] = await db.run(schema_version)
+    if startup_info["schema_version"] < latest_version():
+        logger.warning("Schéma en version %d, %d attendue : lancer python -m app.migrations",
+                       startup_info["schema_version"], latest_version())
+    if CACHE_SYNC_INTERVAL > 0:
+        for name, feed in change_feeds().items():
+            # Tables de suivi absentes tant que la base n'est pas migrée
+            if await feed.run(schema_version) < latest_version():
+                logger.warning("Synchronisation des caches désactivée pour %s : base non migrée", name)
+                continue
+            cache_sync["versions"][name] = await feed.run(current_version)
+            if feed is db:
+                cache_sync["versions"][PROFILE_FEED] = await db.run(current_profile_version)
+        if cache_sync["versions"]:
+            cache_sync["task"] = asyncio.create_task(sync_caches())
+    startup_info["started_at"] = datetime.utcnow().isoformat()
+    startup_info["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    logger.info("Worker démarré en %.1f ms", startup_info["duration_ms"])
+
+async def shutdown():
+    if cache_sync["task"] is not None:
+        cache_sync["task"].cancel()
+        cache_sync["task"] = None
+    shards.shutdown()
+    db.shutdown()
+    password_hasher.shutdown()
 
 # ===========================================
 # ROUTE OPTIONS POUR CORS
@@ -635,7 +1400,8 @@ if __name__ == "__main__":
     print("🚀 SERVEUR FASTAPI - CONTACTS MANAGEMENT")
     print("=" * 50)
     print("✅ Base de données initialisée")
-    print("👤 Utilisateur de test: test@test.com / test123")
+    if SEED_TEST_USER:
+        print("👤 Utilisateur de test: test@test.com / test123")
     print("🌐 URL: http://127.0.0.1:8000")
     print("📚 Documentation: http://127.0.0.1:8000/docs")
     print("🔍 Test API: http://127.0.0.1:8000/health")
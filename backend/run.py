@@ -1,5 +1,31 @@
 #!/usr/bin/env python3
+import argparse
+import os
+
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Lance l'API de gestion de contacts")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="nombre de processus (WEB_CONCURRENCY)")
+    parser.add_argument("--reload", action="store_true", help="rechargement automatique (1 seul worker)")
+    args = parser.parse_args()
+
+    # Migrations, données initiales et fichier de clés JWT préparés une seule
+    # fois ici : au démarrage, les workers n'ont plus qu'à ouvrir leurs connexions
+    import main
+    main.prepare_database()
+    if not args.reload:
+        os.environ["MIGRATE_ON_STARTUP"] = "0"
+        os.environ["SEED_TEST_USER"] = "0"
+
+    uvicorn.run(
+        "main:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=args.host,
+        port=args.port,
+        workers=None if args.reload else args.workers,
+        reload=args.reload
+    )
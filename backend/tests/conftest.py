@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+# Les tests importent app.* et main comme run.py, depuis backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def main_module(tmp_path_factory):
+    """main.py importé une fois, sur une base temporaire (configuration lue à l'import)"""
+    directory = tmp_path_factory.mktemp("api")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("CONTACTS_DB", str(directory / "contacts.db"))
+        patch.setenv("SECRET_KEY_FILE", str(directory / "secret.key"))
+        patch.setenv("PASSWORD_COST", "4")
+        patch.setenv("SHARDS", "0")
+        patch.setenv("SEED_TEST_USER", "0")
+        patch.setenv("RATE_LIMITS", "search=1/2")
+        patch.setenv("CACHE_SYNC_INTERVAL", "0.05")
+        import main
+        yield main
+
+
+@pytest.fixture(scope="session")
+def client(main_module):
+    from fastapi.testclient import TestClient
+
+    with TestClient(main_module.app) as client:
+        yield client
+
+
+@pytest.fixture
+def register(client):
+    """register(email) : crée un compte et renvoie l'en-tête d'authentification"""
+    def register(email: str, password: str = "secret123") -> dict:
+        response = client.post("/register", json={
+            "first_name": "Test", "last_name": "User", "email": email, "password": password,
+        })
+        assert response.status_code == 201, response.text
+        token = client.post("/token", data={"username": email, "password": password}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+    return register
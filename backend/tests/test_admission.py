@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app import admission
+from app.admission import (
+    AdmissionMiddleware, ConcurrencyLimiter, RateLimiter, client_ip, parse_budgets, request_class,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Horloge du module seulement : asyncio garde la vraie
+    monkeypatch.setattr(admission, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_bucket_burst_then_refill(clock):
+    limiter = RateLimiter({"read": (2.0, 3)})
+    assert [limiter.check("read", "user", 1) for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Seau vide : un jeton revient en 1/2 s
+    assert limiter.check("read", "user", 1) == pytest.approx(0.5)
+    assert limiter.check("read", "user", 2) == 0.0
+    clock.now += 0.5
+    assert limiter.check("read", "user", 1) == 0.0
+    assert limiter.check("read", "user", 1) > 0
+    # Jamais plus que la capacité, même après une longue pause
+    clock.now += 60
+    assert [limiter.check("read", "user", 1) for _ in range(4)][-1] > 0
+    assert limiter.stats()["limited"] == {"read": 3}
+
+
+def test_ip_budget_and_idle_buckets_expire(clock):
+    limiter = RateLimiter({"auth": (1.0, 2)}, ip_factor=2, maxsize=10)
+    assert all(limiter.check("auth", "ip", "10.0.0.1") == 0.0 for _ in range(4))
+    assert limiter.check("auth", "ip", "10.0.0.1") > 0
+    clock.now += 10
+    limiter.check("auth", "user", 1)
+    # Le seau IP, de nouveau plein, équivaut à un seau neuf
+    assert limiter.stats()["buckets"] == 1
+
+
+def test_parse_budgets():
+    budgets = parse_budgets("search=5/30, auth=0.5")
+    assert budgets["search"] == (5.0, 30)
+    assert budgets["auth"] == (0.5, 1)
+    with pytest.raises(ValueError):
+        parse_budgets("inconnu=1/2")
+    assert request_class("GET", "/contacts/search/dupont") == "search"
+    assert request_class("GET", "/health") is None
+
+
+def test_concurrency_limiter_sheds_full_queue_and_timeouts():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=1, queue_timeout=0.05)
+        assert await limiter.acquire() is None
+        queued = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert await limiter.acquire() == "queue_full"
+        assert await queued == "timeout"
+
+        # Une place libérée passe directement au premier en attente
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()
+        assert await waiter is None
+        limiter.release()
+        stats = limiter.stats()
+        assert (stats["active"], stats["waiting"]) == (0, 0)
+        assert stats["rejected"] == {"queue_full": 1, "timeout": 1}
+
+    asyncio.run(scenario())
+
+
+async def slow_app(scope, receive, send):
+    await asyncio.sleep(0.2)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def test_middleware_responses(clock):
+    async def scenario():
+        limiter = RateLimiter({**admission.DEFAULT_BUDGETS, "read": (1.0, 1)}, ip_factor=1)
+        concurrency = ConcurrencyLimiter(limit=1, max_queue=0, queue_timeout=2.0)
+        app = AdmissionMiddleware(slow_app, limiter, concurrency)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.ensure_future(client.post("/contacts"))
+            await asyncio.sleep(0.05)
+            busy = await client.post("/contacts")
+            assert busy.status_code == 503
+            assert busy.headers["retry-after"] == "2"
+            assert (await first).status_code == 200
+
+            assert (await client.get("/contacts")).status_code == 200
+            limited = await client.get("/contacts")
+            assert limited.status_code == 429
+            assert limited.headers["retry-after"] == "1"
+            assert limited.json() == {"detail": "Trop de requêtes, réessayez plus tard"}
+            # Routes de supervision jamais limitées
+            assert (await client.get("/health")).status_code == 200
+
+    asyncio.run(scenario())
+
+
+def test_client_ip_ignores_spoofed_forwarded_entries():
+    def scope(*values):
+        return {"client": ("10.0.0.2", 5000), "headers": [(b"x-forwarded-for", value.encode()) for value in values]}
+
+    # Le client envoie "1.1.1.1, 2.2.2.2" ; le proxy ajoute l'adresse qu'il a vue
+    spoofed = scope("1.1.1.1, 2.2.2.2, 203.0.113.7")
+    assert client_ip(spoofed) == "10.0.0.2"
+    assert client_ip(spoofed, trusted_proxies=1) == "203.0.113.7"
+    # Deux proxys : le second ajoute l'adresse du premier
+    assert client_ip(scope("1.1.1.1", "203.0.113.7, 10.0.0.1"), trusted_proxies=2) == "203.0.113.7"
+    assert client_ip(scope("203.0.113.7"), trusted_proxies=2) == "203.0.113.7"
+    assert client_ip(scope(), trusted_proxies=1) == "10.0.0.2"
+
+
+def test_rotating_forwarded_for_does_not_reset_ip_bucket():
+    async def scenario():
+        limiter = RateLimiter({**admission.DEFAULT_BUDGETS, "read": (0.001, 2)}, ip_factor=1)
+        app = AdmissionMiddleware(slow_app, limiter, None, trusted_proxies=1)
+        transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            statuses = []
+            for index in range(4):
+                # Entrée inventée par le client, puis celle ajoutée par le proxy
+                headers = {"X-Forwarded-For": f"198.51.100.{index}, 203.0.113.7"}
+                statuses.append((await client.get("/contacts", headers=headers)).status_code)
+        assert statuses == [200, 200, 429, 429]
+
+    asyncio.run(scenario())
+
+
+def test_user_budget_returns_429(client, register):
+    # RATE_LIMITS=search=1/2 (tests/conftest.py) : deux recherches d'affilée, pas trois
+    headers = register("limite@example.com")
+    statuses = [client.get("/contacts/search/dupont", headers=headers).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    limited = client.get("/contacts/search/dupont", headers=headers)
+    assert limited.headers["retry-after"] == "1"
+    # Le budget est par utilisateur : un autre compte n'est pas touché
+    assert client.get("/contacts/search/dupont", headers=register("autre@example.com")).status_code == 200
@@ -0,0 +1,59 @@
+import sqlite3
+
+from app.migrations import migrate
+
+
+def test_consecutive_deletes_run_as_one_statement(main_module, tmp_path):
+    database = str(tmp_path / "contacts.db")
+    migrate(database)
+    conn = sqlite3.connect(database)
+    conn.row_factory = sqlite3.Row
+    conn.executemany(
+        "INSERT INTO contacts (user_id, first_name, last_name, phone) VALUES (?, ?, 'X', '0612345678')",
+        [(1, "A"), (1, "B"), (1, "C"), (2, "Autre")]
+    )
+    operation = main_module.BatchOperation
+    contact = {"first_name": "Nouveau", "last_name": "X", "phone": "0612345678"}
+    operations = [
+        operation(op="delete", id=1),
+        operation(op="delete", id=2),
+        operation(op="delete", id=1),
+        operation(op="delete"),
+        operation(op="delete", id=4),
+        operation(op="delete", id=99),
+        operation(op="update", id=3, contact=contact),
+        operation(op="create", contact=contact),
+        operation(op="create", contact=contact),
+        operation(op="delete", id=3),
+    ]
+    statements = []
+    conn.set_trace_callback(statements.append)
+    results, counts = main_module.apply_batch(conn, 1, operations)
+    conn.set_trace_callback(None)
+
+    assert [result["index"] for result in results] == list(range(len(operations)))
+    assert [result["status"] for result in results] == [200, 200, 404, 422, 404, 404, 200, 201, 201, 200]
+    assert counts == {"create": 2, "update": 1, "delete": 3}
+    # Deux séries de suppressions, deux requêtes ; une seule insertion pour les créations
+    # (le traçage répète la requête à chaque étape des déclencheurs)
+    statements = set(statements)
+    assert sum(statement.startswith("DELETE FROM contacts") for statement in statements) == 2
+    assert sum(statement.lstrip().startswith("INSERT INTO contacts (") for statement in statements) == 1
+    remaining = [row[0] for row in conn.execute("SELECT user_id FROM contacts ORDER BY id")]
+    assert remaining == [2, 1, 1]
+    conn.close()
+
+
+def test_batch_route(client, register):
+    headers = register("batch@example.com")
+    contact = {"first_name": "Lot", "last_name": "X", "phone": "0612345678"}
+    created = client.post("/contacts/batch", headers=headers, json={
+        "operations": [{"op": "create", "contact": contact}] * 3,
+    }).json()
+    ids = [result["id"] for result in created["results"]]
+    assert created["created"] == 3
+    response = client.post("/contacts/batch", headers=headers, json={
+        "operations": [{"op": "delete", "id": contact_id} for contact_id in ids + [ids[0]]],
+    }).json()
+    assert (response["deleted"], response["failed"]) == (3, 1)
+    assert client.get("/contacts", headers=headers).json() == []
@@ -0,0 +1,29 @@
+from benchmarks.stats import compare, failing, summarize
+
+
+def scenario(latencies, errors, elapsed=1.0):
+    return summarize(latencies, errors, elapsed)
+
+
+def test_failed_requests_excluded_from_rps_and_latency():
+    result = scenario([0.010] * 4, errors=96)
+    assert result["requests"] == 100
+    assert result["errors"] == 96
+    assert result["error_rate"] == 0.96
+    assert result["rps"] == 4.0
+    assert result["p95_ms"] == 10.0
+
+
+def test_errors_fail_the_run_and_the_comparison():
+    baseline = {"scenarios": {"register": scenario([0.010] * 100, errors=0)}}
+    results = {"scenarios": {"register": scenario([0.001] * 61, errors=39)}}
+    assert failing(results) == [("register", 39, 0.39)]
+    assert failing(results, max_error_rate=0.5) == []
+    assert ("register", "error_rate", 0.0, 0.39) in compare(results, baseline, 0.10)
+
+
+def test_clean_run_has_no_regression():
+    baseline = {"scenarios": {"get": scenario([0.010] * 100, errors=0)}}
+    results = {"scenarios": {"get": scenario([0.010] * 100, errors=0)}}
+    assert failing(results) == []
+    assert compare(results, baseline, 0.10) == []
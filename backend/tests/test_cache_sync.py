@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import sqlite3
+import time
+
+from app.db import Database
+from app.migrations import migrate
+from app.pool import ConnectionPool
+from app.shards import Shard, ShardSet
+from app.sync import current_profile_version, current_version, get_changed_profiles, get_changed_users
+from app.writer import GroupCommitWriter
+
+
+def test_startup_on_unmigrated_database(main_module, monkeypatch, tmp_path, caplog):
+    pool = ConnectionPool(str(tmp_path / "vide.db"), size=2)
+    db = Database(pool)
+    monkeypatch.setattr(main_module, "MIGRATE_ON_STARTUP", False)
+    monkeypatch.setattr(main_module, "SEED_TEST_USER", False)
+    monkeypatch.setattr(main_module, "db_pool", pool)
+    monkeypatch.setattr(main_module, "db", db)
+    monkeypatch.setattr(main_module, "shards", ShardSet([Shard(0, pool.database, pool, db, GroupCommitWriter(pool))]))
+    monkeypatch.setattr(main_module, "cache_sync", {"versions": {}, "task": None})
+    monkeypatch.setattr(main_module, "startup_info", dict(main_module.startup_info))
+
+    async def scenario():
+        await main_module.startup()
+        try:
+            assert main_module.cache_sync == {"versions": {}, "task": None}
+        finally:
+            main_module.shards.shutdown()
+
+    with caplog.at_level(logging.WARNING, logger="contacts"):
+        asyncio.run(scenario())
+    assert main_module.startup_info["schema_version"] == 0
+    assert "python -m app.migrations" in caplog.text
+    assert "Synchronisation des caches désactivée" in caplog.text
+
+
+def test_profile_feed_ignores_contact_writes(tmp_path):
+    database = str(tmp_path / "contacts.db")
+    migrate(database)
+    conn = sqlite3.connect(database, isolation_level=None)
+    conn.execute("INSERT INTO users (first_name, last_name, email, password) VALUES ('A', 'B', 'a@b.c', 'x')")
+    since = current_profile_version(conn)
+    conn.execute("INSERT INTO contacts (user_id, first_name, last_name, phone) VALUES (1, 'C', 'D', '0600000000')")
+    assert get_changed_users(conn, 0)[1] == [1]
+    assert get_changed_profiles(conn, since) == (since, [])
+
+    conn.execute("UPDATE users SET email = 'nouveau@b.c' WHERE id = 1")
+    version, user_ids = get_changed_profiles(conn, since)
+    assert user_ids == [1]
+    conn.execute("DELETE FROM users WHERE id = 1")
+    assert get_changed_profiles(conn, version)[1] == [1]
+    conn.close()
+
+
+def wait_for_sync(main_module):
+    """Attend un passage de sync_caches() après les écritures déjà faites"""
+    with sqlite3.connect(main_module.DATABASE_URL) as conn:
+        target = current_version(conn)
+        profiles = current_profile_version(conn)
+    deadline = time.monotonic() + 5
+    while (main_module.cache_sync["versions"]["global"] < target
+           or main_module.cache_sync["versions"]["profiles"] < profiles):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_contact_writes_keep_principals_cached(client, register, main_module):
+    headers = register("principal@example.com")
+    assert client.get("/contacts", headers=headers).status_code == 200
+    invalidations = main_module.principal_cache.stats()["invalidations"]
+    for index in range(3):
+        created = client.post("/contacts", headers=headers, json={
+            "first_name": f"C{index}", "last_name": "X", "phone": "0612345678",
+        })
+        assert created.status_code == 201, created.text
+    wait_for_sync(main_module)
+    assert main_module.principal_cache.stats()["invalidations"] == invalidations
+
+    # Profil modifié par un autre processus : l'entrée est purgée
+    with sqlite3.connect(main_module.DATABASE_URL) as conn:
+        conn.execute("UPDATE users SET first_name = 'Autre' WHERE email = 'principal@example.com'")
+    wait_for_sync(main_module)
+    assert main_module.principal_cache.stats()["invalidations"] == invalidations + 1
+    assert client.get("/contacts", headers=headers).status_code == 200
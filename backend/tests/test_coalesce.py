@@ -0,0 +1,79 @@
+import asyncio
+
+from app.coalesce import SingleFlight
+
+
+class SlowRead:
+    """Lecture bloquée jusqu'à release() ; compte ses exécutions"""
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = asyncio.Event()
+
+    async def __call__(self, value):
+        self.calls += 1
+        await self.gate.wait()
+        return {"value": value, "call": self.calls}
+
+
+def test_concurrent_reads_share_one_execution():
+    async def scenario():
+        flights = SingleFlight()
+        read = SlowRead()
+        waiting = [asyncio.ensure_future(flights.do(1, "/contacts", ("page", 1), read, "a")) for _ in range(5)]
+        other = asyncio.ensure_future(flights.do(2, "/contacts", ("page", 1), read, "b"))
+        await asyncio.sleep(0)
+        read.gate.set()
+        results = await asyncio.gather(*waiting)
+        assert read.calls == 2
+        assert all(result is results[0] for result in results)
+        assert (await other)["value"] == "b"
+        stats = flights.stats()
+        assert (stats["executed"], stats["shared"], stats["in_flight"]) == (2, 4, 0)
+
+    asyncio.run(scenario())
+
+
+def test_read_after_write_does_not_join_older_flight():
+    async def scenario():
+        flights = SingleFlight()
+        read = SlowRead()
+        before = asyncio.ensure_future(flights.do(1, "/contacts", None, read, "avant"))
+        await asyncio.sleep(0)
+        # Écriture validée pendant la lecture : la suivante repart de zéro
+        flights.bump(1)
+        after = asyncio.ensure_future(flights.do(1, "/contacts", None, read, "après"))
+        await asyncio.sleep(0)
+        read.gate.set()
+        assert (await before)["value"] == "avant"
+        assert (await after)["value"] == "après"
+        assert read.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_request_does_not_cancel_the_others():
+    async def scenario():
+        flights = SingleFlight()
+        read = SlowRead()
+        first = asyncio.ensure_future(flights.do(1, "/contacts", None, read, "a"))
+        second = asyncio.ensure_future(flights.do(1, "/contacts", None, read, "a"))
+        await asyncio.sleep(0)
+        first.cancel()
+        read.gate.set()
+        assert (await second)["value"] == "a"
+        assert first.cancelled()
+        assert read.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_disabled_runs_every_read():
+    async def scenario():
+        flights = SingleFlight(enabled=False)
+        read = SlowRead()
+        read.gate.set()
+        await asyncio.gather(*(flights.do(1, "/contacts", None, read, "a") for _ in range(3)))
+        assert read.calls == 3
+
+    asyncio.run(scenario())
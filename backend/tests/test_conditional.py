@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+from app.conditional import http_date, is_not_modified, make_etag
+
+MODIFIED = datetime(2026, 10, 17, 8, 30, 12, tzinfo=timezone.utc)
+
+
+def test_etag_decides_and_if_modified_since_is_ignored():
+    sent = make_etag(1, 41)
+    # Écriture dans la même seconde : Last-Modified identique, ETag différent
+    current = make_etag(1, 42)
+    headers = {"if-none-match": sent, "if-modified-since": http_date(MODIFIED)}
+    assert not is_not_modified(headers, current, MODIFIED)
+    assert not is_not_modified({"if-modified-since": http_date(MODIFIED)}, current, MODIFIED)
+    assert is_not_modified({"if-none-match": current}, current, MODIFIED)
+    assert is_not_modified({"if-none-match": f'"x", {current}'}, current, MODIFIED)
+
+
+def test_if_modified_since_without_etag():
+    assert is_not_modified({"if-modified-since": http_date(MODIFIED)}, None, MODIFIED)
+    assert not is_not_modified({"if-modified-since": "pas une date"}, None, MODIFIED)
+    assert not is_not_modified({}, None, MODIFIED)
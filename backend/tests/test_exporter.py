@@ -0,0 +1,45 @@
+import json
+import sqlite3
+
+from app.exporter import stream_contacts
+from app.migrations import migrate
+from app.pool import ConnectionPool
+
+
+def make_database(path, contacts: int) -> str:
+    database = str(path / "contacts.db")
+    migrate(database)
+    conn = sqlite3.connect(database)
+    conn.execute("INSERT INTO users (first_name, last_name, email, password) VALUES ('A', 'B', 'a@b.c', 'x')")
+    conn.executemany(
+        "INSERT INTO contacts (user_id, first_name, last_name, phone) VALUES (1, ?, 'X', '0600000000')",
+        [(f"C{index}",) for index in range(contacts)]
+    )
+    conn.commit()
+    conn.close()
+    return database
+
+
+def test_export_returns_connection_between_chunks(tmp_path):
+    pool = ConnectionPool(make_database(tmp_path, 1200), size=1, timeout=0.1)
+    try:
+        export = stream_contacts(pool, 1, "ndjson", fetch_size=500)
+        first = next(export)
+        # Client lent : le flux est suspendu, la seule connexion du pool reste libre
+        assert pool.stats()["in_use"] == 0
+        with pool.connection() as conn:
+            conn.execute("SELECT 1")
+        lines = (first + b"".join(export)).decode().splitlines()
+    finally:
+        pool.close()
+    ids = [json.loads(line)["id"] for line in lines]
+    assert ids == sorted(ids) and len(set(ids)) == 1200
+
+
+def test_export_csv_header_and_empty_user(tmp_path):
+    pool = ConnectionPool(make_database(tmp_path, 3), size=1)
+    try:
+        assert b"".join(stream_contacts(pool, 2, "csv")).decode() == "id,first_name,last_name,phone,email,created_at\r\n"
+        assert b"".join(stream_contacts(pool, 1, "csv", fetch_size=3)).decode().count("\r\n") == 4
+    finally:
+        pool.close()
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from app.hashing import HasherBusy, PasswordHasher, context_settings
+
+
+def burst(hasher: PasswordHasher, count: int):
+    async def run():
+        return await asyncio.gather(*(hasher.hash(f"mot-de-passe-{index}") for index in range(count)),
+                                    return_exceptions=True)
+    try:
+        return asyncio.run(run())
+    finally:
+        hasher.shutdown()
+
+
+def test_burst_waits_instead_of_being_rejected():
+    # Un seul worker : les demandes attendent leur tour dans la file
+    hasher = PasswordHasher(context_settings("bcrypt", cost=4), workers=1)
+    results = burst(hasher, 8)
+    assert all(isinstance(result, str) for result in results)
+    stats = hasher.stats()
+    assert stats["hashes"] == 8
+    assert stats["rejected"] == {"queue_full": 0, "wait": 0}
+
+
+def test_rejects_only_past_the_wait_budget():
+    hasher = PasswordHasher(context_settings("bcrypt", cost=12), workers=1, max_wait=0.05)
+    results = burst(hasher, 4)
+    # Le premier calcul démarre tout de suite, les suivants attendent trop longtemps
+    assert isinstance(results[0], str)
+    assert all(isinstance(result, HasherBusy) for result in results[1:])
+    assert hasher.stats()["rejected"]["wait"] == 3
+
+
+def test_max_pending_bounds_the_queue():
+    hasher = PasswordHasher(context_settings("bcrypt", cost=4), workers=1, max_pending=2)
+    results = burst(hasher, 4)
+    assert sum(isinstance(result, HasherBusy) for result in results) == 2
+    assert hasher.stats()["rejected"]["queue_full"] == 2
+    with pytest.raises(ValueError):
+        PasswordHasher(context_settings(), executor="fibre")
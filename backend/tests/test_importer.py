@@ -0,0 +1,63 @@
+import asyncio
+
+from app.importer import RowError, import_stream
+
+
+async def chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def run_import(data: bytes, fmt: str, chunk_size: int = 7):
+    rows = []
+
+    async def insert_batch(batch):
+        rows.extend(batch)
+
+    def validate(record):
+        if not record.get("phone"):
+            raise RowError("phone manquant")
+        return record
+
+    report = asyncio.run(import_stream(chunks(data, chunk_size), fmt, validate, insert_batch, batch_size=2))
+    return rows, report
+
+
+def test_csv_quoted_field_with_newline():
+    data = b'first_name,last_name,phone,email\r\n"Jean\nPaul",Dupont,0123456789,\r\n"A ""B""",C,01,\n'
+    rows, report = run_import(data, "csv")
+    assert [row["first_name"] for row in rows] == ["Jean\nPaul", 'A "B"']
+    assert report["imported"] == 2
+    assert report["failed"] == 0
+
+
+def test_csv_unterminated_quote_is_reported():
+    data = b'first_name,last_name,phone\nJean,Dupont,01\nX,"jamais ferme,02\n'
+    rows, report = run_import(data, "csv")
+    assert len(rows) == 1
+    assert report["failed"] == 1
+    assert report["errors"][0]["row"] == 2
+
+
+def test_ndjson_and_vcard_ignore_line_endings():
+    rows, report = run_import(b'{"first_name": "a", "phone": "1"}\r\n\r\n[1]\n', "ndjson")
+    assert rows == [{"first_name": "a", "phone": "1"}]
+    assert report["failed"] == 1
+
+    rows, _ = run_import(b"BEGIN:VCARD\r\nN:Dupont;Jean\r\nTEL:01\r\nEND:VCARD\r\n", "vcard", chunk_size=3)
+    assert rows == [{"last_name": "Dupont", "first_name": "Jean", "phone": "01"}]
+
+
+def test_line_splitting_only_on_line_feed_with_one_byte_chunks():
+    data = ('first_name,last_name,phone\r\n'
+            '"Jean\r\nPaul",Du\x0bpont\x0c,01\r\n'
+            'A\u2028B,C\x1c\x85,02\r\n').encode()
+    rows, report = run_import(data, "csv", chunk_size=1)
+    assert [(row["first_name"], row["last_name"]) for row in rows] == [
+        ("Jean\r\nPaul", "Du\x0bpont\x0c"), ("A\u2028B", "C\x1c\x85")
+    ]
+    assert report["failed"] == 0
+
+    rows, report = run_import('{"first_name": "a\u2028b", "phone": "1"}\r\n'.encode(), "ndjson", chunk_size=1)
+    assert rows == [{"first_name": "a\u2028b", "phone": "1"}]
+    assert report["failed"] == 0
@@ -0,0 +1,107 @@
+import sqlite3
+
+import pytest
+
+from app.migrations import migrate
+from app.repository import ContactRepository, DuplicateEmail, SQLiteRepository
+from app.sqlalchemy_repository import SQLAlchemyStore
+
+
+@pytest.fixture(params=["sqlite", "sqlalchemy"])
+def repo(request, tmp_path):
+    database = str(tmp_path / "contacts.db")
+    if request.param == "sqlite":
+        migrate(database)
+        conn = sqlite3.connect(database)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield SQLiteRepository(conn)
+            conn.commit()
+        finally:
+            conn.close()
+    else:
+        store = SQLAlchemyStore(f"sqlite:///{database}")
+        store.create_schema()
+        try:
+            with store.transaction() as repository:
+                yield repository
+        finally:
+            store.dispose()
+
+
+@pytest.fixture
+def user(repo):
+    return repo.create_user("Alice", "Martin", "alice@example.com", "hash-1")
+
+
+def contact(first_name: str, last_name: str = "Dupont", **fields) -> dict:
+    return {"first_name": first_name, "last_name": last_name, "phone": "0612345678", **fields}
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        ContactRepository()
+
+
+def test_users(repo, user):
+    assert repo.get_user(user["id"])["email"] == "alice@example.com"
+    assert repo.get_user(user["id"], "bob@example.com") is None
+    assert repo.get_user_by_email("alice@example.com")["password"] == "hash-1"
+    assert "password" not in repo.get_user(user["id"])
+    with pytest.raises(DuplicateEmail):
+        repo.create_user("Autre", "Alice", "alice@example.com", "hash-2")
+    assert not repo.update_password(user["id"], "périmé", "hash-2")
+    assert repo.update_password(user["id"], "hash-1", "hash-2")
+    assert repo.get_user_by_email("alice@example.com")["password"] == "hash-2"
+
+
+def test_create_and_get(repo, user):
+    created = repo.create_contacts(user["id"], [contact("Bruno"), contact("Chloé", email="chloe@example.com")])
+    assert [row["first_name"] for row in created] == ["Bruno", "Chloé"]
+    assert created[0]["email"] is None
+    single = repo.create_contact(user["id"], contact("Denis"))
+    assert repo.get_contact(user["id"], single["id"])["first_name"] == "Denis"
+    other = repo.create_user("Bob", "Durand", "bob@example.com", "hash")
+    assert repo.get_contact(other["id"], single["id"]) is None
+    assert repo.create_contacts(user["id"], []) == []
+
+
+def test_list(repo, user):
+    created = repo.create_contacts(user["id"], [contact(f"C{index}") for index in range(5)])
+    ids = [row["id"] for row in repo.list_contacts(user["id"], limit=10)]
+    # Même created_at (même transaction) : le plus grand id d'abord
+    assert ids == [row["id"] for row in reversed(created)]
+    assert [row["id"] for row in repo.list_contacts(user["id"], limit=2, skip=1)] == ids[1:3]
+    last = repo.get_contact(user["id"], ids[1])
+    after = repo.list_contacts(user["id"], limit=10, after=(last["created_at"], last["id"]))
+    assert [row["id"] for row in after] == ids[2:]
+
+
+def test_update(repo, user):
+    created = repo.create_contact(user["id"], contact("Bruno"))
+    updated = repo.update_contact(user["id"], created["id"], {"first_name": "Bernard", "email": "b@example.com"})
+    assert (updated["first_name"], updated["email"], updated["last_name"]) == ("Bernard", "b@example.com", "Dupont")
+    assert repo.update_contact(user["id"], created["id"], {})["first_name"] == "Bernard"
+    assert repo.update_contact(user["id"], created["id"] + 100, {"first_name": "X"}) is None
+
+
+def test_delete(repo, user):
+    created = repo.create_contacts(user["id"], [contact("A"), contact("B"), contact("C")])
+    ids = [row["id"] for row in created]
+    assert sorted(repo.delete_contacts(user["id"], [ids[0], ids[1], 999])) == ids[:2]
+    assert repo.delete_contacts(user["id"], []) == []
+    assert not repo.delete_contact(user["id"], ids[0])
+    assert repo.delete_contact(user["id"], ids[2])
+    assert repo.list_contacts(user["id"], limit=10) == []
+
+
+def test_search(repo, user):
+    repo.create_contacts(user["id"], [
+        contact("Bruno", "Lefebvre"), contact("Chloé", "Dupont", email="chloe@example.com"), contact("Denis", "Moreau"),
+    ])
+    other = repo.create_user("Bob", "Durand", "bob@example.com", "hash")
+    repo.create_contact(other["id"], contact("Émile", "Lefebvre"))
+    found = repo.search_contacts(user["id"], "Lefebvre", 10)
+    assert [row["first_name"] for row in found] == ["Bruno"]
+    assert [row["first_name"] for row in repo.search_contacts(user["id"], "chloe", 10)] == ["Chloé"]
+    assert repo.search_contacts(user["id"], "Inconnu", 10) == []
@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+from app.migrations import migrate
+from app.search import (
+    FTS_SOURCE, FTS_TABLE, build_match_expression, owner_token, scope_search_index, search_contacts,
+    user_match_expression,
+)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    database = str(tmp_path / "contacts.db")
+    migrate(database)
+    conn = sqlite3.connect(database, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+def add(conn, user_id: int, first_name: str, last_name: str = "Dupont"):
+    conn.execute("INSERT INTO contacts (user_id, first_name, last_name, phone) VALUES (?, ?, ?, '0612345678')",
+                 (user_id, first_name, last_name))
+
+
+def search(conn, user_id: int, query: str):
+    """(ids trouvés, plan d'exécution de la requête réellement envoyée)"""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        ids = [row["id"] for row in search_contacts(conn, user_id, query, 20)]
+    finally:
+        conn.set_trace_callback(None)
+    # FTS5 trace aussi ses propres requêtes internes
+    query_sql = next(statement for statement in statements if statement.lstrip().startswith("SELECT c.id"))
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query_sql)]
+    return ids, plan
+
+
+def index_hits(conn, user_id: int, query: str) -> int:
+    """Lignes de l'index lues par le MATCH, avant la jointure sur contacts"""
+    expression = user_match_expression(user_id, build_match_expression(query))
+    return conn.execute(f"SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?", (expression,)).fetchone()[0]
+
+
+def test_other_users_do_not_change_plan_or_result(conn):
+    for first_name in ("Alice", "Bruno", "Chloé"):
+        add(conn, 1, first_name)
+    add(conn, 1, "Denis", "Martin")
+    before = search(conn, 1, "dupont")
+    assert index_hits(conn, 1, "dupont") == 3
+
+    # Beaucoup d'autres utilisateurs avec le même nom de famille
+    for user_id in range(2, 202):
+        for index in range(10):
+            add(conn, user_id, f"Autre{index}")
+    assert search(conn, 1, "dupont") == before
+    assert len(before[0]) == 3
+    assert index_hits(conn, 1, "dupont") == 3
+    assert index_hits(conn, 2, "dupont") == 10
+
+
+def test_owner_token_matches_sql_and_stays_unique(conn):
+    user_ids = [1, 2, 6399, 6400, 6401, 40960000, 40960001, 123456789]
+    assert len({owner_token(user_id) for user_id in user_ids}) == len(user_ids)
+    for user_id in user_ids:
+        conn.execute("INSERT INTO contacts (user_id, first_name, last_name, phone) VALUES (?, 'Anne', 'Blanc', '06')",
+                     (user_id,))
+    owners = conn.execute(f"SELECT c.user_id, s.owner FROM contacts c JOIN {FTS_SOURCE} s ON s.id = c.id").fetchall()
+    assert all(owner == owner_token(user_id) for user_id, owner in owners)
+    # Un id n'est jamais sous-chaîne d'un autre : 1 ne voit pas les contacts de 6401
+    assert [row["user_id"] for row in search_contacts(conn, 1, "blanc anne", 10)] == [1]
+
+
+def test_migration_scopes_an_existing_shared_index(tmp_path):
+    database = str(tmp_path / "ancien.db")
+    conn = sqlite3.connect(database, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(f"""
+        CREATE TABLE contacts (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+            first_name TEXT NOT NULL, last_name TEXT NOT NULL, phone TEXT NOT NULL, email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(first_name, last_name, phone, email,
+            content='contacts', content_rowid='id', tokenize='trigram');
+        CREATE TRIGGER contacts_fts_insert AFTER INSERT ON contacts BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, first_name, last_name, phone, email)
+            VALUES (new.id, new.first_name, new.last_name, new.phone, new.email);
+        END;
+    """)
+    add(conn, 1, "Alice")
+    add(conn, 2, "Bruno")
+    scope_search_index(conn.cursor())
+    add(conn, 1, "Chloé")
+    assert index_hits(conn, 1, "dupont") == 2
+    assert [row["first_name"] for row in search_contacts(conn, 1, "dupont", 10)] == ["Alice", "Chloé"]
+    conn.close()
@@ -0,0 +1,84 @@
+import sqlite3
+
+from app.migrations import migrate
+from app.shards import ID_SPACE, rebalance, shard_index, shard_paths
+from app.stats import check_user_stats, totals
+
+
+def test_shard_index_is_stable():
+    # Valeurs figées : changer le hachage déplacerait les utilisateurs existants
+    assert [shard_index(user_id, 4) for user_id in range(1, 13)] == [3, 3, 2, 3, 0, 1, 1, 3, 2, 0, 0, 1]
+    assert all(shard_index(user_id, 1) == 0 for user_id in range(1, 100))
+
+
+def test_adding_a_shard_moves_about_one_user_in_n():
+    users = range(1, 20001)
+    for count in (1, 2, 4, 7):
+        before = [shard_index(user_id, count) for user_id in users]
+        after = [shard_index(user_id, count + 1) for user_id in users]
+        moved = [new for old, new in zip(before, after) if old != new]
+        # Seulement vers le nouveau shard, pour environ 1/(N+1) des utilisateurs
+        assert set(moved) <= {count}
+        assert abs(len(moved) / len(users) - 1 / (count + 1)) < 0.02
+        assert all(0 <= index <= count for index in after)
+
+
+def make_global(path, users: int, contacts_per_user: int) -> str:
+    database = str(path / "contacts.db")
+    migrate(database)
+    conn = sqlite3.connect(database)
+    for user_id in range(1, users + 1):
+        conn.execute("INSERT INTO users (first_name, last_name, email, password) VALUES ('U', 'X', ?, 'x')",
+                     (f"u{user_id}@example.com",))
+        conn.executemany(
+            "INSERT INTO contacts (user_id, first_name, last_name, phone) VALUES (?, ?, 'X', '0600000000')",
+            [(user_id, f"C{index}") for index in range(contacts_per_user)]
+        )
+    conn.execute("DELETE FROM contacts WHERE user_id = 1 AND first_name = 'C0'")
+    conn.commit()
+    conn.close()
+    return database
+
+
+def test_rebalance_moves_users_with_tombstones_and_versions(tmp_path):
+    source = make_global(tmp_path, users=6, contacts_per_user=3)
+    conn = sqlite3.connect(source)
+    old_ids = dict(conn.execute("SELECT id, user_id FROM contacts").fetchall())
+    source_version = conn.execute("SELECT version FROM sync_state WHERE id = 1").fetchone()[0]
+    conn.close()
+
+    targets = shard_paths(str(tmp_path / "shards"), 3)
+    moved = rebalance([source], targets, log=lambda message: None)
+    assert moved == {"users": 6, "contacts": 17}
+
+    conn = sqlite3.connect(source)
+    assert conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0] == 0
+    assert totals(conn) == {"contacts": 0, "users": 0}
+    conn.close()
+
+    seen, buried, versioned = {}, set(), set()
+    for index, target in enumerate(targets):
+        conn = sqlite3.connect(target)
+        version = conn.execute("SELECT version FROM sync_state WHERE id = 1").fetchone()[0]
+        for contact_id, user_id in conn.execute("SELECT id, user_id FROM contacts"):
+            assert shard_index(user_id, 3) == index
+            # Nouveaux ids dans la plage du shard
+            assert (index + 1) * ID_SPACE < contact_id < (index + 2) * ID_SPACE
+            seen[user_id] = seen.get(user_id, 0) + 1
+        tombstones = conn.execute("SELECT contact_id, user_id, version FROM contact_tombstones").fetchall()
+        for contact_id, user_id, tombstone_version in tombstones:
+            assert old_ids[contact_id] == user_id
+            # Les versions ne reculent jamais pour un client déjà synchronisé
+            assert source_version < tombstone_version <= version
+            buried.add(contact_id)
+        for user_id, user_version in conn.execute("SELECT user_id, version FROM user_versions"):
+            assert source_version < user_version <= version
+            versioned.add(user_id)
+        assert check_user_stats(conn) == []
+        conn.close()
+    assert seen == {1: 2, 2: 3, 3: 3, 4: 3, 5: 3, 6: 3}
+    assert buried == set(old_ids)
+    assert versioned == set(seen)
+
+    # Déjà en place : rien à déplacer
+    assert rebalance(targets, targets, log=lambda message: None) == {"users": 0, "contacts": 0}
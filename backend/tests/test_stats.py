@@ -0,0 +1,111 @@
+import sqlite3
+
+import pytest
+
+from app.migrations import migrate
+from app.shards import rebalance, shard_paths
+from app.stats import check_user_count, check_user_stats, get_user_stats, rebuild_user_stats, totals, user_count
+
+
+@pytest.fixture
+def conn(tmp_path):
+    database = str(tmp_path / "contacts.db")
+    migrate(database)
+    conn = sqlite3.connect(database, isolation_level=None)
+    for email in ("a@example.com", "b@example.com"):
+        conn.execute("INSERT INTO users (first_name, last_name, email, password) VALUES ('U', 'X', ?, 'x')", (email,))
+    yield conn
+    conn.close()
+
+
+def add(conn, user_id: int, first_name: str, email: str = None) -> int:
+    return conn.execute(
+        "INSERT INTO contacts (user_id, first_name, last_name, phone, email) VALUES (?, ?, 'X', '0600000000', ?)",
+        (user_id, first_name, email)
+    ).lastrowid
+
+
+def test_insert_update_delete_keep_counters(conn):
+    ids = [add(conn, 1, "Alice", "a@x.fr"), add(conn, 1, "Émile"), add(conn, 1, "anne", " "), add(conn, 2, "Zoé")]
+    stats = get_user_stats(conn, 1)
+    assert (stats["contacts"], stats["with_email"]) == (3, 1)
+    assert stats["letters"] == {"A": 2, "E": 1}
+    assert stats["modified_at"] is not None
+    assert totals(conn) == {"contacts": 4, "users": 2}
+
+    conn.execute("UPDATE contacts SET first_name = 'Bruno', email = 'b@x.fr' WHERE id = ?", (ids[2],))
+    stats = get_user_stats(conn, 1)
+    assert (stats["with_email"], stats["letters"]) == (2, {"A": 1, "B": 1, "E": 1})
+
+    conn.execute("DELETE FROM contacts WHERE id IN (?, ?)", (ids[0], ids[3]))
+    assert get_user_stats(conn, 1)["letters"] == {"B": 1, "E": 1}
+    stats = get_user_stats(conn, 2)
+    assert (stats["contacts"], stats["with_email"], stats["letters"]) == (0, 0, {})
+    assert totals(conn) == {"contacts": 2, "users": 1}
+    assert check_user_stats(conn) == []
+
+
+def test_check_and_rebuild(conn):
+    add(conn, 1, "Alice")
+    conn.execute("UPDATE user_stats SET contacts = 7 WHERE user_id = 1")
+    conn.execute("UPDATE user_count SET users = 0")
+    assert [mismatch["user_id"] for mismatch in check_user_stats(conn)] == [1]
+    assert check_user_count(conn) == (2, 0)
+    rebuild_user_stats(conn)
+    assert check_user_stats(conn) == []
+    assert check_user_count(conn) is None
+
+
+def test_migration_counts_existing_users(tmp_path):
+    database = str(tmp_path / "old.db")
+    conn = sqlite3.connect(database)
+    conn.execute("""CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL, email TEXT UNIQUE NOT NULL, password TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+    conn.executemany("INSERT INTO users (first_name, last_name, email, password) VALUES ('U', 'X', ?, 'x')",
+                     [(f"u{index}@example.com",) for index in range(3)])
+    conn.commit()
+    migrate(database)
+    assert user_count(conn) == 3
+    conn.close()
+
+
+def test_user_count_follows_users(conn):
+    assert user_count(conn) == 2
+    conn.execute("INSERT INTO users (first_name, last_name, email, password) VALUES ('U', 'X', 'c@example.com', 'x')")
+    conn.execute("DELETE FROM users WHERE email = 'a@example.com'")
+    assert user_count(conn) == 2
+    conn.execute("DELETE FROM users")
+    assert user_count(conn) == 0
+
+
+def test_counters_follow_moved_users(conn, tmp_path):
+    for user_id in (1, 2):
+        for index in range(5):
+            add(conn, user_id, f"C{index}", f"c{index}@x.fr" if index % 2 else None)
+    source = conn.execute("PRAGMA database_list").fetchone()[2]
+    targets = shard_paths(str(tmp_path / "shards"), 2)
+    rebalance([source], targets, log=lambda message: None)
+
+    assert totals(conn) == {"contacts": 0, "users": 0}
+    assert check_user_stats(conn) == []
+    moved = {}
+    for target in targets:
+        shard = sqlite3.connect(target)
+        assert check_user_stats(shard) == []
+        for user_id in (1, 2):
+            stats = get_user_stats(shard, user_id)
+            if stats["contacts"]:
+                moved[user_id] = (stats["contacts"], stats["with_email"], stats["letters"])
+        shard.close()
+    assert moved == {1: (5, 2, {"C": 5}), 2: (5, 2, {"C": 5})}
+
+
+def test_test_db_reads_counters(client, register, main_module):
+    register("compteur@example.com")
+    body = client.get("/test-db").json()
+    assert body["status"] == "OK"
+    assert "users" not in body
+    with sqlite3.connect(main_module.DATABASE_URL) as conn:
+        assert body["users_count"] == conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        assert body["contacts_count"] == conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
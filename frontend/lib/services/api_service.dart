@@ -7,6 +7,10 @@ class ApiService {
   
   static String? _token;
 
+  // Dernière liste de contacts reçue et son ETag (requête conditionnelle)
+  static String? _contactsEtag;
+  static List<dynamic>? _cachedContacts;
+
   // Méthode pour debug
   static void printDebugInfo() {
     print('🔍 DEBUG API Service:');
@@ -28,6 +32,8 @@ class ApiService {
 
   static Future<void> clearToken() async {
     _token = null;
+    _contactsEtag = null;
+    _cachedContacts = null;
     print('🔑 Token supprimé');
   }
 
@@ -144,14 +150,24 @@ class ApiService {
   static Future<List<dynamic>> getContacts() async {
     print('📋 Récupération des contacts');
     
+    final headers = _headers;
+    if (_contactsEtag != null && _cachedContacts != null) {
+      headers['If-None-Match'] = _contactsEtag!;
+    }
+
     final response = await http.get(
       Uri.parse('$baseUrl/contacts'),
-      headers: _headers,
+      headers: headers,
     );
 
-    if (response.statusCode == 200) {
+    if (response.statusCode == 304 && _cachedContacts != null) {
+      print('✅ Contacts inchangés (cache)');
+      return _cachedContacts!;
+    } else if (response.statusCode == 200) {
       print('✅ Contacts récupérés');
-      return jsonDecode(response.body);
+      _cachedContacts = jsonDecode(response.body);
+      _contactsEtag = response.headers['etag'];
+      return _cachedContacts!;
     } else if (response.statusCode == 401) {
       throw Exception('Non autorisé - Token invalide');
     } else {